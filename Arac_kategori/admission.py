@@ -0,0 +1,205 @@
+"""İstek sınıfı bazında kabul kontrolü ve yük atma (saf ASGI middleware).
+
+İstekler yola ve metoda göre sınıflandırılır:
+  - analytics: POST /analytics/* takip istekleri (düşük öncelik),
+  - aktarim: uzun süren toplu içe aktarım (ortalaması yazmaları bozmasın),
+  - yazma: diğer değiştirici istekler,
+  - okuma: katalog okumaları (sınırsız; gecikmesi izlenir).
+Sınırlı sınıflarda eşzamanlı istek sayısı aşılırsa istek gecikme bütçesi
+kadar bekler; tahmini bekleme bütçeyi aşıyorsa hemen 503 döner. Okuma
+gecikmesi bütçesini aştığında analytics istekleri beklemeden atılır.
+Analytics için istemci başına token kovası uygulanır (aşılırsa 429);
+vekil sunucu arkasında istemci adresi için uvicorn --proxy-headers
+gerekir. Durum süreç içidir; sınırlar worker başınadır.
+"""
+import asyncio
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import metrics
+from serialization import json_bytes
+
+# Sınıflandırılmayan (kabul kontrolü dışı) yollar; SSE ve dışa aktarım
+# uzun ömürlüdür, okuma gecikmesi ortalamasını bozmasınlar
+MUAF_YOLLAR = ("/healthz", "/readyz", "/metrics", "/araclar/events", "/araclar/export")
+MUAF_ONEKLER = ("/static/",)
+AKTARIM_YOLU = "/araclar/import"
+OKUMA_METODLARI = ("GET", "HEAD", "OPTIONS")
+
+# Üstel hareketli ortalama katsayısı (gecikme tahminleri için)
+EWMA_ALFA = 0.1
+# Bu süreden (saniye) eski gecikme ölçümleri aşırı yük sayılmaz
+OLCUM_OMRU = 1.0
+# Token kovası tutulan en fazla istemci
+MAKSIMUM_ISTEMCI = 10000
+
+atilan_istekler = metrics.Sayac(
+    "http_requests_shed_total", "Kabul kontrolünce reddedilen istekler", ("class", "reason")
+)
+
+
+def _ortam(ad: str, varsayilan: float) -> float:
+    return float(os.getenv(ad, str(varsayilan)))
+
+
+class IstekSinifi:
+    """Eşzamanlılık sınırı, gecikme bütçesi ve servis süresi tahmini"""
+
+    def __init__(self, ad: str, eszamanli: int, butce: float):
+        self.ad = ad
+        self.eszamanli = eszamanli  # 0: sınırsız
+        self.butce = butce
+        self.aktif = 0
+        self.bekleyen = 0
+        self.ortalama = 0.0
+        self._son_olcum = 0.0
+        self._bosalan: Optional[asyncio.Condition] = None
+
+    def tahmini_bekleme(self) -> float:
+        if not self.eszamanli or self.aktif < self.eszamanli:
+            return 0.0
+        return (self.bekleyen + 1) / self.eszamanli * self.ortalama
+
+    def asiri_yuklu(self) -> bool:
+        """Yakın zamandaki servis süresi ortalaması gecikme bütçesini aştı mı"""
+        return (self.ortalama > self.butce
+                and time.monotonic() - self._son_olcum < OLCUM_OMRU)
+
+    async def gir(self) -> Optional[float]:
+        """Kabul edilirse None, reddedilirse önerilen bekleme süresini döndür"""
+        if not self.eszamanli or self.aktif < self.eszamanli:
+            self.aktif += 1
+            return None
+        tahmin = self.tahmini_bekleme()
+        if tahmin > self.butce:
+            return tahmin
+        if self._bosalan is None:
+            self._bosalan = asyncio.Condition()
+        self.bekleyen += 1
+        try:
+            async with self._bosalan:
+                await asyncio.wait_for(
+                    self._bosalan.wait_for(lambda: self.aktif < self.eszamanli), self.butce
+                )
+                self.aktif += 1
+                return None
+        except asyncio.TimeoutError:
+            return max(self.butce, self.tahmini_bekleme())
+        finally:
+            self.bekleyen -= 1
+
+    async def cik(self, sure: float):
+        self.aktif -= 1
+        self.ortalama += EWMA_ALFA * (sure - self.ortalama)
+        self._son_olcum = time.monotonic()
+        if self.bekleyen and self._bosalan is not None:
+            async with self._bosalan:
+                self._bosalan.notify()
+
+
+class TokenKovasi:
+    """İstemci başına hız sınırı (saniyede hiz, en fazla kapasite kadar patlama)"""
+
+    def __init__(self, hiz: float, kapasite: float):
+        self.hiz = hiz
+        self.kapasite = kapasite
+        self._istemciler: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def al(self, istemci: str) -> Optional[float]:
+        """Token varsa None, yoksa bir sonraki token'a kalan süreyi döndür"""
+        simdi = time.monotonic()
+        token, zaman = self._istemciler.pop(istemci, (self.kapasite, simdi))
+        token = min(self.kapasite, token + (simdi - zaman) * self.hiz)
+        sonuc = None
+        if token >= 1:
+            token -= 1
+        else:
+            sonuc = (1 - token) / self.hiz
+        self._istemciler[istemci] = (token, simdi)
+        if len(self._istemciler) > MAKSIMUM_ISTEMCI:
+            self._istemciler.popitem(last=False)
+        return sonuc
+
+
+class KabulMiddleware:
+    """Analytics ve yazma isteklerini sınırlayarak katalog okumalarını korur"""
+
+    def __init__(self, app):
+        self.app = app
+        self.okuma = IstekSinifi("okuma", 0, _ortam("ADMISSION_READ_BUDGET_MS", 250) / 1000)
+        self.yazma = IstekSinifi(
+            "yazma", int(_ortam("ADMISSION_WRITE_CONCURRENCY", 32)),
+            _ortam("ADMISSION_WRITE_BUDGET_MS", 1000) / 1000,
+        )
+        self.analytics = IstekSinifi(
+            "analytics", int(_ortam("ADMISSION_ANALYTICS_CONCURRENCY", 16)),
+            _ortam("ADMISSION_ANALYTICS_BUDGET_MS", 50) / 1000,
+        )
+        self.aktarim = IstekSinifi(
+            "aktarim", int(_ortam("ADMISSION_IMPORT_CONCURRENCY", 2)),
+            _ortam("ADMISSION_IMPORT_BUDGET_MS", 1000) / 1000,
+        )
+        hiz = _ortam("ADMISSION_ANALYTICS_RATE", 50)
+        self.kova = TokenKovasi(hiz, _ortam("ADMISSION_ANALYTICS_BURST", 2 * hiz)) if hiz else None
+
+    def _sinif(self, scope) -> Optional[IstekSinifi]:
+        yol = scope["path"]
+        if yol in MUAF_YOLLAR or yol.startswith(MUAF_ONEKLER):
+            return None
+        if scope["method"] in OKUMA_METODLARI:
+            return self.okuma
+        if yol.startswith("/analytics/"):
+            return self.analytics
+        if yol == AKTARIM_YOLU:
+            return self.aktarim
+        return self.yazma
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        sinif = self._sinif(scope)
+        if sinif is None:
+            await self.app(scope, receive, send)
+            return
+
+        if sinif is self.analytics:
+            if self.kova is not None:
+                istemci = (scope.get("client") or ("?",))[0]
+                bekleme = self.kova.al(istemci)
+                if bekleme is not None:
+                    await _reddet(send, 429, bekleme, sinif.ad, "rate_limit")
+                    return
+            if self.okuma.asiri_yuklu():
+                # Okumalar bütçesini aştı; takip istekleri kuyruğa bile girmez
+                await _reddet(send, 503, self.okuma.ortalama, sinif.ad, "read_latency")
+                return
+
+        bekleme = await sinif.gir()
+        if bekleme is not None:
+            await _reddet(send, 503, bekleme, sinif.ad, "queue")
+            return
+        bas = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            await sinif.cik(time.perf_counter() - bas)
+
+
+async def _reddet(send, durum: int, bekleme: float, sinif: str, neden: str):
+    atilan_istekler.artir(sinif, neden)
+    govde = json_bytes({"detail": "Sunucu yoğun, lütfen daha sonra tekrar deneyin"
+                        if durum == 503 else "İstek sınırı aşıldı"})
+    await send({
+        "type": "http.response.start",
+        "status": durum,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(govde)).encode()),
+            (b"retry-after", str(max(1, math.ceil(bekleme))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": govde})
@@ -0,0 +1,221 @@
+"""Araç tablosunun akış halinde dışa ve içe aktarımı."""
+import codecs
+import csv
+import io
+import json
+import logging
+import zlib
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import insert, select
+
+from bulk import batch_dogrula
+from database import async_engine
+from models import Arac
+from schemas import AracCreate
+from serialization import ARAC_ALANLARI, ARAC_KOLONLARI, json_bytes
+
+logger = logging.getLogger(__name__)
+
+# Sunucu tarafı cursor'dan tek seferde çekilen satır sayısı
+AKIS_PARCA = 1000
+
+# İçe aktarımda doğrulanıp tek seferde yüklenen satır sayısı
+YUKLEME_PARCA = 2000
+# Özette döndürülen en fazla satır hatası
+MAKSIMUM_HATA = 100
+
+# İçe aktarılan satırların yazıldığı kolonlar
+YUKLEME_KOLONLARI = (
+    "isim", "model", "yil", "kategori", "fiyat", "aciklama", "favori", "resim_url"
+)
+
+AKTARIM_TURLERI = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _ndjson(satirlar: Iterable) -> bytes:
+    return b"".join(json_bytes(dict(zip(ARAC_ALANLARI, satir))) + b"\n" for satir in satirlar)
+
+
+def _csv(satirlar: Iterable) -> bytes:
+    tampon = io.StringIO()
+    csv.writer(tampon).writerows(satirlar)
+    return tampon.getvalue().encode()
+
+
+async def _satir_parcalari(kodla) -> AsyncIterator[bytes]:
+    # Bağlantı istekten bağımsız açılır; yanıt gönderilirken de açık kalır
+    async with async_engine.connect() as conn:
+        sonuc = await conn.stream(
+            select(*ARAC_KOLONLARI)
+            .order_by(Arac.id)
+            .execution_options(yield_per=AKIS_PARCA)
+        )
+        async for parca in sonuc.partitions():
+            yield kodla(parca)
+
+
+async def _ham_aktarim(tur: str) -> AsyncIterator[bytes]:
+    if tur == "csv":
+        # Başlık satırı sorgu beklenmeden hemen gönderilir
+        yield _csv([ARAC_ALANLARI])
+        kodla = _csv
+    else:
+        kodla = _ndjson
+    async for parca in _satir_parcalari(kodla):
+        yield parca
+
+
+async def arac_aktarimi(tur: str, sikistir: bool = False) -> AsyncIterator[bytes]:
+    """Tüm araçları parça parça NDJSON veya CSV olarak üret (sabit bellek)"""
+    if not sikistir:
+        async for parca in _ham_aktarim(tur):
+            yield parca
+        return
+    sikistirici = zlib.compressobj(6, zlib.DEFLATED, 31)  # gzip biçimi
+    async for parca in _ham_aktarim(tur):
+        # SYNC_FLUSH: her parça istemciye beklemeden ulaşır
+        yield sikistirici.compress(parca) + sikistirici.flush(zlib.Z_SYNC_FLUSH)
+    yield sikistirici.flush()
+
+
+# --- İçe aktarım ---
+
+async def _satirlar(parcalar: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Byte parçalarını (UTF-8, satır sınırlarından bağımsız) satırlara böl"""
+    cozucu = codecs.getincrementaldecoder("utf-8-sig")()
+    kalan = ""
+    async for parca in parcalar:
+        kalan += cozucu.decode(parca)
+        *tamamlar, kalan = kalan.split("\n")
+        for satir in tamamlar:
+            yield satir
+    kalan += cozucu.decode(b"", final=True)
+    if kalan:
+        yield kalan
+
+
+async def _ndjson_kayitlari(parcalar: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    async for satir in _satirlar(parcalar):
+        if not satir.strip():
+            continue
+        try:
+            yield json.loads(satir)
+        except ValueError as e:
+            yield e
+
+
+async def _csv_kayitlari(parcalar: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    basliklar: Optional[List[str]] = None
+    kayit = ""
+    async for satir in _satirlar(parcalar):
+        # Tırnak içindeki satır sonları kaydı bölmez
+        kayit = f"{kayit}\n{satir}" if kayit else satir
+        if kayit.count('"') % 2:
+            continue
+        metin, kayit = kayit.rstrip("\r"), ""
+        if not metin.strip():
+            continue
+        degerler = next(csv.reader([metin]))
+        if basliklar is None:
+            basliklar = [baslik.strip() for baslik in degerler]
+            continue
+        # Boş hücre "değer yok" demektir
+        yield {k: (v if v != "" else None) for k, v in zip(basliklar, degerler)}
+    if kayit:
+        yield ValueError("Kapanmamış tırnak ile biten kayıt")
+
+
+async def _yukle(satirlar: List[Dict[str, Any]]):
+    """Satırları PostgreSQL'de COPY, diğerlerinde executemany ile tek seferde yaz"""
+    async with async_engine.connect() as conn:
+        if conn.dialect.driver == "asyncpg":
+            ham = await conn.get_raw_connection()
+            # Transaction dışında; tek COPY komutu kendi başına atomiktir
+            await ham.driver_connection.copy_records_to_table(
+                Arac.__tablename__,
+                records=[tuple(s[k] for k in YUKLEME_KOLONLARI) for s in satirlar],
+                columns=list(YUKLEME_KOLONLARI),
+            )
+        else:
+            await conn.execute(insert(Arac), satirlar)
+            await conn.commit()
+
+
+async def arac_ice_aktar(tur: str, parcalar: AsyncIterator[bytes],
+                         varsayilan_resim: Optional[str] = None,
+                         yazildi: Optional[Callable[[int], None]] = None) -> dict:
+    """Yüklenen dosyayı akış halinde ayrıştır, parça parça doğrula ve yaz
+
+    Her parça ayrı commit edilir; `yazildi` her başarılı parçadan sonra yazılan
+    satır sayısıyla çağrılır ki çağıran taraf yarıda kalan aktarımda da önbelleği
+    geçersiz kılabilsin. Yazılamayan parçanın satırları reddedilmiş sayılır.
+    """
+    kayitlar = _csv_kayitlari(parcalar) if tur == "csv" else _ndjson_kayitlari(parcalar)
+    kabul, red = 0, 0
+    hatalar: List[dict] = []
+
+    def hata_ekle(liste: List[dict]):
+        nonlocal red
+        red += len(liste)
+        hatalar.extend(liste[:MAKSIMUM_HATA + 1 - len(hatalar)])
+
+    async def parca_yaz(parca: List[Tuple[int, Any]]):
+        nonlocal kabul
+        gecerli, parca_hatalari = batch_dogrula([kayit for _, kayit in parca], AracCreate)
+        # batch_dogrula parça içi indeks döndürür; dosyadaki sıraya çevir
+        for hata in parca_hatalari:
+            hata["index"] = parca[hata["index"]][0]
+        hata_ekle(parca_hatalari)
+        if not gecerli:
+            return
+        try:
+            await _yukle([
+                {
+                    "isim": arac.isim, "model": arac.model, "yil": arac.yil,
+                    "kategori": arac.kategori, "fiyat": arac.fiyat,
+                    "aciklama": arac.aciklama, "favori": False,
+                    "resim_url": arac.resim_url or varsayilan_resim,
+                }
+                for _, _, arac in gecerli
+            ])
+        except Exception as e:
+            logger.exception("İçe aktarım parçası yazılamadı")
+            hata_ekle([
+                {"index": parca[i][0], "id": None,
+                 "errors": [{"loc": [], "msg": str(e), "type": "db_error"}]}
+                for i, _, _ in gecerli
+            ])
+            return
+        kabul += len(gecerli)
+        if yazildi is not None:
+            yazildi(len(gecerli))
+
+    parca: List[Tuple[int, Any]] = []
+    index = 0
+    async for kayit in kayitlar:
+        if isinstance(kayit, dict):
+            parca.append((index, kayit))
+        else:
+            tip = "json_invalid" if tur == "ndjson" else "csv_invalid"
+            hata_ekle([{"index": index, "id": None, "errors": [
+                {"loc": [], "msg": str(kayit) if isinstance(kayit, Exception)
+                 else "Kayıt bir nesne olmalı", "type": tip}
+            ]}])
+        index += 1
+        if len(parca) >= YUKLEME_PARCA:
+            await parca_yaz(parca)
+            parca = []
+    if parca:
+        await parca_yaz(parca)
+
+    return {
+        "success": red == 0,
+        "accepted": kabul,
+        "rejected": red,
+        "errors": hatalar[:MAKSIMUM_HATA],
+        "errors_truncated": len(hatalar) > MAKSIMUM_HATA,
+    }
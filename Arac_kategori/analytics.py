@@ -0,0 +1,372 @@
+import asyncio
+import heapq
+import logging
+import os
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.exc import DataError, IntegrityError
+
+from counters import TIPLER, EnCokTakibi, sayac_olustur
+from database import SessionLocal
+from models import AnalitikSaatlik, AnalitikGunluk
+from timeseries import ARAC_BOYUTLARI, GENEL_BOYUTLAR, ZamanSerileri
+
+logger = logging.getLogger(__name__)
+
+# Tampon veritabanına bu aralıkla (saniye) yazılır
+FLUSH_ARALIGI = 5.0
+# Tek bir upsert ifadesindeki en fazla satır (parametre limitleri için)
+UPSERT_PARCA = 1000
+# Bağlantı vb. hatalarda tamponun tekrar deneneceği en fazla flush sayısı;
+# aşılırsa bekleyen artışlar atılır (tampon sınırsız büyümez)
+FLUSH_DENEME_SINIRI = 60
+# Satırın kendisinden kaynaklanan (tekrar denemekle düzelmeyen) hatalar
+_VERI_HATALARI = (OverflowError, ValueError, TypeError, DataError, IntegrityError)
+
+# Dashboard'daki en çok listelerinin uzunluğu
+TOP_K = int(os.getenv("ANALYTICS_TOP_K", "5"))
+
+# Admin işlem sayaçları (süreç içi; toplamlar rollup tablolarında)
+admin_islemleri: Dict[str, int] = {}
+
+# Olay tipi -> (sayaç backend'indeki indeks, günlük istatistik alanı)
+OLAY_TIPLERI = {tip: (i, alan) for i, (tip, alan) in enumerate(
+    zip(TIPLER, ("views", "favorites", "details"))
+)}
+
+ADMIN_ONEKI = "admin:"
+# Admin işlem adının en fazla uzunluğu (olay kolonu String(64))
+ADMIN_ISLEM_UZUNLUGU = 64 - len(ADMIN_ONEKI)
+
+# (olay, arac_id, saat) -> adet; henüz veritabanına yazılmamış artışlar
+_tampon: Dict[Tuple[str, int, datetime], int] = {}
+_flush_gorevi: Optional[asyncio.Task] = None
+_basarisiz_flush = 0
+_sayaclar = None
+# Tip indeksi -> artımlı top-K; ilk erişimde sayaçlardan kurulur
+_en_coklar: Optional[List[EnCokTakibi]] = None
+
+# Dakika/saat/gün çözünürlüğünde trend serileri (süreç içi)
+zaman_serileri = ZamanSerileri()
+
+
+def sayaclar():
+    """Süreç için sayaç backend'ini (gerekirse oluşturarak) döndür"""
+    global _sayaclar
+    if _sayaclar is None:
+        _sayaclar = sayac_olustur(TOP_K)
+    return _sayaclar
+
+
+def en_coklar() -> List[EnCokTakibi]:
+    """Tip başına top-K yapılarını (gerekirse sayaçlardan kurarak) döndür.
+
+    Tam tarama sadece kurulumda yapılır; adaylar paylaşımlı sayaçlarda
+    diğer worker'ların okuyabilmesi için sürecin şeridinde yayınlanır.
+    """
+    global _en_coklar
+    if _en_coklar is None:
+        s = sayaclar()
+        takipler = []
+        for indeks in range(len(TIPLER)):
+            takip = EnCokTakibi(TOP_K)
+            takip.kur(s.en_cok(indeks, TOP_K))
+            s.adaylari_yaz(indeks, takip.idler())
+            takipler.append(takip)
+        _en_coklar = takipler
+    return _en_coklar
+
+
+def _saat(zaman: datetime) -> datetime:
+    return zaman.replace(minute=0, second=0, microsecond=0)
+
+
+def _dakika(zaman: datetime) -> datetime:
+    return zaman.replace(second=0, microsecond=0)
+
+
+def _tamponla(tip: str, arac_idleri: Iterable[int], saat: datetime):
+    for arac_id in arac_idleri:
+        anahtar = (tip, arac_id, saat)
+        _tampon[anahtar] = _tampon.get(anahtar, 0) + 1
+
+
+def toplu_kaydet(tip: str, arac_idleri: Iterable[int], zaman: Optional[datetime] = None) -> int:
+    """Aynı tipteki olayları tek işlemde kaydet; gün bir kez hesaplanır"""
+    indeks, _ = OLAY_TIPLERI[tip]
+    zaman = zaman or datetime.now()
+    arac_idleri = list(arac_idleri)
+    s = sayaclar()
+    adet = s.artir(indeks, arac_idleri)
+    if adet:
+        s.gun_artir(zaman.date(), indeks, adet)
+        takip = en_coklar()[indeks]
+        degisti = False
+        for arac_id in set(arac_idleri):
+            degisti |= takip.guncelle(arac_id, s.deger(indeks, arac_id))
+        if degisti:
+            s.adaylari_yaz(indeks, takip.idler())
+        zaman_serileri.ekle(indeks, arac_idleri, zaman)
+        _tamponla(tip, arac_idleri, _saat(zaman))
+    return adet
+
+
+def olaylari_kaydet(olaylar: Iterable[Tuple[str, int, Optional[datetime]]]) -> int:
+    """Karışık (tip, arac_id, zaman) olaylarını dakika ve tipe göre gruplayarak kaydet"""
+    bu_dakika = _dakika(datetime.now())
+    gruplar: Dict[Tuple[str, datetime], List[int]] = {}
+    for tip, arac_id, zaman in olaylar:
+        dakika = _dakika(zaman) if zaman else bu_dakika
+        gruplar.setdefault((tip, dakika), []).append(arac_id)
+    return sum(
+        toplu_kaydet(tip, arac_idleri, dakika)
+        for (tip, dakika), arac_idleri in gruplar.items()
+    )
+
+
+def admin_islemi_kaydet(action: str, adet: int = 1):
+    """Admin işlem sayacını artır"""
+    admin_islemleri[action] = admin_islemleri.get(action, 0) + adet
+    anahtar = (ADMIN_ONEKI + action, 0, _saat(datetime.now()))
+    _tampon[anahtar] = _tampon.get(anahtar, 0) + adet
+
+
+def _gun_sozlugu(degerler: List[int]) -> dict:
+    return {alan: degerler[indeks] for indeks, alan in OLAY_TIPLERI.values()}
+
+
+def gunluk_istatistik(gun: date) -> dict:
+    """Bir günün views/favorites/details toplamları"""
+    return _gun_sozlugu(sayaclar().gun(gun))
+
+
+def arac_analitigi(arac_id: int) -> dict:
+    """Bir aracın tüm zamanlar sayaçları"""
+    views, favorites, details = sayaclar().arac(arac_id)
+    return {"views": views, "favorites": favorites, "details": details}
+
+
+def _en_cok_listesi(indeks: int) -> List[Tuple[int, int]]:
+    # Tüm worker'ların adayları birleştirilip güncel değerleri yeniden okunur
+    s = sayaclar()
+    idler = set(en_coklar()[indeks].idler())
+    idler.update(s.adaylar(indeks))
+    ciftler = [(arac_id, s.deger(indeks, arac_id)) for arac_id in idler]
+    return heapq.nlargest(TOP_K, ciftler, key=lambda x: x[1])
+
+
+def dashboard_ozeti() -> dict:
+    """Toplamlar, bugünün sayaçları ve en çok görüntülenen/favorilenen/incelenen araçlar"""
+    s = sayaclar()
+    bugun = gunluk_istatistik(date.today())
+    return {
+        "total_views": s.toplam(OLAY_TIPLERI["view"][0]),
+        "total_favorites": s.toplam(OLAY_TIPLERI["favorite"][0]),
+        "total_details": s.toplam(OLAY_TIPLERI["detail"][0]),
+        "today_views": bugun["views"],
+        "today_favorites": bugun["favorites"],
+        "today_details": bugun["details"],
+        "top_vehicles": _en_cok_listesi(OLAY_TIPLERI["view"][0]),
+        "top_favorites": _en_cok_listesi(OLAY_TIPLERI["favorite"][0]),
+        "top_details": _en_cok_listesi(OLAY_TIPLERI["detail"][0]),
+        "admin_actions": admin_islemleri,
+    }
+
+
+def _upsert(db, model, zaman_kolonu: str, satirlar: list):
+    """Çok satırlı INSERT ... ON CONFLICT DO UPDATE ile sayaçları topla"""
+    if db.bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    for i in range(0, len(satirlar), UPSERT_PARCA):
+        stmt = insert(model).values(satirlar[i:i + UPSERT_PARCA])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["olay", "arac_id", zaman_kolonu],
+            set_={"adet": model.adet + stmt.excluded.adet},
+        )
+        db.execute(stmt)
+
+
+def _yaz(tampon: Dict[Tuple[str, int, datetime], int]):
+    """Tamponu saatlik ve günlük rollup tablolarına tek transaction'da yaz"""
+    gunluk: Dict[Tuple[str, int, date], int] = {}
+    saatlik = []
+    for (olay, arac_id, saat), adet in tampon.items():
+        saatlik.append({"olay": olay, "arac_id": arac_id, "saat": saat, "adet": adet})
+        anahtar = (olay, arac_id, saat.date())
+        gunluk[anahtar] = gunluk.get(anahtar, 0) + adet
+    gunluk_satirlar = [
+        {"olay": olay, "arac_id": arac_id, "gun": gun, "adet": adet}
+        for (olay, arac_id, gun), adet in gunluk.items()
+    ]
+
+    db = SessionLocal()
+    try:
+        _upsert(db, AnalitikSaatlik, "saat", saatlik)
+        _upsert(db, AnalitikGunluk, "gun", gunluk_satirlar)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _ayiklayarak_yaz(tampon: Dict[Tuple[str, int, datetime], int]) -> int:
+    """Tamponu yaz; veri hatasında ikiye bölerek tek başına yazılamayan satırları at.
+
+    Yazılan ve atılan satırlar tampondan silinir; başka bir hata yükselirse
+    tampon sadece yazılamamış artışları içerir. Atılan satır sayısını döndürür.
+    """
+    atilan = 0
+    parcalar = [list(tampon)]
+    while parcalar:
+        anahtarlar = parcalar.pop()
+        try:
+            _yaz({anahtar: tampon[anahtar] for anahtar in anahtarlar})
+        except _VERI_HATALARI:
+            if len(anahtarlar) == 1:
+                logger.exception("Analytics satırı yazılamadı, atıldı: %r", anahtarlar[0])
+                del tampon[anahtarlar[0]]
+                atilan += 1
+            else:
+                orta = len(anahtarlar) // 2
+                parcalar += [anahtarlar[orta:], anahtarlar[:orta]]
+            continue
+        for anahtar in anahtarlar:
+            del tampon[anahtar]
+    return atilan
+
+
+async def analytics_flush():
+    """Bekleyen artışları veritabanına yaz; event loop'u bloklamaz"""
+    global _tampon, _basarisiz_flush
+    if not _tampon:
+        return
+    tampon, _tampon = _tampon, {}
+    try:
+        await asyncio.to_thread(_ayiklayarak_yaz, tampon)
+        _basarisiz_flush = 0
+    except Exception:
+        _basarisiz_flush += 1
+        if _basarisiz_flush > FLUSH_DENEME_SINIRI:
+            logger.exception("Analytics flush %d kez başarısız, %d artış atıldı",
+                             _basarisiz_flush, len(tampon))
+            _basarisiz_flush = 0
+            return
+        logger.exception("Analytics flush başarısız, artışlar tekrar denenecek")
+        # Yazılamayan artışları yeni gelenlerle birleştir
+        for anahtar, adet in tampon.items():
+            _tampon[anahtar] = _tampon.get(anahtar, 0) + adet
+
+
+async def _flush_dongusu():
+    while True:
+        await asyncio.sleep(FLUSH_ARALIGI)
+        await analytics_flush()
+
+
+def _serileri_yukle(db):
+    """Trend halkalarının saat ve gün kovalarını rollup tablolarından doldur"""
+    simdi = datetime.now()
+    olaylar = list(OLAY_TIPLERI)
+    sorgular = (
+        # (çözünürlük, model, zaman kolonu, araç bazında mı, geriye gidilen süre)
+        ("hour", AnalitikSaatlik, AnalitikSaatlik.saat, False, timedelta(hours=GENEL_BOYUTLAR[1])),
+        ("hour", AnalitikSaatlik, AnalitikSaatlik.saat, True, timedelta(hours=ARAC_BOYUTLARI[1])),
+        ("day", AnalitikGunluk, AnalitikGunluk.gun, False, timedelta(days=GENEL_BOYUTLAR[2])),
+        ("day", AnalitikGunluk, AnalitikGunluk.gun, True, timedelta(days=ARAC_BOYUTLARI[2])),
+    )
+    for cozunurluk, model, kolon, arac_bazinda, sure in sorgular:
+        sinir = simdi - sure
+        if cozunurluk == "day":
+            sinir = sinir.date()
+        gruplar = [model.olay, kolon] + ([model.arac_id] if arac_bazinda else [])
+        # Zamana göre artan sıra: en son olay alan araçlar LRU'nun sonunda kalır
+        satirlar = (
+            db.query(*gruplar, func.sum(model.adet))
+            .filter(model.olay.in_(olaylar), kolon >= sinir)
+            .group_by(*gruplar)
+            .order_by(kolon)
+            .all()
+        )
+        for satir in satirlar:
+            olay, zaman, adet = satir[0], satir[1], satir[-1]
+            if not isinstance(zaman, datetime):
+                zaman = datetime.combine(zaman, datetime.min.time())
+            zaman_serileri.yukle(cozunurluk, OLAY_TIPLERI[olay][0],
+                                 satir[2] if arac_bazinda else None, zaman, int(adet))
+
+
+def trend_serisi(baslangic: datetime, bitis: datetime, adim: int,
+                 arac_id: Optional[int] = None) -> dict:
+    """Aralığı adım genişliğinde views/favorites/details noktalarına böl"""
+    cozunurluk, noktalar = zaman_serileri.sorgula(baslangic, bitis, adim, arac_id)
+    return {
+        "resolution": cozunurluk,
+        "retained_since": zaman_serileri.saklama_baslangici(
+            cozunurluk, arac_id, datetime.now()
+        ).isoformat(),
+        "points": [
+            {"time": zaman.isoformat(), **_gun_sozlugu(degerler)}
+            for zaman, degerler in noktalar
+        ],
+    }
+
+
+def analytics_yukle():
+    """Başlangıçta sayaçları günlük rollup tablosundan geri yükle.
+
+    Paylaşımlı sayaç dosyası zaten başka bir worker tarafından kurulduysa
+    araç ve gün sayaçları tekrar yüklenmez.
+    """
+    global _en_coklar
+    db = SessionLocal()
+    try:
+        toplamlar = (
+            db.query(AnalitikGunluk.olay, AnalitikGunluk.arac_id, func.sum(AnalitikGunluk.adet))
+            .group_by(AnalitikGunluk.olay, AnalitikGunluk.arac_id)
+            .all()
+        )
+        gunler = (
+            db.query(AnalitikGunluk.olay, AnalitikGunluk.gun, func.sum(AnalitikGunluk.adet))
+            .group_by(AnalitikGunluk.olay, AnalitikGunluk.gun)
+            .all()
+        )
+        _serileri_yukle(db)
+    finally:
+        db.close()
+
+    s = sayaclar()
+    for olay, arac_id, adet in toplamlar:
+        if olay.startswith(ADMIN_ONEKI):
+            admin_islemleri[olay[len(ADMIN_ONEKI):]] = int(adet)
+        elif olay in OLAY_TIPLERI and s.geri_yukle_gerekli:
+            s.yukle(OLAY_TIPLERI[olay][0], arac_id, int(adet))
+    if s.geri_yukle_gerekli:
+        for olay, gun, adet in gunler:
+            if olay in OLAY_TIPLERI:
+                s.gun_yukle(gun, OLAY_TIPLERI[olay][0], int(adet))
+    # Top-K yapıları yüklenen sayaçlardan yeniden kurulur
+    _en_coklar = None
+    en_coklar()
+
+
+def analytics_flush_baslat():
+    """Periyodik flush görevini başlat"""
+    global _flush_gorevi
+    if _flush_gorevi is None:
+        _flush_gorevi = asyncio.create_task(_flush_dongusu())
+
+
+async def analytics_flush_durdur():
+    """Flush görevini durdur ve kalan tamponu yaz"""
+    global _flush_gorevi
+    if _flush_gorevi is not None:
+        _flush_gorevi.cancel()
+        try:
+            await _flush_gorevi
+        except asyncio.CancelledError:
+            pass
+        _flush_gorevi = None
+    await analytics_flush()
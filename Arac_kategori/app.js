@@ -1,4 +1,63 @@
 const API_URL = "/araclar";
+// Kartlar için hafif liste görünümü (açıklama çekilmez)
+const KART_ALANLARI = "fields=summary,resim_url";
+// Bir seferde yüklenen kart sayısı; devamı "Daha fazla" ile gelir
+const SAYFA_BOYUTU = 48;
+
+// Tek bir sayfayı ve sıradaki sayfanın cursor'ını (X-Next-Cursor) getir
+async function sayfaGetir(url, cursor = null) {
+    const sayfa = new URL(url, window.location.origin);
+    sayfa.searchParams.set('limit', SAYFA_BOYUTU);
+    if (cursor) sayfa.searchParams.set('cursor', cursor);
+    const response = await fetch(sayfa);
+    if (!response.ok) throw new Error(`HTTP ${response.status}`);
+    return { araclar: await response.json(), cursor: response.headers.get('X-Next-Cursor') };
+}
+
+// İlk sayfayı kapsayıcıya çiz; sonraki sayfalar istendikçe eklenir
+async function sayfaliListele(url, containerId, bosIse = null) {
+    const { araclar, cursor } = await sayfaGetir(url);
+    const container = document.getElementById(containerId);
+    if (!container) return;
+    // Eski listenin bekleyen "Daha fazla" yanıtı yeni listeye eklenmesin
+    container.dataset.liste = url;
+    if (araclar.length === 0 && bosIse) {
+        bosIse();
+    } else {
+        container.innerHTML = araclar.map(arac => createVehicleCard(arac)).join('');
+    }
+    dahaFazlaDugmesi(container, url, cursor);
+}
+
+// Sıradaki sayfa varsa kapsayıcının altına "Daha fazla" düğmesi koy
+function dahaFazlaDugmesi(container, url, cursor) {
+    let dugme = document.getElementById(`${container.id}-daha-fazla`);
+    if (!cursor) {
+        if (dugme) dugme.remove();
+        return;
+    }
+    if (!dugme) {
+        dugme = document.createElement('button');
+        dugme.id = `${container.id}-daha-fazla`;
+        dugme.className = 'btn-secondary daha-fazla';
+        dugme.textContent = 'Daha fazla';
+        container.after(dugme);
+    }
+    dugme.disabled = false;
+    dugme.onclick = async () => {
+        dugme.disabled = true;
+        try {
+            const sonraki = await sayfaGetir(url, cursor);
+            if (container.dataset.liste !== url) return;
+            container.insertAdjacentHTML('beforeend', sonraki.araclar.map(arac => createVehicleCard(arac)).join(''));
+            dahaFazlaDugmesi(container, url, sonraki.cursor);
+        } catch (error) {
+            dugme.disabled = false;
+            console.error('Sayfa yükleme hatası:', error);
+            showMessage('Araçlar yüklenirken hata oluştu.', 'error');
+        }
+    };
+}
 let currentUser = null;
 let currentPage = 'dashboard';
 
@@ -8,8 +67,57 @@ document.addEventListener('DOMContentLoaded', function() {
     initializeNavigation();
     loadDashboardData();
     araclariListele();
+    araclariDinle();
 });
 
+// Canlı güncellemeler (SSE): listeyi yeniden çekmek yerine kartları yerinde güncelle
+let canliGuncelleme = false;
+
+function araclariDinle() {
+    if (!window.EventSource) return;
+    const kaynak = new EventSource(`${API_URL}/events`);
+    kaynak.onopen = () => { canliGuncelleme = true; };
+    kaynak.onerror = () => { canliGuncelleme = false; };
+
+    const kart = (id) => document.querySelector(`.arac-card[data-id="${id}"]`);
+    const kartiYenile = (arac) => {
+        const mevcut = kart(arac.id);
+        if (mevcut) {
+            mevcut.outerHTML = createVehicleCard(arac);
+        }
+    };
+
+    // Yeni araç listenin sonuna eklenir; sonraki sayfalar henüz yüklenmediyse
+    // araç sırası gelince o sayfayla gelir, filtreye uymuyorsa hiç eklenmez
+    kaynak.addEventListener('created', (e) => {
+        const arac = JSON.parse(e.data).data;
+        const container = document.getElementById('araclar-listesi');
+        if (!container || !container.dataset.liste || kart(arac.id)) return;
+        if (document.getElementById(`${container.id}-daha-fazla`)) return;
+        const favori = new URL(container.dataset.liste, window.location.origin).searchParams.get('favori');
+        if (favori !== null && favori !== String(arac.favori)) return;
+        const bos = container.querySelector('.empty-state');
+        if (bos) bos.remove();
+        container.insertAdjacentHTML('beforeend', createVehicleCard(arac));
+    });
+    kaynak.addEventListener('updated', (e) => kartiYenile(JSON.parse(e.data).data));
+    kaynak.addEventListener('deleted', (e) => {
+        const mevcut = kart(JSON.parse(e.data).id);
+        if (mevcut) mevcut.remove();
+    });
+    kaynak.addEventListener('favori_toggled', (e) => {
+        const { id, favori } = JSON.parse(e.data);
+        const buton = kart(id)?.querySelector('.favori-btn');
+        if (buton) {
+            buton.classList.toggle('favori', favori);
+            buton.querySelector('i').className = favori ? 'fas fa-star' : 'far fa-star';
+        }
+    });
+    // Toplu değişiklik ya da yavaş istemci olarak düşürülme: listeyi yeniden yükle
+    kaynak.addEventListener('invalidated', araclariListele);
+    kaynak.addEventListener('dropped', araclariListele);
+}
+
 // Login durumu kontrolü
 function checkLoginStatus() {
     const user = localStorage.getItem('currentUser');
@@ -150,22 +258,30 @@ function updatePageTitle(page) {
 
 // Dashboard verilerini yükle
 function loadDashboardData() {
-    fetch(API_URL)
+    fetch(`${API_URL}/stats`)
+        .then(response => response.json())
+        .then(stats => {
+            updateDashboardCards(stats);
+        })
+        .catch(error => {
+            console.error('Dashboard veri yükleme hatası:', error);
+        });
+
+    fetch(`${API_URL}?limit=5&fields=isim`)
         .then(response => response.json())
         .then(data => {
-            updateDashboardCards(data);
             updateActivityList(data);
         })
         .catch(error => {
-            console.error('Dashboard veri yükleme hatası:', error);
+            console.error('Aktivite yükleme hatası:', error);
         });
 }
 
 // Dashboard kartlarını güncelle
-function updateDashboardCards(data) {
-    const totalVehicles = data.length;
-    const favoriteVehicles = data.filter(arac => arac.favori).length;
-    const activeVehicles = data.filter(arac => arac.yil >= 2020).length;
+function updateDashboardCards(stats) {
+    const totalVehicles = stats.toplam;
+    const favoriteVehicles = stats.favori;
+    const activeVehicles = stats.aktif;
     const monthlyActivity = Math.floor(Math.random() * 10) + 5; // Örnek veri
 
     document.getElementById('total-vehicles').textContent = totalVehicles;
@@ -197,14 +313,7 @@ function updateActivityList(data) {
 
 // Favorileri yükle
 function loadFavorites() {
-    fetch(`${API_URL}?favori=true`)
-        .then(response => response.json())
-        .then(data => {
-            const container = document.getElementById('favoriler-listesi');
-            if (container) {
-                container.innerHTML = data.map(arac => createVehicleCard(arac)).join('');
-            }
-        })
+    sayfaliListele(`${API_URL}?favori=true&${KART_ALANLARI}`, 'favoriler-listesi')
         .catch(error => {
             console.error('Favoriler yükleme hatası:', error);
         });
@@ -212,10 +321,10 @@ function loadFavorites() {
 
 // İstatistikleri yükle
 function loadStatistics() {
-    fetch(API_URL)
+    fetch(`${API_URL}/stats`)
         .then(response => response.json())
-        .then(data => {
-            updateStatistics(data);
+        .then(stats => {
+            updateStatistics(stats);
         })
         .catch(error => {
             console.error('İstatistik yükleme hatası:', error);
@@ -223,11 +332,11 @@ function loadStatistics() {
 }
 
 // İstatistikleri güncelle
-function updateStatistics(data) {
-    const totalVehicles = data.length;
-    const favoriteVehicles = data.filter(arac => arac.favori).length;
+function updateStatistics(stats) {
+    const totalVehicles = stats.toplam;
+    const favoriteVehicles = stats.favori;
     const monthlyAdded = Math.floor(Math.random() * 5) + 2;
-    const avgAge = Math.floor(data.reduce((sum, arac) => sum + (2024 - arac.yil), 0) / data.length);
+    const avgAge = Math.floor(stats.ortalama_yas || 0);
 
     document.getElementById('stats-total').textContent = totalVehicles;
     document.getElementById('stats-favorite').textContent = favoriteVehicles;
@@ -235,17 +344,36 @@ function updateStatistics(data) {
     document.getElementById('stats-avg-age').textContent = avgAge;
 }
 
-// Araçları filtrele
+// Araçları filtrele (sunucu tarafı arama)
+let searchTimer = null;
 function filterVehicles(searchTerm) {
-    const cards = document.querySelectorAll('.arac-card');
-    cards.forEach(card => {
-        const text = card.textContent.toLowerCase();
-        if (text.includes(searchTerm)) {
-            card.style.display = 'block';
-        } else {
-            card.style.display = 'none';
+    clearTimeout(searchTimer);
+    searchTimer = setTimeout(() => {
+        const term = searchTerm.trim();
+        if (!term) {
+            araclariListele();
+            return;
         }
-    });
+
+        fetch(`${API_URL}/search?q=${encodeURIComponent(term)}`)
+            .then(response => response.json())
+            .then(data => {
+                const container = document.getElementById('araclar-listesi');
+                if (container) {
+                    // Arama sonuçları tek sayfa; liste sayfalaması geçersiz
+                    container.dataset.liste = '';
+                    dahaFazlaDugmesi(container, null, null);
+                    if (data.length === 0) {
+                        showEmptyState();
+                    } else {
+                        container.innerHTML = data.map(arac => createVehicleCard(arac)).join('');
+                    }
+                }
+            })
+            .catch(error => {
+                console.error('Arama hatası:', error);
+            });
+    }, 250);
 }
 
 // Mesaj göster
@@ -299,27 +427,16 @@ function filtrele(type) {
     event.target.setAttribute('aria-pressed', 'true');
     
     // Filtreleme işlemi
-    let url = API_URL;
+    let url = `${API_URL}?${KART_ALANLARI}`;
     if (type === 'favori') {
-        url += '?favori=true';
+        url += '&favori=true';
     } else if (type === 'normal') {
-        url += '?favori=false';
+        url += '&favori=false';
     }
     
     showLoading();
     
-    fetch(url)
-        .then(response => response.json())
-        .then(data => {
-            const container = document.getElementById('araclar-listesi');
-            if (container) {
-                if (data.length === 0) {
-                    showEmptyState();
-                } else {
-                    container.innerHTML = data.map(arac => createVehicleCard(arac)).join('');
-                }
-            }
-        })
+    sayfaliListele(url, 'araclar-listesi', showEmptyState)
         .catch(error => {
             console.error('Filtreleme hatası:', error);
             showMessage('Filtreleme sırasında hata oluştu.', 'error');
@@ -330,18 +447,7 @@ function filtrele(type) {
 function araclariListele() {
         showLoading();
         
-    fetch(API_URL)
-        .then(response => response.json())
-        .then(data => {
-            const container = document.getElementById('araclar-listesi');
-            if (container) {
-                if (data.length === 0) {
-                    showEmptyState();
-                } else {
-                    container.innerHTML = data.map(arac => createVehicleCard(arac)).join('');
-                }
-            }
-        })
+    sayfaliListele(`${API_URL}?${KART_ALANLARI}`, 'araclar-listesi', showEmptyState)
         .catch(error => {
             console.error('Araç listesi yükleme hatası:', error);
             showMessage('Araçlar yüklenirken hata oluştu.', 'error');
@@ -375,7 +481,7 @@ function createVehicleCard(arac) {
                 <button class="detay-btn" onclick="showDetail(${arac.id})" aria-label="Detayları göster">
                     <i class="fas fa-info"></i>
                 </button>
-                ${currentUser ? `
+                ${currentUser && currentUser.admin ? `
                     <button class="favori-btn ${favoriClass}" onclick="favoriDegistir(${arac.id})" aria-label="Favori durumunu değiştir">
                         <i class="${favoriIcon}"></i>
                     </button>
@@ -466,7 +572,7 @@ async function aracSil(id) {
 
         if (response.ok) {
             showMessage('Araç başarıyla silindi.', 'success');
-            araclariListele();
+            if (!canliGuncelleme) araclariListele();
             
             // Dashboard'u güncelle
             if (currentPage === 'dashboard') {
@@ -490,7 +596,7 @@ async function favoriDegistir(id) {
 
         if (response.ok) {
             showMessage('Favori durumu güncellendi.', 'success');
-            araclariListele();
+            if (!canliGuncelleme) araclariListele();
             
             // Dashboard'u güncelle
             if (currentPage === 'dashboard') {
@@ -0,0 +1,248 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from cache import surum_deposu
+from database import async_engine
+from models import Kullanici, UygulamaDurumu
+
+logger = logging.getLogger(__name__)
+
+# scrypt parametreleri (~16 MB bellek, tek çekirdekte onlarca ms)
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+HASH_ONEKI = "scrypt"
+
+# Parola işlemleri için sınırlı havuz; event loop'u bloklamaz ve aynı anda
+# en fazla bu kadar çekirdeği meşgul eder
+HASH_ISCI_SAYISI = int(os.getenv("AUTH_HASH_WORKERS") or min(4, os.cpu_count() or 1))
+_havuz = ThreadPoolExecutor(max_workers=HASH_ISCI_SAYISI, thread_name_prefix="parola")
+
+# Oturum token'ı geçerlilik süresi (saniye)
+TOKEN_SURESI = int(os.getenv("SESSION_TTL", 12 * 60 * 60))
+# Doğrulanmış token'ların bellekte tutulma süresi (saniye)
+TOKEN_ONBELLEK_TTL = 60.0
+OTURUM_CEREZI = "oturum"
+
+_oturum_anahtari: Optional[bytes] = (
+    os.getenv("SESSION_SECRET").encode() if os.getenv("SESSION_SECRET") else None
+)
+
+
+# --- Parola hash'leme ---
+
+def parola_hashle(parola: str) -> str:
+    """Parolayı rastgele tuz ile scrypt'ten geçir"""
+    tuz = secrets.token_bytes(16)
+    ozet = hashlib.scrypt(parola.encode(), salt=tuz, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P)
+    return "$".join((HASH_ONEKI, str(SCRYPT_N), str(SCRYPT_R), str(SCRYPT_P),
+                     tuz.hex(), ozet.hex()))
+
+
+def parola_dogrula(parola: str, kayitli: Optional[str]) -> bool:
+    """Parolayı kayıtlı hash ile karşılaştır (eski düz metin kayıtlar dahil)"""
+    if not kayitli:
+        return False
+    if not kayitli.startswith(HASH_ONEKI + "$"):
+        return hmac.compare_digest(parola.encode(), kayitli.encode())
+    _, n, r, p, tuz, ozet = kayitli.split("$")
+    hesaplanan = hashlib.scrypt(
+        parola.encode(), salt=bytes.fromhex(tuz), n=int(n), r=int(r), p=int(p)
+    )
+    return hmac.compare_digest(hesaplanan, bytes.fromhex(ozet))
+
+
+def yeniden_hashlenmeli(kayitli: str) -> bool:
+    """Kayıt düz metin ya da eski parametrelerle hash'lenmişse True"""
+    parcalar = kayitli.split("$")
+    return parcalar[:4] != [HASH_ONEKI, str(SCRYPT_N), str(SCRYPT_R), str(SCRYPT_P)]
+
+
+async def ahashle(parola: str) -> str:
+    """parola_hashle() işlemini havuzda çalıştır"""
+    return await asyncio.get_running_loop().run_in_executor(_havuz, parola_hashle, parola)
+
+
+async def adogrula(parola: str, kayitli: Optional[str]) -> bool:
+    """parola_dogrula() işlemini havuzda çalıştır"""
+    return await asyncio.get_running_loop().run_in_executor(
+        _havuz, parola_dogrula, parola, kayitli
+    )
+
+
+# --- İmzalı oturum token'ları ---
+
+def _b64(veri: bytes) -> str:
+    return base64.urlsafe_b64encode(veri).rstrip(b"=").decode()
+
+
+def _b64_coz(metin: str) -> bytes:
+    return base64.urlsafe_b64decode(metin + "=" * (-len(metin) % 4))
+
+
+def _imza(govde: str) -> str:
+    return _b64(hmac.new(_anahtar(), govde.encode(), hashlib.sha256).digest())
+
+
+def _anahtar() -> bytes:
+    global _oturum_anahtari
+    if _oturum_anahtari is None:
+        # Başlangıçta yüklenmediyse (ör. betiklerde) süreçlik anahtar kullan
+        logger.warning("SESSION_SECRET yok; token'lar sadece bu süreçte geçerli")
+        _oturum_anahtari = secrets.token_bytes(32)
+    return _oturum_anahtari
+
+
+async def oturum_anahtari_yukle():
+    """Worker'ların ortak imza anahtarını uygulama_durumu tablosundan al"""
+    global _oturum_anahtari
+    if _oturum_anahtari is not None:
+        return
+    async with async_engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        # İlk worker anahtarı yazar; diğerleri onunkini okur
+        await conn.execute(
+            dialect_insert(UygulamaDurumu)
+            .values(anahtar="oturum_anahtari", deger=secrets.token_hex(32))
+            .on_conflict_do_nothing(index_elements=["anahtar"])
+        )
+        deger = await conn.scalar(
+            select(UygulamaDurumu.deger).filter(UygulamaDurumu.anahtar == "oturum_anahtari")
+        )
+    _oturum_anahtari = bytes.fromhex(deger)
+
+
+def token_olustur(kullanici_id: int, oturum_surumu: int = 0, sure: int = TOKEN_SURESI) -> str:
+    """Kullanıcı id'si, bitiş zamanı ve oturum sürümü içeren imzalı token üret"""
+    govde = _b64(json.dumps([kullanici_id, int(time.time()) + sure, oturum_surumu]).encode())
+    return f"{govde}.{_imza(govde)}"
+
+
+def token_coz(token: str) -> Optional[Tuple[int, int, int]]:
+    """İmzası geçerli ve süresi dolmamış token'dan (kullanici_id, bitis, oturum_surumu) döndür"""
+    try:
+        govde, imza = token.split(".")
+        if not hmac.compare_digest(imza, _imza(govde)):
+            return None
+        # Oturum sürümü olmayan eski token'lar sürüm 0 sayılır
+        kullanici_id, bitis, *oturum_surumu = json.loads(_b64_coz(govde))
+        oturum_surumu = oturum_surumu[0] if oturum_surumu else 0
+    except (ValueError, TypeError, IndexError):
+        return None
+    if bitis <= time.time():
+        return None
+    return kullanici_id, bitis, oturum_surumu
+
+
+_iptaller = None
+
+
+def oturum_iptalleri():
+    """Kullanıcı başına son çıkışın sürümü (worker'lar arası); önbellekteki
+    token'lar bu değer değişince yeniden doğrulanır"""
+    global _iptaller
+    if _iptaller is None:
+        _iptaller = surum_deposu(os.getenv("OTURUM_SURUM_PATH"), "oturum")
+    return _iptaller
+
+
+class TokenOnbellegi:
+    """Doğrulanmış token -> kullanıcı bilgisi; TTL'li ve boyut sınırlı"""
+
+    def __init__(self, ttl: float = TOKEN_ONBELLEK_TTL, max_kayit: int = 10000):
+        self.ttl = ttl
+        self.max_kayit = max_kayit
+        self._lock = threading.Lock()
+        # token -> (kullanıcı, bitiş, kaydedildiğindeki iptal sürümü)
+        self._kayitlar: "OrderedDict[str, Tuple[dict, float, int]]" = OrderedDict()
+
+    def getir(self, token: str) -> Optional[dict]:
+        with self._lock:
+            kayit = self._kayitlar.get(token)
+            if kayit is None:
+                return None
+            kullanici, bitis, iptal = kayit
+            if bitis <= time.monotonic() or oturum_iptalleri().arac(kullanici["id"]) != iptal:
+                del self._kayitlar[token]
+                return None
+            self._kayitlar.move_to_end(token)
+            return kullanici
+
+    def kaydet(self, token: str, kullanici: dict, kalan: float, iptal: int):
+        """iptal: doğrulamadan önce okunan oturum_iptalleri() değeri"""
+        # Token'ın kendi süresinden uzun tutulmaz
+        bitis = time.monotonic() + min(self.ttl, kalan)
+        with self._lock:
+            self._kayitlar[token] = (kullanici, bitis, iptal)
+            self._kayitlar.move_to_end(token)
+            while len(self._kayitlar) > self.max_kayit:
+                self._kayitlar.popitem(last=False)
+
+    def sil(self, token: str):
+        with self._lock:
+            self._kayitlar.pop(token, None)
+
+
+token_onbellegi = TokenOnbellegi()
+
+
+def kullanici_sozlugu(kullanici: Kullanici) -> dict:
+    return {"id": kullanici.id, "kullanici_adi": kullanici.kullanici_adi,
+            "admin": kullanici.admin}
+
+
+async def oturum_kullanicisi(db: AsyncSession, token: Optional[str]) -> Optional[dict]:
+    """Token'ın sahibini döndür; önbellekte varsa veritabanına gitmez"""
+    if not token:
+        return None
+    kullanici = token_onbellegi.getir(token)
+    if kullanici is not None:
+        return kullanici
+    cozulmus = token_coz(token)
+    if cozulmus is None:
+        return None
+    kullanici_id, bitis, oturum_surumu = cozulmus
+    # Veritabanından önce okunur; doğrulama sırasında yapılan çıkış kaçmaz
+    iptal = oturum_iptalleri().arac(kullanici_id)
+    db_kullanici = await db.get(Kullanici, kullanici_id)
+    if db_kullanici is None or db_kullanici.oturum_surumu != oturum_surumu:
+        return None
+    kullanici = kullanici_sozlugu(db_kullanici)
+    token_onbellegi.kaydet(token, kullanici, bitis - time.time(), iptal)
+    return kullanici
+
+
+async def oturumu_kapat(db: AsyncSession, token: Optional[str]):
+    """Token'ı (ve kullanıcının aynı sürümdeki diğer oturumlarını) iptal et"""
+    if not token:
+        return
+    token_onbellegi.sil(token)
+    cozulmus = token_coz(token)
+    if cozulmus is None:
+        return
+    kullanici_id, _, oturum_surumu = cozulmus
+    await db.execute(
+        update(Kullanici)
+        .where(Kullanici.id == kullanici_id, Kullanici.oturum_surumu == oturum_surumu)
+        .values(oturum_surumu=Kullanici.oturum_surumu + 1)
+    )
+    await db.commit()
+    # Diğer worker'ların önbelleğindeki token'lar da yeniden doğrulansın
+    oturum_iptalleri().artir((kullanici_id,))
@@ -0,0 +1,205 @@
+"""API yük testi: gecikme yüzdelikleri, istek/saniye ve tepe RSS (JSON).
+
+Uygulama süreç içinde (httpx ASGITransport) çalıştırılır; ağ katmanı
+ölçüme dahil değildir. Varsayılan veritabanı geçici bir SQLite dosyasıdır,
+PostgreSQL için DATABASE_URL verilebilir (tablo içeriği silinir!).
+
+Çalıştırma (Arac_kategori dizininden, httpx gerekir):
+    python -m benchmarks.api_bench --rows 10000 100000 --concurrency 1 16 64
+    DATABASE_URL=postgresql://... python -m benchmarks.api_bench --rows 1000000
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import time
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+from benchmarks import ortam  # noqa: F401  (ortamı uygulamadan önce hazırlar)
+from benchmarks.ortam import RssOrnekleyici, tepe_rss_mb, yuzdelik
+
+import httpx  # noqa: E402
+from sqlalchemy import delete, func, insert, select  # noqa: E402
+
+import main  # noqa: E402
+from cache import katalog_degisti  # noqa: E402
+from database import engine  # noqa: E402
+from models import Arac  # noqa: E402
+from search import arama_indeksi  # noqa: E402
+
+SEED_PARCA = 10000
+KATEGORILER = ("SUV", "Sedan", "Hatchback", "Pickup", "Sports")
+
+Senaryo = Callable[
+    [httpx.AsyncClient, random.Random, Tuple[int, int]], Awaitable[httpx.Response]
+]
+
+
+def seed(n: int):
+    """Araç tablosunu n satırla yeniden doldur"""
+    with engine.begin() as conn:
+        conn.execute(delete(Arac))
+        for bas in range(0, n, SEED_PARCA):
+            conn.execute(insert(Arac), [
+                {
+                    "isim": f"Araç {i}", "model": f"M{i % 50}", "yil": 2000 + i % 24,
+                    "kategori": KATEGORILER[i % len(KATEGORILER)],
+                    "fiyat": 100000 + i % 900000, "aciklama": "Örnek açıklama",
+                    "favori": i % 3 == 0,
+                    "resim_url": main.VARSAYILAN_RESIM,
+                }
+                for i in range(bas, min(n, bas + SEED_PARCA))
+            ])
+        ilk, son = conn.execute(select(func.min(Arac.id), func.max(Arac.id))).one()
+    # Süreç içi önbellek ve indeksler yeni veriyi görsün
+    katalog_degisti()
+    arama_indeksi.sifirla()
+    return ilk, son
+
+
+async def liste(client, rnd, _):
+    sira = rnd.choice(("id", "yil", "fiyat"))
+    return await client.get("/araclar", params={"limit": 50, "sort": sira})
+
+
+async def liste_ozet(client, rnd, _):
+    sira = rnd.choice(("id", "yil", "fiyat"))
+    return await client.get("/araclar", params={"limit": 50, "sort": sira, "fields": "summary"})
+
+
+async def detay(client, rnd, id_araligi):
+    return await client.get(f"/araclar/{rnd.randint(*id_araligi)}")
+
+
+async def favori(client, rnd, id_araligi):
+    return await client.patch(f"/araclar/{rnd.randint(*id_araligi)}/favori")
+
+
+async def giris(client, rnd, _):
+    return await client.post("/login", json={"kullanici_adi": "admin", "parola": "admin123"})
+
+
+async def analytics(client, rnd, id_araligi):
+    secim = rnd.random()
+    if secim < 0.6:
+        return await client.post(f"/analytics/view/{rnd.randint(*id_araligi)}")
+    if secim < 0.9:
+        return await client.post("/analytics/events", json={"events": [
+            {"type": rnd.choice(("view", "favorite", "detail")),
+             "vehicle_id": rnd.randint(*id_araligi)}
+            for _ in range(20)
+        ]})
+    return await client.get("/analytics/dashboard")
+
+
+SENARYOLAR: Dict[str, Senaryo] = {
+    "list": liste,
+    "list_summary": liste_ozet,
+    "detail": detay,
+    "favori": favori,
+    "login": giris,
+    "analytics": analytics,
+}
+
+
+async def calistir_senaryo(client, senaryo: Senaryo, istek: int, eszamanli: int,
+                           id_araligi, tohum: int) -> dict:
+    gecikmeler: List[float] = []
+    hatalar = 0
+    kalan = iter(range(istek))
+
+    async def isci(no: int):
+        nonlocal hatalar
+        rnd = random.Random(tohum * 1000 + no)
+        for _ in kalan:
+            bas = time.perf_counter()
+            r = await senaryo(client, rnd, id_araligi)
+            gecikmeler.append((time.perf_counter() - bas) * 1000)
+            if r.status_code >= 400:
+                hatalar += 1
+
+    # Tepe RSS bu senaryo boyunca örneklenir (ru_maxrss önceki senaryoları da içerir)
+    with RssOrnekleyici() as rss:
+        bas = time.perf_counter()
+        await asyncio.gather(*(isci(i) for i in range(eszamanli)))
+        sure = time.perf_counter() - bas
+    gecikmeler.sort()
+    return {
+        "requests": istek,
+        "errors": hatalar,
+        "throughput_rps": round(istek / sure, 1),
+        "p50_ms": round(yuzdelik(gecikmeler, 0.50), 3),
+        "p95_ms": round(yuzdelik(gecikmeler, 0.95), 3),
+        "p99_ms": round(yuzdelik(gecikmeler, 0.99), 3),
+        **rss.sonuc(),
+    }
+
+
+async def calistir(args) -> dict:
+    await main.startup_event()
+    sonuclar = []
+    try:
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            # Katalog değişiklikleri (favori senaryosu) admin oturumu ister
+            giris_yaniti = await giris(client, None, None)
+            giris_yaniti.raise_for_status()
+            client.headers["Authorization"] = f"Bearer {giris_yaniti.json()['token']}"
+            for satir in args.rows:
+                seed_bas = time.perf_counter()
+                id_araligi = seed(satir)
+                seed_suresi = time.perf_counter() - seed_bas
+                for ad in args.scenarios:
+                    for eszamanli in args.concurrency:
+                        istek = args.login_requests if ad == "login" else args.requests
+                        # Isınma: bağlantı havuzu, önbellek ve indeksler
+                        await calistir_senaryo(client, SENARYOLAR[ad], min(istek, 50),
+                                               eszamanli, id_araligi, args.seed)
+                        sonuc = await calistir_senaryo(client, SENARYOLAR[ad], istek,
+                                                       eszamanli, id_araligi, args.seed)
+                        sonuclar.append({"rows": satir, "seed_sec": round(seed_suresi, 2),
+                                         "scenario": ad, "concurrency": eszamanli, **sonuc})
+                        print(json.dumps(sonuclar[-1]), file=args.progress)
+    finally:
+        await main.shutdown_event()
+    return {
+        "benchmark": "api",
+        "database": engine.dialect.name,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": sonuclar,
+        "peak_rss_mb": tepe_rss_mb(),
+    }
+
+
+def cli():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SENARYOLAR),
+                        default=list(SENARYOLAR))
+    parser.add_argument("--requests", type=int, default=2000,
+                        help="senaryo başına istek sayısı")
+    parser.add_argument("--login-requests", type=int, default=200,
+                        help="login senaryosu için istek sayısı (parola hash'i yavaştır)")
+    parser.add_argument("--seed", type=int, default=42, help="rastgele tohum")
+    parser.add_argument("--output", help="JSON sonucu bu dosyaya yaz (varsayılan stdout)")
+    parser.add_argument("--quiet", action="store_true", help="ara sonuçları yazdırma")
+    args = parser.parse_args()
+    args.progress = open(os.devnull, "w") if args.quiet else sys.stderr
+
+    rapor = asyncio.run(calistir(args))
+    metin = json.dumps(rapor, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(metin + "\n")
+    else:
+        print(metin)
+
+
+if __name__ == "__main__":
+    cli()
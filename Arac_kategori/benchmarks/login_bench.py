@@ -0,0 +1,87 @@
+"""POST /login eşzamanlılık altında (giriş/saniye) ve event loop gecikmesi.
+
+Girişler sürerken /healthz isteklerinin gecikmesi de ölçülür; parola
+doğrulaması event loop'u bloklarsa bu değer giriş süresine yaklaşır.
+
+Çalıştırma (Arac_kategori dizininden, httpx gerekir):
+    python -m benchmarks.login_bench --concurrency 1 8 32 --requests 200
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks import ortam  # noqa: F401  (ortamı uygulamadan önce hazırlar)
+from benchmarks.ortam import yuzdelik
+
+import httpx  # noqa: E402
+
+import main  # noqa: E402
+from auth import HASH_ISCI_SAYISI  # noqa: E402
+
+
+async def _girisler(client: httpx.AsyncClient, n: int, eszamanli: int):
+    sinir = asyncio.Semaphore(eszamanli)
+
+    async def giris():
+        async with sinir:
+            r = await client.post(
+                "/login", json={"kullanici_adi": "admin", "parola": "admin123"}
+            )
+            assert r.status_code == 200, r.text
+
+    await asyncio.gather(*(giris() for _ in range(n)))
+
+
+async def _yoklama(client: httpx.AsyncClient, dur: asyncio.Event, gecikmeler: list):
+    while not dur.is_set():
+        bas = time.perf_counter()
+        await client.get("/healthz")
+        gecikmeler.append((time.perf_counter() - bas) * 1000)
+        await asyncio.sleep(0.005)
+
+
+async def olc(n: int, eszamanli: int) -> dict:
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await _girisler(client, eszamanli, eszamanli)  # ısınma
+
+        dur, gecikmeler = asyncio.Event(), []
+        yoklama = asyncio.create_task(_yoklama(client, dur, gecikmeler))
+        bas = time.perf_counter()
+        await _girisler(client, n, eszamanli)
+        sure = time.perf_counter() - bas
+        dur.set()
+        await yoklama
+
+    gecikmeler.sort()
+    return {
+        "concurrency": eszamanli,
+        "logins_per_sec": round(n / sure, 1),
+        "healthz_p50_ms": round(yuzdelik(gecikmeler, 0.50), 2),
+        "healthz_p99_ms": round(yuzdelik(gecikmeler, 0.99), 2),
+    }
+
+
+async def calistir(args):
+    await main.startup_event()
+    try:
+        sonuclar = [await olc(args.requests, c) for c in args.concurrency]
+    finally:
+        await main.shutdown_event()
+    print(json.dumps({
+        "benchmark": "login",
+        "hash_workers": HASH_ISCI_SAYISI,
+        "results": sonuclar,
+    }, indent=2))
+
+
+def cli():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200)
+    asyncio.run(calistir(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    cli()
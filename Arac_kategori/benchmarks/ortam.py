@@ -0,0 +1,88 @@
+"""Benchmark betikleri için ortak yardımcılar.
+
+Bu modül uygulama modüllerinden önce içe aktarılmalıdır: DATABASE_URL
+verilmemişse geçici bir SQLite veritabanı ve paylaşımlı bellek dosyaları
+ayarlar, istemci başına hız sınırını kapatır ve Arac_kategori dizinini
+import yoluna ekler.
+"""
+import os
+import resource
+import sys
+import tempfile
+import threading
+from typing import List, Optional
+
+_DIZIN = tempfile.mkdtemp(prefix="arac_bench_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_DIZIN, 'bench.db')}")
+os.environ.setdefault("ANALYTICS_SHM_PATH", os.path.join(_DIZIN, "analytics.bin"))
+os.environ.setdefault("KATALOG_SURUM_PATH", os.path.join(_DIZIN, "katalog.bin"))
+# Tüm istekler tek istemciden gelir; istemci başına hız sınırı ölçümü bozmasın
+os.environ.setdefault("ADMISSION_ANALYTICS_RATE", "0")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def yuzdelik(sirali: List[float], oran: float) -> float:
+    """Sıralı listeden en yakın sıra yöntemiyle yüzdelik değer"""
+    if not sirali:
+        return 0.0
+    return sirali[min(len(sirali) - 1, max(0, round(oran * len(sirali)) - 1))]
+
+
+def tepe_rss_mb() -> float:
+    """Sürecin şimdiye kadarki en yüksek RSS değeri (MB)"""
+    tepe = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux KB, macOS byte döndürür
+    return round(tepe / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def guncel_rss_mb() -> Optional[float]:
+    """Sürecin şu anki RSS değeri (MB); /proc olmayan sistemlerde None"""
+    try:
+        with open("/proc/self/statm") as f:
+            sayfa = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return sayfa * resource.getpagesize() / (1024 * 1024)
+
+
+class RssOrnekleyici:
+    """Bir ölçüm boyunca RSS'i arka planda örnekleyip o ölçümün tepesini verir.
+
+    ru_maxrss süreç boyunca sadece artar; ilk senaryodan sonrakiler için
+    sadece o ana kadarki en yüksek değeri gösterir. /proc yoksa ru_maxrss
+    artışına düşülür (tepe bu durumda süreç geneli kalır).
+    """
+
+    def __init__(self, aralik: float = 0.01):
+        self.aralik = aralik
+        self._dur = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.baslangic = self.tepe = 0.0
+        self._proc = guncel_rss_mb() is not None
+
+    def _ornekle(self):
+        while not self._dur.wait(self.aralik):
+            self.tepe = max(self.tepe, guncel_rss_mb())
+
+    def __enter__(self):
+        if self._proc:
+            self.baslangic = self.tepe = guncel_rss_mb()
+            self._thread = threading.Thread(target=self._ornekle, daemon=True)
+            self._thread.start()
+        else:
+            self.baslangic = tepe_rss_mb()
+        return self
+
+    def __exit__(self, *_):
+        if self._thread is not None:
+            self._dur.set()
+            self._thread.join()
+            self.tepe = max(self.tepe, guncel_rss_mb())
+        else:
+            self.tepe = tepe_rss_mb()
+
+    def sonuc(self) -> dict:
+        return {
+            "peak_rss_mb": round(self.tepe, 1),
+            "rss_delta_mb": round(self.tepe - self.baslangic, 1),
+        }
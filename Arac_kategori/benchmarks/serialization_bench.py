@@ -0,0 +1,85 @@
+"""GET /araclar serileştirme yolu karşılaştırması (satır/saniye).
+
+Çalıştırma (Arac_kategori dizininden):
+    python -m benchmarks.serialization_bench --rows 10000 100000
+"""
+import argparse
+import json
+import time
+from typing import List
+
+from benchmarks import ortam  # noqa: F401  (ortamı uygulamadan önce hazırlar)
+
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import delete, insert, select  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from database import Base, engine  # noqa: E402
+from models import Arac  # noqa: E402
+from schemas import AracResponse  # noqa: E402
+from serialization import ARAC_KOLONLARI, satirlari_kodla  # noqa: E402
+
+_adapter = TypeAdapter(List[AracResponse])
+
+
+def seed(n: int):
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(delete(Arac))
+        conn.execute(insert(Arac), [
+            {
+                "isim": f"Araç {i}", "model": f"M{i % 50}", "yil": 2000 + i % 24,
+                "kategori": ("SUV", "Sedan", "Hatchback", "Pickup")[i % 4],
+                "fiyat": 100000 + i, "aciklama": "Örnek açıklama " * 4,
+                "favori": i % 3 == 0,
+                "resim_url": "https://images.unsplash.com/photo-1555215695-3004980ad54e?w=400&h=300&fit=crop",
+            }
+            for i in range(n)
+        ])
+
+
+def eski_yol() -> bytes:
+    """ORM nesneleri + response_model doğrulaması + JSON"""
+    with Session(engine) as db:
+        araclar = db.scalars(select(Arac)).all()
+        return _adapter.dump_json(_adapter.validate_python(araclar, from_attributes=True))
+
+
+def yeni_yol() -> bytes:
+    """Kolon projeksiyonu + doğrulamasız hızlı kodlama"""
+    with Session(engine) as db:
+        return satirlari_kodla(db.execute(select(*ARAC_KOLONLARI)).all())
+
+
+def olc(fonk, n: int, tekrar: int) -> float:
+    en_iyi = float("inf")
+    for _ in range(tekrar):
+        bas = time.perf_counter()
+        fonk()
+        en_iyi = min(en_iyi, time.perf_counter() - bas)
+    return n / en_iyi
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    sonuclar = []
+    for n in args.rows:
+        seed(n)
+        assert json.loads(eski_yol()) == json.loads(yeni_yol())
+        once = olc(eski_yol, n, args.repeat)
+        sonra = olc(yeni_yol, n, args.repeat)
+        sonuclar.append({
+            "rows": n,
+            "before_rows_per_sec": round(once),
+            "after_rows_per_sec": round(sonra),
+            "speedup": round(sonra / once, 2),
+        })
+    print(json.dumps({"benchmark": "serialization", "results": sonuclar}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+
+
+def batch_dogrula(
+    items: List[Dict[str, Any]], schema: Type[BaseModel], id_gerekli: bool = False
+) -> Tuple[List[Tuple[int, Optional[int], BaseModel]], List[dict]]:
+    """Her öğeyi şemaya göre doğrula; geçerli öğeleri ve öğe bazlı hataları ayır"""
+    gecerli, hatalar = [], []
+    for index, item in enumerate(items):
+        veri = dict(item)
+        arac_id = veri.pop("id", None)
+        # Hata kaydındaki id Optional[int]; "abc" gibi değerler yanıtı bozmasın
+        if not isinstance(arac_id, int) or isinstance(arac_id, bool):
+            arac_id = None
+        if id_gerekli and arac_id is None:
+            hatalar.append({"index": index, "id": None, "errors": [
+                {"loc": ["id"], "msg": "Araç id'si gerekli", "type": "missing"}
+            ]})
+            continue
+        try:
+            gecerli.append((index, arac_id, schema.model_validate(veri)))
+        except ValidationError as e:
+            hatalar.append({
+                "index": index,
+                "id": arac_id,
+                "errors": e.errors(include_url=False, include_context=False),
+            })
+    return gecerli, hatalar
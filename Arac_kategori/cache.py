@@ -0,0 +1,253 @@
+import hashlib
+import mmap
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import Request, Response
+
+from counters import fcntl, varsayilan_shm_yolu
+
+
+class _YerelSurum:
+    """Tek süreçlik katalog sürümü"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._genel = 0
+        self._araclar: Dict[int, int] = {}
+
+    def genel(self) -> int:
+        return self._genel
+
+    def arac(self, arac_id: int) -> int:
+        return self._araclar.get(arac_id, 0)
+
+    def artir(self, arac_idleri: Iterable[int] = ()):
+        with self._lock:
+            self._genel += 1
+            for arac_id in arac_idleri:
+                self._araclar[arac_id] = self._genel
+
+
+class _PaylasimliSurum:
+    """Worker'lar arası paylaşılan katalog sürümü (mmap).
+
+    Hücre 0 genel sürümdür; diğer hücreler arac_id % slot ile eşlenen
+    araçların son değiştiği sürümü tutar. Çakışmalar sadece fazladan
+    geçersiz kılmaya yol açar.
+    """
+
+    def __init__(self, yol: str, slot: int = 4096):
+        self.slot = slot
+        self._fd = os.open(yol, os.O_RDWR | os.O_CREAT, 0o600)
+        boyut = (1 + slot) * 8
+        if os.fstat(self._fd).st_size < boyut:
+            os.ftruncate(self._fd, boyut)
+        self._mv = memoryview(mmap.mmap(self._fd, boyut)).cast("q")
+
+    def genel(self) -> int:
+        return self._mv[0]
+
+    def arac(self, arac_id: int) -> int:
+        return self._mv[1 + arac_id % self.slot]
+
+    def artir(self, arac_idleri: Iterable[int] = ()):
+        fcntl.lockf(self._fd, fcntl.LOCK_EX)
+        try:
+            self._mv[0] += 1
+            for arac_id in arac_idleri:
+                self._mv[1 + arac_id % self.slot] = self._mv[0]
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN)
+
+
+def surum_deposu(yol: Optional[str], ad: str):
+    """fcntl varsa worker'lar arası paylaşılan, yoksa süreçlik sürüm deposu"""
+    if fcntl is not None:
+        return _PaylasimliSurum(yol or varsayilan_shm_yolu(ad))
+    return _YerelSurum()
+
+
+_surum = None
+
+
+def _surumler():
+    global _surum
+    if _surum is None:
+        _surum = surum_deposu(os.getenv("KATALOG_SURUM_PATH"), "katalog")
+    return _surum
+
+
+def katalog_surumu() -> int:
+    """Araç tablosunun mevcut sürümünü döndür"""
+    return _surumler().genel()
+
+
+def arac_surumu(arac_id: int) -> int:
+    """Aracın son değiştiği katalog sürümünü döndür"""
+    return _surumler().arac(arac_id)
+
+
+def katalog_degisti(arac_id: Optional[int] = None):
+    """Araç tablosu değiştiğinde çağrılır; sürüme bağlı önbellekleri geçersiz kılar"""
+    _surumler().artir(() if arac_id is None else (arac_id,))
+
+
+def katalog_degisti_toplu(arac_idleri: Iterable[int]):
+    """Birden fazla araç için sürümü tek seferde artır"""
+    _surumler().artir(arac_idleri)
+
+
+# Katalog sürümünün bu süreçte ilk görüldüğü an
+_gorulen_surum: Tuple[int, float] = (-1, 0.0)
+
+
+def surum_yasi(surum: int) -> float:
+    """Sürümün bu süreçte ilk görülmesinden beri geçen süre (saniye).
+
+    Yazma anından hiçbir zaman önce başlamaz; replika gecikmesi için
+    güvenli bir alt sınırdır.
+    """
+    global _gorulen_surum
+    onceki, zaman = _gorulen_surum
+    simdi = time.monotonic()
+    if surum != onceki:
+        _gorulen_surum = (surum, simdi)
+        return 0.0
+    return simdi - zaman
+
+
+class SurumluDeger:
+    """Katalog sürümüne bağlı, TTL'li tek değerlik önbellek"""
+
+    def __init__(self, ttl: float = 60.0):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._deger: Any = None
+        self._surum = -1
+        self._zaman = 0.0
+
+    def _oku(self) -> Tuple[bool, Any, int, float]:
+        surum = katalog_surumu()
+        simdi = time.monotonic()
+        with self._lock:
+            gecerli = self._surum == surum and simdi - self._zaman < self.ttl
+            return gecerli, self._deger, surum, simdi
+
+    def _yaz(self, deger: Any, surum: int, zaman: float, gecikme_payi: float):
+        if gecikme_payi and surum_yasi(surum) < gecikme_payi:
+            # Replikadan okunan değer yeni yazmayı içermeyebilir; saklanmaz
+            return
+        with self._lock:
+            self._deger, self._surum, self._zaman = deger, surum, zaman
+
+    def getir(self, hesapla: Callable[[], Any], gecikme_payi: float = 0.0) -> Any:
+        """Önbellek geçerliyse değeri döndür, değilse yeniden hesapla"""
+        gecerli, deger, surum, simdi = self._oku()
+        if not gecerli:
+            deger = hesapla()
+            self._yaz(deger, surum, simdi, gecikme_payi)
+        return deger
+
+    async def agetir(self, hesapla: Callable[[], Awaitable[Any]],
+                     gecikme_payi: float = 0.0) -> Any:
+        """getir() ile aynı; hesaplama bir coroutine döndürür"""
+        gecerli, deger, surum, simdi = self._oku()
+        if not gecerli:
+            deger = await hesapla()
+            self._yaz(deger, surum, simdi, gecikme_payi)
+        return deger
+
+
+class OnbellekKaydi:
+    """Önceden serileştirilmiş bir yanıt"""
+
+    __slots__ = ("govde", "etag", "basliklar", "idler", "surum", "arac_id")
+
+    def __init__(self, govde: bytes, basliklar: Dict[str, str], idler: List[int],
+                 surum: int, arac_id: Optional[int], etag: Optional[str] = None):
+        self.govde = govde
+        self.etag = etag or '"%s"' % hashlib.blake2b(govde, digest_size=12).hexdigest()
+        self.basliklar = basliklar
+        self.idler = idler
+        self.surum = surum
+        self.arac_id = arac_id
+
+    def gecerli(self) -> bool:
+        if self.arac_id is not None:
+            # Tekil kayıt sadece o araç değiştiğinde geçersiz olur
+            return arac_surumu(self.arac_id) <= self.surum
+        return katalog_surumu() == self.surum
+
+    def yanit(self, request: Request) -> Response:
+        """İstemcide güncel kopya varsa 304, yoksa gövdeyi döndür"""
+        # no-cache: tarayıcı saklayabilir ama her seferinde ETag ile doğrular
+        basliklar = dict(self.basliklar, ETag=self.etag, **{"Cache-Control": "no-cache"})
+        if etag_eslesiyor(request.headers.get("if-none-match"), self.etag):
+            return Response(status_code=304, headers=basliklar)
+        return Response(self.govde, media_type="application/json", headers=basliklar)
+
+
+def etag_eslesiyor(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for aday in if_none_match.split(","):
+        aday = aday.strip()
+        if aday == "*" or aday.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class YanitOnbellegi:
+    """Boyut sınırlı, LRU tahliyeli, katalog sürümüyle geçersiz kılınan yanıt önbelleği"""
+
+    def __init__(self, max_kayit: int = 512, max_bayt: int = 32 * 1024 * 1024):
+        self.max_kayit = max_kayit
+        self.max_bayt = max_bayt
+        self._lock = threading.Lock()
+        self._kayitlar: "OrderedDict[str, OnbellekKaydi]" = OrderedDict()
+        self._bayt = 0
+
+    @staticmethod
+    def anahtar(request: Request) -> str:
+        """Yol + sıralanmış sorgu parametreleri"""
+        parametreler = sorted(request.query_params.multi_items())
+        return request.url.path + "?" + "&".join(f"{k}={v}" for k, v in parametreler)
+
+    def getir(self, anahtar: str) -> Optional[OnbellekKaydi]:
+        with self._lock:
+            kayit = self._kayitlar.get(anahtar)
+            if kayit is None:
+                return None
+            if not kayit.gecerli():
+                self._cikar(anahtar)
+                return None
+            self._kayitlar.move_to_end(anahtar)
+            return kayit
+
+    def kaydet(self, anahtar: str, kayit: OnbellekKaydi,
+               gecikme_payi: float = 0.0) -> OnbellekKaydi:
+        """Kaydı sakla; sürüm gecikme_payi'ndan yeniyse (replika okuması) saklamaz"""
+        if len(kayit.govde) > self.max_bayt:
+            return kayit
+        if gecikme_payi and surum_yasi(kayit.surum) < gecikme_payi:
+            # Replika yeni yazmayı henüz almamış olabilir; eski veri önbelleğe girmesin
+            return kayit
+        with self._lock:
+            if anahtar in self._kayitlar:
+                self._cikar(anahtar)
+            self._kayitlar[anahtar] = kayit
+            self._bayt += len(kayit.govde)
+            while len(self._kayitlar) > self.max_kayit or self._bayt > self.max_bayt:
+                self._cikar(next(iter(self._kayitlar)))
+        return kayit
+
+    def _cikar(self, anahtar: str):
+        kayit = self._kayitlar.pop(anahtar)
+        self._bayt -= len(kayit.govde)
+
+
+yanit_onbellegi = YanitOnbellegi()
@@ -0,0 +1,421 @@
+import hashlib
+import heapq
+import logging
+import mmap
+import operator
+import os
+import struct
+import tempfile
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: paylaşımlı backend kullanılamaz
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Sayaç tutulan olay tipleri (sıra dosya düzeninin parçasıdır)
+TIPLER = ("view", "favorite", "detail")
+
+
+class SozlukSayaclar:
+    """Tek süreçlik, sözlük tabanlı sayaçlar"""
+
+    geri_yukle_gerekli = True
+
+    def __init__(self):
+        self._arac = {tip: {} for tip in TIPLER}
+        self._toplam = [0] * len(TIPLER)
+        self._gun: Dict[int, List[int]] = {}
+
+    def artir(self, tip: int, arac_idleri: Iterable[int]) -> int:
+        sayaclar = self._arac[TIPLER[tip]]
+        adet = 0
+        for arac_id in arac_idleri:
+            sayaclar[arac_id] = sayaclar.get(arac_id, 0) + 1
+            adet += 1
+        self._toplam[tip] += adet
+        return adet
+
+    def gun_artir(self, gun: date, tip: int, adet: int):
+        satir = self._gun.setdefault(gun.toordinal(), [0] * len(TIPLER))
+        satir[tip] += adet
+
+    def arac(self, arac_id: int) -> List[int]:
+        return [self._arac[tip].get(arac_id, 0) for tip in TIPLER]
+
+    def deger(self, tip: int, arac_id: int) -> int:
+        return self._arac[TIPLER[tip]].get(arac_id, 0)
+
+    def toplam(self, tip: int) -> int:
+        return self._toplam[tip]
+
+    def gun(self, gun: date) -> List[int]:
+        return list(self._gun.get(gun.toordinal(), [0] * len(TIPLER)))
+
+    def en_cok(self, tip: int, k: int) -> List[Tuple[int, int]]:
+        return heapq.nlargest(k, self._arac[TIPLER[tip]].items(), key=lambda x: x[1])
+
+    def yukle(self, tip: int, arac_id: int, adet: int):
+        sayaclar = self._arac[TIPLER[tip]]
+        self._toplam[tip] += adet - sayaclar.get(arac_id, 0)
+        sayaclar[arac_id] = adet
+
+    def gun_yukle(self, gun: date, tip: int, adet: int):
+        self._gun.setdefault(gun.toordinal(), [0] * len(TIPLER))[tip] = adet
+
+    def adaylari_yaz(self, tip: int, arac_idleri: Iterable[int]):
+        # Tek süreç: yerel top-K zaten tüm artışları görür
+        pass
+
+    def adaylar(self, tip: int) -> List[int]:
+        return []
+
+
+class PaylasimliSayaclar:
+    """Aynı makinedeki tüm worker'ların paylaştığı mmap tabanlı sayaçlar.
+
+    Dosya düzeni: başlık + (serit_sayisi + 1) şerit. Her worker bir şeridi
+    fcntl kilidiyle sahiplenir ve sadece kendi şeridine yazar; okumada tüm
+    şeritler toplanır. Son şerit başlangıçta rollup tablolarından yüklenen
+    değerler içindir. Her şerit:
+      - tip başına toplam, en büyük arac_id ve dolu taşkın yuvası (başlık),
+      - [tip][kapasite] araç sayaçları,
+      - [gun_sayisi][1 + tip] günlük halka tampon (ilk hücre gün ordinal'i),
+      - [taskin_kapasite][1 + tip] kapasite dışı id'ler için açık adresli
+        hash tablosu (ilk hücre arac_id, 0 boş yuva),
+      - [tip][aday_sayisi] şeridin sahibinin yerel top-K aday id'leri.
+    Taşkın tablosu en fazla %75 doldurulur ki aramalar hep boş yuvada dursun;
+    dolduğunda yeni id'ler sadece toplama yansır ve uyarı loglanır.
+
+    Her süreç yazdığı araçların güncel toplamlarını yerel top-K'ya verir; bir
+    aracın son artışını yapan süreç onun son değerini gördüğünden, şeritlerdeki
+    adayların birleşimi gerçek top-K'yı içerir. Okuma sadece bu adaylara bakar.
+    """
+
+    SIHIRLI = b"ARACSAY3"
+    BASLIK = struct.Struct("<8sqqqqqqq")
+    BASLIK_BOYUTU = 64
+
+    def __init__(self, yol: str, kapasite: int = 65536, serit_sayisi: int = 16,
+                 gun_sayisi: int = 400, taskin_kapasite: int = 4096,
+                 aday_sayisi: int = 5):
+        if fcntl is None:
+            raise RuntimeError("Paylaşımlı sayaçlar fcntl gerektirir")
+        self.yol = yol
+        self.kapasite = kapasite
+        self.serit_sayisi = serit_sayisi
+        self.gun_sayisi = gun_sayisi
+        self.taskin_kapasite = taskin_kapasite
+        self.aday_sayisi = aday_sayisi
+        self._taskin_siniri = taskin_kapasite * 3 // 4
+        t = len(TIPLER)
+        self._dolu_hucresi = 2 * t
+        self._serit_basligi = 2 * t + 1
+        self._gun_ofseti = self._serit_basligi + t * kapasite
+        self._taskin_ofseti = self._gun_ofseti + gun_sayisi * (1 + t)
+        self._aday_ofseti = self._taskin_ofseti + taskin_kapasite * (1 + t)
+        self._serit_boyu = self._aday_ofseti + t * aday_sayisi
+        boyut = self.BASLIK_BOYUTU + (serit_sayisi + 1) * self._serit_boyu * 8
+        duzen = (kapasite, serit_sayisi, gun_sayisi, t, taskin_kapasite, aday_sayisi)
+
+        self._fd = os.open(yol, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, 0)
+        try:
+            mevcut = os.fstat(self._fd).st_size
+            eski = os.pread(self._fd, self.BASLIK.size, 0) if mevcut >= self.BASLIK.size else b""
+            if not eski or eski[:8] != self.SIHIRLI:
+                # Boş ya da eski sürüm dosya: sıfırlanmış yeni düzenle baştan kur
+                os.ftruncate(self._fd, 0)
+                os.ftruncate(self._fd, boyut)
+                mevcut = 0
+            elif self.BASLIK.unpack(eski)[1:7] != duzen:
+                raise RuntimeError(f"{yol} farklı bir sayaç düzeniyle oluşturulmuş")
+            self._mm = mmap.mmap(self._fd, boyut)
+            yuklendi = self.BASLIK.unpack_from(self._mm, 0)[7] if mevcut else 0
+            # Rollup yüklemesini sadece dosyayı ilk kuran süreç yapar
+            self.geri_yukle_gerekli = not yuklendi
+            if not yuklendi:
+                self.BASLIK.pack_into(self._mm, 0, self.SIHIRLI, *duzen, 1)
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, 0)
+
+        self._mv = memoryview(self._mm)[self.BASLIK_BOYUTU:].cast("q")
+        self._serit, self._kilitli = self._serit_sahiplen()
+        self._taskin_uyarildi = False
+
+    def _serit_sahiplen(self) -> Tuple[int, bool]:
+        """Boşta olan bir şeridi kilitle; hepsi doluysa paylaşımlı yaz"""
+        for serit in range(self.serit_sayisi):
+            try:
+                fcntl.lockf(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB, 1, 1 + serit)
+                return serit, False
+            except OSError:
+                continue
+        return os.getpid() % self.serit_sayisi, True
+
+    def _ofset(self, serit: int) -> int:
+        return serit * self._serit_boyu
+
+    def _yaz(self, islem):
+        if not self._kilitli:
+            return islem()
+        kilit = 1 + self._serit
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, kilit)
+        try:
+            return islem()
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, kilit)
+
+    def _taskin_yuvasi(self, serit: int, arac_id: int, ekle: bool) -> Optional[int]:
+        """Şeridin taşkın tablosunda aracın yuvasını bul; ekle ise boş yuvayı sahiplen"""
+        mv, n, genislik = self._mv, self.taskin_kapasite, 1 + len(TIPLER)
+        taban = self._ofset(serit)
+        bas = taban + self._taskin_ofseti
+        i = arac_id % n
+        while True:
+            hucre = bas + i * genislik
+            anahtar = mv[hucre]
+            if anahtar == arac_id:
+                return hucre
+            if anahtar == 0:
+                break
+            i = (i + 1) % n
+        if not ekle:
+            return None
+        if mv[taban + self._dolu_hucresi] >= self._taskin_siniri:
+            if not self._taskin_uyarildi:
+                self._taskin_uyarildi = True
+                logger.warning(
+                    "%s taşkın tablosu dolu; %s ve sonraki id'ler sadece toplama "
+                    "yansıyor (ANALYTICS_SHM_KAPASITE/ANALYTICS_SHM_TASKIN artırılmalı)",
+                    self.yol, arac_id,
+                )
+            return None
+        mv[taban + self._dolu_hucresi] += 1
+        mv[hucre] = arac_id
+        return hucre
+
+    def _taskin_degerleri(self, tip: int) -> Dict[int, int]:
+        """Tüm şeritlerin taşkın tablolarındaki sayaçları topla"""
+        mv, genislik = self._mv, 1 + len(TIPLER)
+        sonuc: Dict[int, int] = {}
+        for serit in range(self.serit_sayisi + 1):
+            if not mv[self._ofset(serit) + self._dolu_hucresi]:
+                continue
+            bas = self._ofset(serit) + self._taskin_ofseti
+            for hucre in range(bas, bas + self.taskin_kapasite * genislik, genislik):
+                arac_id = mv[hucre]
+                if arac_id and mv[hucre + 1 + tip]:
+                    sonuc[arac_id] = sonuc.get(arac_id, 0) + mv[hucre + 1 + tip]
+        return sonuc
+
+    def _artir(self, serit: int, tip: int, arac_idleri: Iterable[int]) -> int:
+        mv, kapasite = self._mv, self.kapasite
+        taban = self._ofset(serit)
+        dizi = taban + self._serit_basligi + tip * kapasite
+        en_buyuk = mv[taban + len(TIPLER) + tip]
+        adet = 0
+        for arac_id in arac_idleri:
+            if 0 <= arac_id < kapasite:
+                mv[dizi + arac_id] += 1
+                if arac_id > en_buyuk:
+                    en_buyuk = arac_id
+            else:
+                hucre = self._taskin_yuvasi(serit, arac_id, True)
+                if hucre is not None:
+                    mv[hucre + 1 + tip] += 1
+            adet += 1
+        mv[taban + tip] += adet
+        mv[taban + len(TIPLER) + tip] = en_buyuk
+        return adet
+
+    def artir(self, tip: int, arac_idleri: Iterable[int]) -> int:
+        return self._yaz(lambda: self._artir(self._serit, tip, arac_idleri))
+
+    def _gun_hucresi(self, serit: int, ordinal: int) -> int:
+        return self._ofset(serit) + self._gun_ofseti + (ordinal % self.gun_sayisi) * (1 + len(TIPLER))
+
+    def _gun_yaz(self, serit: int, gun: date, tip: int, adet: int, ekle: bool):
+        ordinal = gun.toordinal()
+        hucre = self._gun_hucresi(serit, ordinal)
+        mv = self._mv
+        if mv[hucre] != ordinal:
+            if mv[hucre] > ordinal:
+                # Halkanın gerisinde kalan eski gün; daha yeni günü silmesin
+                return
+            # Halka tamponda eski bir gün var; yeni gün için sıfırla
+            for i in range(1, 1 + len(TIPLER)):
+                mv[hucre + i] = 0
+            mv[hucre] = ordinal
+        if ekle:
+            mv[hucre + 1 + tip] += adet
+        else:
+            mv[hucre + 1 + tip] = adet
+
+    def gun_artir(self, gun: date, tip: int, adet: int):
+        self._yaz(lambda: self._gun_yaz(self._serit, gun, tip, adet, True))
+
+    def _taskin_arac(self, arac_id: int) -> List[int]:
+        sonuc = [0] * len(TIPLER)
+        for serit in range(self.serit_sayisi + 1):
+            hucre = self._taskin_yuvasi(serit, arac_id, False)
+            if hucre is not None:
+                for tip in range(len(TIPLER)):
+                    sonuc[tip] += self._mv[hucre + 1 + tip]
+        return sonuc
+
+    def arac(self, arac_id: int) -> List[int]:
+        if not 0 <= arac_id < self.kapasite:
+            return self._taskin_arac(arac_id)
+        sonuc = []
+        for tip in range(len(TIPLER)):
+            toplam = 0
+            for serit in range(self.serit_sayisi + 1):
+                toplam += self._mv[self._ofset(serit) + self._serit_basligi + tip * self.kapasite + arac_id]
+            sonuc.append(toplam)
+        return sonuc
+
+    def deger(self, tip: int, arac_id: int) -> int:
+        if not 0 <= arac_id < self.kapasite:
+            return self._taskin_arac(arac_id)[tip]
+        mv = self._mv
+        konum = self._serit_basligi + tip * self.kapasite + arac_id
+        return sum(mv[self._ofset(serit) + konum] for serit in range(self.serit_sayisi + 1))
+
+    def toplam(self, tip: int) -> int:
+        # Şerit başlığındaki toplam kapasite dışı id'leri de içerir
+        toplam = 0
+        for serit in range(self.serit_sayisi + 1):
+            toplam += self._mv[self._ofset(serit) + tip]
+        return toplam
+
+    def gun(self, gun: date) -> List[int]:
+        ordinal = gun.toordinal()
+        sonuc = [0] * len(TIPLER)
+        for serit in range(self.serit_sayisi + 1):
+            hucre = self._gun_hucresi(serit, ordinal)
+            if self._mv[hucre] == ordinal:
+                for tip in range(len(TIPLER)):
+                    sonuc[tip] += self._mv[hucre + 1 + tip]
+        return sonuc
+
+    def en_cok(self, tip: int, k: int) -> List[Tuple[int, int]]:
+        mv = self._mv
+        n = 0
+        for serit in range(self.serit_sayisi + 1):
+            n = max(n, mv[self._ofset(serit) + len(TIPLER) + tip] + 1)
+        toplamlar = [0] * n
+        for serit in range(self.serit_sayisi + 1):
+            bas = self._ofset(serit) + self._serit_basligi + tip * self.kapasite
+            toplamlar = list(map(operator.add, toplamlar, mv[bas:bas + n]))
+        adaylar = [(i, v) for i, v in enumerate(toplamlar) if v]
+        adaylar.extend(self._taskin_degerleri(tip).items())
+        return heapq.nlargest(k, adaylar, key=lambda x: x[1])
+
+    def yukle(self, tip: int, arac_id: int, adet: int):
+        taban = self._ofset(self.serit_sayisi)
+        mv = self._mv
+        mv[taban + tip] += adet
+        if 0 <= arac_id < self.kapasite:
+            mv[taban + self._serit_basligi + tip * self.kapasite + arac_id] += adet
+            en_buyuk = taban + len(TIPLER) + tip
+            mv[en_buyuk] = max(mv[en_buyuk], arac_id)
+        else:
+            hucre = self._taskin_yuvasi(self.serit_sayisi, arac_id, True)
+            if hucre is not None:
+                mv[hucre + 1 + tip] += adet
+
+    def gun_yukle(self, gun: date, tip: int, adet: int):
+        self._gun_yaz(self.serit_sayisi, gun, tip, adet, False)
+
+    def _adaylari_yaz(self, tip: int, arac_idleri: List[int]):
+        bas = self._ofset(self._serit) + self._aday_ofseti + tip * self.aday_sayisi
+        idler = arac_idleri[:self.aday_sayisi]
+        for i in range(self.aday_sayisi):
+            self._mv[bas + i] = idler[i] if i < len(idler) else 0
+
+    def adaylari_yaz(self, tip: int, arac_idleri: Iterable[int]):
+        """Bu sürecin top-K aday id'lerini kendi şeridinde yayınla"""
+        idler = list(arac_idleri)
+        self._yaz(lambda: self._adaylari_yaz(tip, idler))
+
+    def adaylar(self, tip: int) -> List[int]:
+        """Tüm şeritlerde yayınlanmış top-K aday id'leri (tekrarsız)"""
+        mv, k = self._mv, self.aday_sayisi
+        idler = set()
+        for serit in range(self.serit_sayisi + 1):
+            bas = self._ofset(serit) + self._aday_ofseti + tip * k
+            idler.update(mv[bas:bas + k])
+        idler.discard(0)
+        return list(idler)
+
+
+class EnCokTakibi:
+    """Sadece artan sayaçlar için artımlı top-K.
+
+    Küme dışındaki hiçbir aracın sayacı kümedeki en küçük değeri geçemez;
+    bir araç bu eşiği aşınca en küçük eleman kümeden çıkar. Güncelleme
+    çoğunlukla O(1), en küçük eleman değiştiğinde O(K) tutar.
+    """
+
+    def __init__(self, k: int):
+        self.k = k
+        self._kume: Dict[int, int] = {}
+        self._en_kucuk: Optional[int] = None
+        self._esik = -1
+
+    def _en_kucugu_bul(self):
+        if len(self._kume) < self.k:
+            # Küme dolana kadar her araç girebilir
+            self._en_kucuk, self._esik = None, -1
+        else:
+            self._en_kucuk = min(self._kume, key=self._kume.__getitem__)
+            self._esik = self._kume[self._en_kucuk]
+
+    def guncelle(self, arac_id: int, deger: int) -> bool:
+        """Aracın güncel sayacını bildir; küme üyeliği değiştiyse True"""
+        kume = self._kume
+        if arac_id in kume:
+            kume[arac_id] = deger
+            if arac_id == self._en_kucuk:
+                self._en_kucugu_bul()
+            return False
+        if deger > self._esik:
+            if self._en_kucuk is not None:
+                del kume[self._en_kucuk]
+            kume[arac_id] = deger
+            self._en_kucugu_bul()
+            return True
+        return False
+
+    def kur(self, ciftler: Iterable[Tuple[int, int]]):
+        """Kümeyi (arac_id, sayaç) çiftlerinden baştan oluştur"""
+        self._kume = dict(heapq.nlargest(self.k, ciftler, key=lambda x: x[1]))
+        self._en_kucugu_bul()
+
+    def idler(self) -> List[int]:
+        return list(self._kume)
+
+
+def varsayilan_shm_yolu(ad: str = "analytics") -> str:
+    """Uygulama dizinine özgü paylaşımlı bellek dosyası yolu"""
+    dizin = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    anahtar = hashlib.sha1(os.path.abspath(os.getcwd()).encode()).hexdigest()[:12]
+    return os.path.join(dizin, f"arac_{ad}_{anahtar}.bin")
+
+
+def sayac_olustur(aday_sayisi: int = 5):
+    """ANALYTICS_BACKEND ortam değişkenine göre sayaç backend'ini kur"""
+    backend = os.getenv("ANALYTICS_BACKEND", "shm" if fcntl else "dict")
+    if backend == "dict":
+        return SozlukSayaclar()
+    return PaylasimliSayaclar(
+        os.getenv("ANALYTICS_SHM_PATH") or varsayilan_shm_yolu(),
+        kapasite=int(os.getenv("ANALYTICS_SHM_KAPASITE", "65536")),
+        serit_sayisi=int(os.getenv("ANALYTICS_SHM_SERIT", "16")),
+        taskin_kapasite=int(os.getenv("ANALYTICS_SHM_TASKIN", "4096")),
+        aday_sayisi=aday_sayisi,
+    )
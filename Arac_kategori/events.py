@@ -0,0 +1,179 @@
+"""Araç değişikliklerinin abonelere (SSE) yayını.
+
+Her worker kendi abonelerine bellek içi kuyruklarla dağıtır. PostgreSQL
+(asyncpg) kullanılırken olaylar LISTEN/NOTIFY üzerinden tüm worker'lara
+iletilir; aksi halde sadece olayı üreten worker'ın aboneleri bilgilendirilir.
+
+NOTIFY bağlantı havuzundan gönderilir (LISTEN bağlantısı sadece dinler) ve
+yalnızca olay tipi ile id taşır; pg_notify'ın 8000 baytlık sınırı serbest
+metin alanlarıyla aşılmaz. Araç verisi gereken olaylarda her worker satırı
+bir kez okuyup kendi abonelerine dağıtır.
+"""
+import asyncio
+import itertools
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+from fastapi import Request
+from sqlalchemy import select, text
+
+from database import AsyncSessionLocal, async_engine
+from models import Arac
+from serialization import ARAC_KOLONLARI, json_bytes, satir_sozlugu
+
+logger = logging.getLogger(__name__)
+
+# Abone başına bekleyen en fazla olay; dolarsa abone düşürülür
+ABONE_KUYRUK_BOYUTU = 256
+# Boşta bağlantıyı canlı tutmak için yorum satırı aralığı (saniye)
+NABIZ_ARALIGI = 15.0
+NOTIFY_KANALI = "arac_olaylari"
+
+# Olay tipleri: created, updated, deleted, favori_toggled ve toplu
+# değişikliklerde invalidated (istemci listeyi yeniden yükler)
+
+# NOTIFY ile sadece id gönderilen, alıcı worker'da satırla tamamlanan olaylar
+VERILI_OLAYLAR = ("created", "updated")
+
+
+class Abone:
+    """Tek bir SSE bağlantısının kuyruğu"""
+
+    def __init__(self, boyut: int = ABONE_KUYRUK_BOYUTU):
+        self.kuyruk: "asyncio.Queue[Optional[bytes]]" = asyncio.Queue(boyut)
+        self.dusuruldu = False
+
+
+class OlayYayini:
+    """Sınırlı kuyruklu fan-out; yetişemeyen aboneyi bekletmeden düşürür"""
+
+    def __init__(self):
+        self._aboneler: Set[Abone] = set()
+        self._sira = itertools.count(1)
+        self._dinleyici = None
+        # Gelen bildirimler sırayla işlenir (satır okuması araya girse de)
+        self._gelenler: Optional["asyncio.Queue[dict]"] = None
+        self._isleyici: Optional[asyncio.Task] = None
+
+    @property
+    def abone_sayisi(self) -> int:
+        return len(self._aboneler)
+
+    def abone_ol(self) -> Abone:
+        abone = Abone()
+        self._aboneler.add(abone)
+        return abone
+
+    def ayril(self, abone: Abone):
+        self._aboneler.discard(abone)
+
+    def dagit(self, veri: bytes):
+        """Kodlanmış olayı bu worker'daki tüm abonelere ilet"""
+        mesaj = b"id: %d\n" % next(self._sira) + veri
+        for abone in list(self._aboneler):
+            try:
+                abone.kuyruk.put_nowait(mesaj)
+            except asyncio.QueueFull:
+                self._dusur(abone)
+
+    def _dusur(self, abone: Abone, yavas: bool = True):
+        # Kuyruk boşaltılıp sonlandırıcı konur; yavaş istemci yeniden
+        # bağlanıp listeyi baştan yükler
+        self._aboneler.discard(abone)
+        abone.dusuruldu = yavas
+        while not abone.kuyruk.empty():
+            abone.kuyruk.get_nowait()
+        abone.kuyruk.put_nowait(None)
+
+    async def yayinla(self, tip: str, arac_id: Optional[int] = None, **alanlar: Any):
+        """Olayı (varsa) tüm worker'lara, yoksa yerel abonelere gönder"""
+        olay: Dict[str, Any] = {"type": tip}
+        if arac_id is not None:
+            olay["id"] = arac_id
+        olay.update(alanlar)
+        if self._dinleyici is not None:
+            ozet = {k: v for k, v in olay.items() if k != "data"}
+            try:
+                async with async_engine.connect() as conn:
+                    await conn.execute(
+                        text("SELECT pg_notify(:kanal, :veri)"),
+                        {"kanal": NOTIFY_KANALI, "veri": json_bytes(ozet).decode()},
+                    )
+                    await conn.commit()
+                return
+            except Exception:
+                logger.exception("pg_notify başarısız; olay sadece yerel dağıtıldı")
+        self.dagit(_kodla(olay))
+
+    def _bildirim(self, _conn, _pid, _kanal, veri: str):
+        self._gelenler.put_nowait(json.loads(veri))
+
+    async def _bildirimleri_isle(self):
+        while True:
+            olay = await self._gelenler.get()
+            try:
+                if olay["type"] in VERILI_OLAYLAR:
+                    async with AsyncSessionLocal() as db:
+                        sonuc = await db.execute(
+                            select(*ARAC_KOLONLARI).filter(Arac.id == olay["id"])
+                        )
+                        satir = sonuc.first()
+                    if satir is None:
+                        continue  # araç bu arada silindi; deleted olayı ayrıca gelir
+                    olay["data"] = satir_sozlugu(satir)
+                self.dagit(_kodla(olay))
+            except Exception:
+                logger.exception("Bildirim işlenemedi; abonelere liste yenilemesi gönderildi")
+                self.dagit(_kodla({"type": "invalidated"}))
+
+    async def baslat(self):
+        """asyncpg varsa LISTEN bağlantısını aç"""
+        if async_engine.dialect.driver != "asyncpg":
+            return
+        import asyncpg
+
+        url = async_engine.url.set(drivername="postgresql")
+        self._gelenler = asyncio.Queue()
+        self._isleyici = asyncio.create_task(self._bildirimleri_isle())
+        self._dinleyici = await asyncpg.connect(url.render_as_string(hide_password=False))
+        await self._dinleyici.add_listener(NOTIFY_KANALI, self._bildirim)
+
+    async def durdur(self):
+        for abone in list(self._aboneler):
+            self._dusur(abone, yavas=False)
+        if self._dinleyici is not None:
+            await self._dinleyici.close()
+            self._dinleyici = None
+        if self._isleyici is not None:
+            self._isleyici.cancel()
+            self._isleyici = None
+
+
+def _kodla(olay: Dict[str, Any]) -> bytes:
+    return b"event: %s\ndata: %s\n\n" % (olay["type"].encode(), json_bytes(olay))
+
+
+olay_yayini = OlayYayini()
+
+
+async def sse_akisi(abone: Abone, request: Request) -> AsyncIterator[bytes]:
+    """Abonenin kuyruğunu text/event-stream olarak üret"""
+    try:
+        # İstemci koparsa 3 sn sonra yeniden bağlanır
+        yield b"retry: 3000\n\n"
+        while True:
+            try:
+                mesaj = await asyncio.wait_for(abone.kuyruk.get(), NABIZ_ARALIGI)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield b": ping\n\n"
+                continue
+            if mesaj is None:
+                if abone.dusuruldu:
+                    yield b"event: dropped\ndata: %s\n\n" % json_bytes({"type": "dropped"})
+                break
+            yield mesaj
+    finally:
+        olay_yayini.ayril(abone)
@@ -0,0 +1,94 @@
+from typing import List, Optional
+
+from fastapi import Query
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import Arac
+
+# Yıl facet'inin kova genişliği (yıl)
+YIL_ARALIGI = 5
+# Fiyat bantlarının alt sınırları; son bant üstten açıktır
+FIYAT_BANTLARI = (0, 250_000, 500_000, 1_000_000, 2_000_000, 5_000_000)
+
+
+def arac_filtresi(
+    kategori: Optional[List[str]] = Query(None),
+    yil_min: Optional[int] = None,
+    yil_max: Optional[int] = None,
+    fiyat_min: Optional[int] = None,
+    fiyat_max: Optional[int] = None,
+    favori: Optional[bool] = None,
+) -> list:
+    """Sorgu parametrelerinden WHERE koşulları üret (aralıklar dahil)"""
+    kosullar = []
+    if kategori:
+        kosullar.append(
+            Arac.kategori == kategori[0] if len(kategori) == 1 else Arac.kategori.in_(kategori)
+        )
+    if yil_min is not None:
+        kosullar.append(Arac.yil >= yil_min)
+    if yil_max is not None:
+        kosullar.append(Arac.yil <= yil_max)
+    if fiyat_min is not None:
+        kosullar.append(Arac.fiyat >= fiyat_min)
+    if fiyat_max is not None:
+        kosullar.append(Arac.fiyat <= fiyat_max)
+    if favori is not None:
+        kosullar.append(Arac.favori == favori)
+    return kosullar
+
+
+def _fiyat_bandi():
+    # Bant indeksi; fiyatı olmayan araçlar NULL bantta toplanır
+    return case(
+        (Arac.fiyat.is_(None), None),
+        *((Arac.fiyat < ust, i) for i, ust in enumerate(FIYAT_BANTLARI[1:])),
+        else_=len(FIYAT_BANTLARI) - 1,
+    )
+
+
+def facet_sorgusu(kosullar: list):
+    """(kategori, yıl kovası, fiyat bandı) başına adet; tek GROUP BY"""
+    yil_kovasi = (Arac.yil // YIL_ARALIGI) * YIL_ARALIGI
+    bant = _fiyat_bandi()
+    return (
+        select(Arac.kategori, yil_kovasi, bant, func.count())
+        .filter(*kosullar)
+        .group_by(Arac.kategori, yil_kovasi, bant)
+    )
+
+
+async def facet_sayilari(db: AsyncSession, kosullar: list) -> dict:
+    """Tek bir GROUP BY (kategori, yıl kovası, fiyat bandı) sorgusundan facet sayıları"""
+    sonuc = await db.execute(facet_sorgusu(kosullar))
+
+    toplam = 0
+    kategoriler, yillar, bantlar = {}, {}, {}
+    for kategori, kova, bant_no, adet in sonuc:
+        toplam += adet
+        kategoriler[kategori] = kategoriler.get(kategori, 0) + adet
+        yillar[kova] = yillar.get(kova, 0) + adet
+        bantlar[bant_no] = bantlar.get(bant_no, 0) + adet
+
+    def bant_araligi(i):
+        if i is None:
+            return None, None
+        ust = FIYAT_BANTLARI[i + 1] - 1 if i + 1 < len(FIYAT_BANTLARI) else None
+        return FIYAT_BANTLARI[i], ust
+
+    return {
+        "toplam": toplam,
+        "kategoriler": [
+            {"kategori": k, "adet": adet}
+            for k, adet in sorted(kategoriler.items(), key=lambda x: -x[1])
+        ],
+        "yillar": [
+            {"min": kova, "max": None if kova is None else kova + YIL_ARALIGI - 1, "adet": adet}
+            for kova, adet in sorted(yillar.items(), key=lambda x: (x[0] is None, x[0]))
+        ],
+        "fiyatlar": [
+            dict(zip(("min", "max"), bant_araligi(i)), adet=adet)
+            for i, adet in sorted(bantlar.items(), key=lambda x: (x[0] is None, x[0]))
+        ],
+    }
@@ -1,16 +1,54 @@
-from fastapi import FastAPI, HTTPException, Depends
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi import FastAPI, HTTPException, Depends, Path, Query, Request, Response
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi.middleware.gzip import GZipMiddleware
+from sqlalchemy import delete, func, insert, not_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
+from typing import List, Literal, Optional
 from datetime import datetime, timedelta
 
-from database import get_db
+from database import get_db, okuma_gecikme_payi, yazma_cerezi_ekle, AsyncSessionLocal
 from models import Arac, Kullanici
+from analytics import (
+    toplu_kaydet, olaylari_kaydet, admin_islemi_kaydet,
+    arac_analitigi, dashboard_ozeti, gunluk_istatistik, trend_serisi,
+    analytics_yukle, analytics_flush_baslat, analytics_flush_durdur, ADMIN_ISLEM_UZUNLUGU
+)
+from cache import (
+    katalog_degisti, katalog_degisti_toplu, katalog_surumu,
+    yanit_onbellegi, OnbellekKaydi
+)
+from aktarim import AKTARIM_TURLERI, arac_aktarimi, arac_ice_aktar
+from auth import (
+    OTURUM_CEREZI, TOKEN_SURESI, adogrula, ahashle, kullanici_sozlugu,
+    oturum_anahtari_yukle, oturum_kullanicisi, oturumu_kapat, parola_hashle,
+    token_olustur, yeniden_hashlenmeli
+)
+from bulk import batch_dogrula
+from metrics import PROMETHEUS_TURU, MetrikMiddleware, metinle
+from admission import KabulMiddleware
+from events import olay_yayini, sse_akisi
+from startup import (
+    SCHEMA_INIT, AdimZamanlayici, hazirlik, sema_dogrula, sema_ve_veri_kur,
+    veritabani_erisilebilir
+)
+from search import arac_ara, arama_indeksi
+from stats import filo_istatistikleri
+from facets import arac_filtresi, facet_sayilari
+from statik import statik_varliklar, varlik_yaniti
+from timeseries import adim_coz
+from serialization import (
+    ARAC_KOLONLARI, alan_kolonlari, alan_secimi, json_bytes, satir_sozlugu, satirlari_kodla
+)
+from pagination import (
+    VARSAYILAN_LIMIT, MAKSIMUM_LIMIT, SIRALAMA_KOLONLARI, keyset_query, next_cursor
+)
 from schemas import (
     AracCreate, AracUpdate, AracResponse, MessageResponse,
-    KullaniciLogin, LoginResponse, KullaniciCreate, KullaniciResponse
+    KullaniciLogin, LoginResponse, KullaniciCreate, KullaniciResponse,
+    AracStats, AracFacets, AnalyticsEventBatch, AracBulkCreate, AracBulkUpdate,
+    AracBulkDelete, AracBulkResponse, AracImportResponse, ARAC_ID_MAKSIMUM
 )
 
 app = FastAPI(
@@ -19,6 +57,10 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# En içte (CORS'un altında): analytics ve yazma isteklerini sınırlayıp
+# gerekirse erken reddet; reddedilen yanıtlar da CORS başlıklarını alır
+app.add_middleware(KabulMiddleware)
+
 # CORS ayarları
 app.add_middleware(
     CORSMiddleware,
@@ -28,339 +70,673 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Static dosyaları serve et
-app.mount("/static", StaticFiles(directory="."), name="static")
+# Rota bazında gecikme ve istek başına sorgu metrikleri
+app.add_middleware(MetrikMiddleware)
+
+# Eşikten büyük API yanıtlarını Accept-Encoding'e göre sıkıştır; SSE ve
+# Content-Encoding'i zaten ayarlanmış yanıtlar (statik varlıklar) atlanır
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+# Varsayılan resim URL'si
+VARSAYILAN_RESIM = "https://images.unsplash.com/photo-1555215695-3004980ad54e?w=400&h=300&fit=crop"
+
+# Bilinmeyen kullanıcı adlarında karşılaştırılan hash (zamanlama eşitliği için)
+_SAHTE_HASH = parola_hashle("")
+
+
+
+def _istek_tokeni(request: Request) -> Optional[str]:
+    """Authorization: Bearer başlığından ya da oturum çerezinden token al"""
+    yetki = request.headers.get("authorization", "")
+    if yetki.lower().startswith("bearer "):
+        return yetki[7:].strip()
+    return request.cookies.get(OTURUM_CEREZI)
+
+
+async def get_current_user(request: Request, db: AsyncSession = Depends(get_db)):
+    """Token'a göre oturum sahibini döndür (oturum yoksa None)"""
+    return await oturum_kullanicisi(db, _istek_tokeni(request))
 
-# Analytics verilerini saklamak için basit bir in-memory storage
-analytics_data = {
-    "vehicle_views": {},
-    "favorite_clicks": {},
-    "detail_views": {},
-    "admin_actions": {},
-    "daily_stats": {}
-}
 
+async def require_admin(kullanici: Optional[dict] = Depends(get_current_user)):
+    """Admin olmayan istekleri reddet"""
+    if kullanici is None:
+        raise HTTPException(status_code=401, detail="Oturum açmanız gerekiyor")
+    if not kullanici["admin"]:
+        raise HTTPException(status_code=403, detail="Bu işlem için admin yetkisi gerekli")
+    return kullanici
 
-def get_current_user():
-    """Basit kullanıcı kontrolü - client-side session kullanıyoruz"""
-    return None
 
+# Katalogu değiştiren uç noktalar sadece adminlere açık
+YONETICI = [Depends(require_admin)]
 
-def require_admin():
-    """Admin kontrolü - client-side'da yapılıyor"""
-    return None
+
+def surum_etagi(surum: int) -> str:
+    """Araç satır sürümünün ETag karşılığı"""
+    return f'"v{surum}"'
+
+
+def _if_match_kosullari(request: Request) -> list:
+    """If-Match başlığındaki sürümleri WHERE koşuluna çevir (başlık yoksa koşulsuz)"""
+    deger = request.headers.get("if-match")
+    if deger is None or deger.strip() == "*":
+        return []
+    surumler = []
+    for aday in deger.split(","):
+        aday = aday.strip()
+        # If-Match güçlü karşılaştırma kullanır; W/ etiketleri eşleşmez
+        if aday.startswith('"v') and aday.endswith('"') and aday[2:-1].isdigit():
+            surumler.append(int(aday[2:-1]))
+    if not surumler:
+        raise HTTPException(status_code=412, detail="If-Match hiçbir sürümle eşleşmiyor")
+    return [Arac.surum.in_(surumler)]
+
+
+async def _degisiklik_reddedildi(db: AsyncSession, arac_id: int):
+    """Koşullu değişiklik satır bulamadı: araç yok (404) ya da sürüm eski (412)"""
+    surum = await db.scalar(select(Arac.surum).filter(Arac.id == arac_id))
+    if surum is None:
+        raise HTTPException(status_code=404, detail="Araç bulunamadı")
+    raise HTTPException(status_code=412, detail="Araç başka bir istekte değiştirilmiş",
+                        headers={"ETag": surum_etagi(surum)})
+
+
+def _arac_yaniti(veri: dict, surum: int, response: Response) -> Response:
+    """ETag'li yanıt; bağımlılıkların enjekte edilen yanıta koyduğu başlıklar
+    (get_db'nin son_yazma çerezi gibi) kaybolmasın diye taşınır"""
+    yanit = Response(json_bytes(veri), media_type="application/json",
+                     headers={"ETag": surum_etagi(surum)})
+    yanit.raw_headers.extend(
+        (ad, deger) for ad, deger in response.raw_headers if ad != b"content-length"
+    )
+    return yanit
+
+
+def _oturum_yaniti(response: Response, db_kullanici: Kullanici, mesaj: str) -> dict:
+    """Token üret, çerezi ayarla ve LoginResponse gövdesini döndür"""
+    kullanici = kullanici_sozlugu(db_kullanici)
+    token = token_olustur(db_kullanici.id, db_kullanici.oturum_surumu)
+    response.set_cookie(
+        OTURUM_CEREZI, token, max_age=TOKEN_SURESI, httponly=True, samesite="lax"
+    )
+    return {"success": True, "message": mesaj, "kullanici": kullanici, "token": token}
 
 @app.on_event("startup")
 async def startup_event():
-    """Uygulama başladığında veritabanını oluştur ve örnek veriler ekle"""
-    from database import engine
-    from models import Base
-    
-    Base.metadata.create_all(bind=engine)
-    
-    # Örnek veriler ekle
-    db = next(get_db())
-    
-    # Kullanıcılar
-    admin_user = db.query(Kullanici).filter(Kullanici.kullanici_adi == "admin").first()
-    if not admin_user:
-        admin_user = Kullanici(kullanici_adi="admin", parola="admin123", admin=True)
-        db.add(admin_user)
-    
-    normal_user = db.query(Kullanici).filter(Kullanici.kullanici_adi == "user").first()
-    if not normal_user:
-        normal_user = Kullanici(kullanici_adi="user", parola="user123", admin=False)
-        db.add(normal_user)
-    
-    # Araçlar - Daha fazla örnek araç ekleyelim
-    if db.query(Arac).count() == 0:
-        araclar = [
-            Arac(isim="BMW X5", model="X5", yil=2023, kategori="SUV", fiyat=850000, favori=True, resim_url="https://images.unsplash.com/photo-1555215695-3004980ad54e?w=400&h=300&fit=crop"),
-            Arac(isim="Mercedes C-Class", model="C-Class", yil=2022, kategori="Sedan", fiyat=650000, favori=False, resim_url="https://images.unsplash.com/photo-1618843479313-40f8afb4b4d8?w=400&h=300&fit=crop"),
-            Arac(isim="Audi A3", model="A3", yil=2023, kategori="Hatchback", fiyat=450000, favori=True, resim_url="https://images.unsplash.com/photo-1606664515524-ed2f786a0bd6?w=400&h=300&fit=crop"),
-            Arac(isim="Volkswagen Golf", model="Golf", yil=2021, kategori="Hatchback", fiyat=350000, favori=False, resim_url="https://images.unsplash.com/photo-1549317661-bd32c8ce0db2?w=400&h=300&fit=crop"),
-            Arac(isim="Toyota RAV4", model="RAV4", yil=2023, kategori="SUV", favori=True, resim_url="https://images.unsplash.com/photo-1541899481282-d53bffe3c55d?w=400&h=300&fit=crop"),
-            Arac(isim="Honda Civic", model="Civic", yil=2022, kategori="Sedan", favori=False, resim_url="https://images.unsplash.com/photo-1552519507-da3b142c6e3d?w=400&h=300&fit=crop"),
-            Arac(isim="Ford F-150", model="F-150", yil=2023, kategori="Pickup", favori=True, resim_url="https://images.unsplash.com/photo-1563720223185-11003d516935?w=400&h=300&fit=crop"),
-            Arac(isim="Nissan Qashqai", model="Qashqai", yil=2022, kategori="SUV", favori=False, resim_url="https://images.unsplash.com/photo-1606664515524-ed2f786a0bd6?w=400&h=300&fit=crop"),
-            Arac(isim="Hyundai i30", model="i30", yil=2023, kategori="Hatchback", favori=True, resim_url="https://images.unsplash.com/photo-1549317661-bd32c8ce0db2?w=400&h=300&fit=crop"),
-            Arac(isim="Kia Sportage", model="Sportage", yil=2023, kategori="SUV", favori=False, resim_url="https://images.unsplash.com/photo-1541899481282-d53bffe3c55d?w=400&h=300&fit=crop"),
-            Arac(isim="Mazda CX-5", model="CX-5", yil=2022, kategori="SUV", favori=True, resim_url="https://images.unsplash.com/photo-1555215695-3004980ad54e?w=400&h=300&fit=crop"),
-            Arac(isim="Subaru Impreza", model="Impreza", yil=2023, kategori="Sedan", favori=False, resim_url="https://images.unsplash.com/photo-1552519507-da3b142c6e3d?w=400&h=300&fit=crop"),
-            Arac(isim="Volvo XC60", model="XC60", yil=2023, kategori="SUV", favori=True, resim_url="https://images.unsplash.com/photo-1541899481282-d53bffe3c55d?w=400&h=300&fit=crop"),
-            Arac(isim="Lexus RX", model="RX", yil=2022, kategori="SUV", favori=False, resim_url="https://images.unsplash.com/photo-1555215695-3004980ad54e?w=400&h=300&fit=crop"),
-            Arac(isim="Porsche Cayenne", model="Cayenne", yil=2023, kategori="SUV", favori=True, resim_url="https://images.unsplash.com/photo-1555215695-3004980ad54e?w=400&h=300&fit=crop"),
-            Arac(isim="Tesla Model 3", model="Model 3", yil=2023, kategori="Sedan", favori=True, resim_url="https://images.unsplash.com/photo-1552519507-da3b142c6e3d?w=400&h=300&fit=crop"),
-            Arac(isim="Range Rover Sport", model="Sport", yil=2023, kategori="SUV", favori=False, resim_url="https://images.unsplash.com/photo-1541899481282-d53bffe3c55d?w=400&h=300&fit=crop"),
-            Arac(isim="Bentley Continental", model="Continental", yil=2022, kategori="Sedan", favori=True, resim_url="https://images.unsplash.com/photo-1618843479313-40f8afb4b4d8?w=400&h=300&fit=crop"),
-            Arac(isim="Ferrari F8", model="F8", yil=2023, kategori="Sports", favori=True, resim_url="https://images.unsplash.com/photo-1563720223185-11003d516935?w=400&h=300&fit=crop"),
-            Arac(isim="Lamborghini Huracan", model="Huracan", yil=2023, kategori="Sports", favori=False, resim_url="https://images.unsplash.com/photo-1563720223185-11003d516935?w=400&h=300&fit=crop"),
-            Arac(isim="McLaren 720S", model="720S", yil=2022, kategori="Sports", favori=True, resim_url="https://images.unsplash.com/photo-1563720223185-11003d516935?w=400&h=300&fit=crop"),
-            Arac(isim="Bugatti Chiron", model="Chiron", yil=2023, kategori="Sports", favori=True, resim_url="https://images.unsplash.com/photo-1563720223185-11003d516935?w=400&h=300&fit=crop"),
-            Arac(isim="Rolls Royce Phantom", model="Phantom", yil=2023, kategori="Sedan", favori=False, resim_url="https://images.unsplash.com/photo-1618843479313-40f8afb4b4d8?w=400&h=300&fit=crop"),
-        ]
-        
-        for arac in araclar:
-            db.add(arac)
-    
-    db.commit()
-    db.close()
+    """Şemayı (gerekirse) kur, analytics'i geri yükle ve worker'ı ısıt"""
+    zamanlayici = AdimZamanlayici()
+    try:
+        with zamanlayici.adim("sema"):
+            if SCHEMA_INIT == "skip":
+                await sema_dogrula()
+            else:
+                await sema_ve_veri_kur()
+
+        with zamanlayici.adim("oturum"):
+            await oturum_anahtari_yukle()
+
+        with zamanlayici.adim("olaylar"):
+            await olay_yayini.baslat()
+
+        # Statik varlıkları bir kez oku ve sıkıştır
+        with zamanlayici.adim("statik"):
+            await asyncio.to_thread(statik_varliklar)
+
+        # Analytics sayaçlarını geri yükle ve periyodik yazmayı başlat
+        with zamanlayici.adim("analytics"):
+            await asyncio.to_thread(analytics_yukle)
+            analytics_flush_baslat()
+
+        with zamanlayici.adim("isinma"):
+            async with AsyncSessionLocal() as db:
+                await db.execute(select(Arac.id).limit(1))
+    except Exception as e:
+        hazirlik["hata"] = str(e)
+        raise
+    zamanlayici.bitir()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Kapanırken bekleyen analytics verilerini veritabanına yaz"""
+    await analytics_flush_durdur()
+    await olay_yayini.durdur()
+
+@app.get("/healthz")
+async def healthz():
+    """Liveness: süreç ayakta ve event loop yanıt veriyor"""
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness: başlangıç tamamlandı ve veritabanına erişilebiliyor"""
+    hazir = hazirlik["hazir"] and await veritabani_erisilebilir()
+    return JSONResponse(
+        status_code=200 if hazir else 503,
+        content={"status": "ready" if hazir else "not_ready", **hazirlik},
+    )
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    """Prometheus metin biçiminde metrikler"""
+    return Response(metinle(), media_type=PROMETHEUS_TURU)
 
 @app.get("/", response_class=HTMLResponse)
-async def root():
-    return FileResponse("index.html")
+async def root(request: Request):
+    return varlik_yaniti(request, statik_varliklar().sayfalar["index.html"])
 
 @app.get("/login")
-async def login_page():
-    return FileResponse("login.html")
+async def login_page(request: Request):
+    return varlik_yaniti(request, statik_varliklar().sayfalar["login.html"])
 
 @app.get("/docs")
-async def docs():
-    return FileResponse("index.html")
+async def docs(request: Request):
+    return varlik_yaniti(request, statik_varliklar().sayfalar["index.html"])
+
+@app.api_route("/static/{dosya}", methods=["GET", "HEAD"], include_in_schema=False)
+async def statik_dosya(dosya: str, request: Request):
+    """Listelenen varlıkları sun; özetli adlar süresiz önbelleğe alınır"""
+    bulunan = statik_varliklar().bul(dosya)
+    if bulunan is None:
+        raise HTTPException(status_code=404, detail="Dosya bulunamadı")
+    return varlik_yaniti(request, *bulunan)
 
 # Analytics endpoints
+# Rollup tablolarının Integer kolonuna sığmayan id'ler tampona hiç girmez
+ARAC_ID_YOLU = Path(..., ge=1, le=ARAC_ID_MAKSIMUM)
+
 @app.post("/analytics/view/{vehicle_id}")
-async def track_vehicle_view(vehicle_id: int):
+async def track_vehicle_view(vehicle_id: int = ARAC_ID_YOLU):
     """Araç görüntüleme sayısını takip et"""
-    if vehicle_id not in analytics_data["vehicle_views"]:
-        analytics_data["vehicle_views"][vehicle_id] = 0
-    analytics_data["vehicle_views"][vehicle_id] += 1
-    
-    # Günlük istatistikleri güncelle
-    today = datetime.now().strftime("%Y-%m-%d")
-    if today not in analytics_data["daily_stats"]:
-        analytics_data["daily_stats"][today] = {"views": 0, "favorites": 0, "details": 0}
-    analytics_data["daily_stats"][today]["views"] += 1
-    
+    toplu_kaydet("view", (vehicle_id,))
     return {"message": "View tracked"}
 
 @app.post("/analytics/favorite/{vehicle_id}")
-async def track_favorite_click(vehicle_id: int):
+async def track_favorite_click(vehicle_id: int = ARAC_ID_YOLU):
     """Favori tıklama sayısını takip et"""
-    if vehicle_id not in analytics_data["favorite_clicks"]:
-        analytics_data["favorite_clicks"][vehicle_id] = 0
-    analytics_data["favorite_clicks"][vehicle_id] += 1
-    
-    # Günlük istatistikleri güncelle
-    today = datetime.now().strftime("%Y-%m-%d")
-    if today not in analytics_data["daily_stats"]:
-        analytics_data["daily_stats"][today] = {"views": 0, "favorites": 0, "details": 0}
-    analytics_data["daily_stats"][today]["favorites"] += 1
-    
+    toplu_kaydet("favorite", (vehicle_id,))
     return {"message": "Favorite click tracked"}
 
 @app.post("/analytics/detail/{vehicle_id}")
-async def track_detail_view(vehicle_id: int):
+async def track_detail_view(vehicle_id: int = ARAC_ID_YOLU):
     """Detay görüntüleme sayısını takip et"""
-    if vehicle_id not in analytics_data["detail_views"]:
-        analytics_data["detail_views"][vehicle_id] = 0
-    analytics_data["detail_views"][vehicle_id] += 1
-    
-    # Günlük istatistikleri güncelle
-    today = datetime.now().strftime("%Y-%m-%d")
-    if today not in analytics_data["daily_stats"]:
-        analytics_data["daily_stats"][today] = {"views": 0, "favorites": 0, "details": 0}
-    analytics_data["daily_stats"][today]["details"] += 1
-    
+    toplu_kaydet("detail", (vehicle_id,))
     return {"message": "Detail view tracked"}
 
+@app.post("/analytics/events")
+async def track_events(batch: AnalyticsEventBatch):
+    """Birden fazla analytics olayını tek istekte kaydet"""
+    adet = olaylari_kaydet(
+        (olay.type, olay.vehicle_id, olay.ts) for olay in batch.events
+    )
+    return {"message": "Events tracked", "accepted": adet}
+
 @app.post("/analytics/admin-action")
-async def track_admin_action(action: str, vehicle_id: Optional[int] = None):
+async def track_admin_action(
+    action: str = Query(..., min_length=1, max_length=ADMIN_ISLEM_UZUNLUGU),
+    vehicle_id: Optional[int] = None,
+):
     """Admin işlemlerini takip et"""
-    if action not in analytics_data["admin_actions"]:
-        analytics_data["admin_actions"][action] = 0
-    analytics_data["admin_actions"][action] += 1
-    
+    admin_islemi_kaydet(action)
     return {"message": "Admin action tracked"}
 
 @app.get("/analytics/vehicle/{vehicle_id}")
 async def get_vehicle_analytics(vehicle_id: int):
     """Belirli bir aracın analitik verilerini getir"""
-    views = analytics_data["vehicle_views"].get(vehicle_id, 0)
-    favorites = analytics_data["favorite_clicks"].get(vehicle_id, 0)
-    details = analytics_data["detail_views"].get(vehicle_id, 0)
-    
-    return {
-        "vehicle_id": vehicle_id,
-        "views": views,
-        "favorites": favorites,
-        "details": details
-    }
+    return {"vehicle_id": vehicle_id, **arac_analitigi(vehicle_id)}
 
 @app.get("/analytics/dashboard")
 async def get_analytics_dashboard():
     """Analytics dashboard verilerini getir"""
-    total_views = sum(analytics_data["vehicle_views"].values())
-    total_favorites = sum(analytics_data["favorite_clicks"].values())
-    total_details = sum(analytics_data["detail_views"].values())
-    
-    # En popüler araçlar
-    top_vehicles = sorted(
-        analytics_data["vehicle_views"].items(),
-        key=lambda x: x[1],
-        reverse=True
-    )[:5]
-    
-    # Günlük istatistikler
-    today = datetime.now().strftime("%Y-%m-%d")
-    today_stats = analytics_data["daily_stats"].get(today, {"views": 0, "favorites": 0, "details": 0})
-    
-    return {
-        "total_views": total_views,
-        "total_favorites": total_favorites,
-        "total_details": total_details,
-        "today_views": today_stats["views"],
-        "today_favorites": today_stats["favorites"],
-        "today_details": today_stats["details"],
-        "top_vehicles": top_vehicles,
-        "admin_actions": analytics_data["admin_actions"]
-    }
+    return dashboard_ozeti()
 
 @app.get("/analytics/trends")
-async def get_analytics_trends(days: int = 7):
-    """Son X günün trend verilerini getir"""
-    trends = []
-    for i in range(days):
-        date = (datetime.now() - timedelta(days=i)).strftime("%Y-%m-%d")
-        stats = analytics_data["daily_stats"].get(date, {"views": 0, "favorites": 0, "details": 0})
-        trends.append({
-            "date": date,
-            "views": stats["views"],
-            "favorites": stats["favorites"],
-            "details": stats["details"]
-        })
-    
-    return {"trends": trends[::-1]}  # En eski tarihten en yeniye
+async def get_analytics_trends(
+    days: int = 7,
+    baslangic: Optional[datetime] = Query(None, alias="from"),
+    bitis: Optional[datetime] = Query(None, alias="to"),
+    step: Optional[str] = None,
+    vehicle_id: Optional[int] = None,
+):
+    """Trend verilerini getir.
+
+    Sadece ``days`` verilirse son X günün günlük toplamları döner; ``from``,
+    ``to``, ``step`` (ör. 5m, 1h, 1d) veya ``vehicle_id`` ile dakika/saat/gün
+    çözünürlüğünde istenen aralık sorgulanır.
+    """
+    if baslangic is None and bitis is None and step is None and vehicle_id is None:
+        trends = []
+        bugun = datetime.now().date()
+        for i in range(days):
+            gun = bugun - timedelta(days=i)
+            trends.append({"date": gun.isoformat(), **gunluk_istatistik(gun)})
+        return {"trends": trends[::-1]}  # En eski tarihten en yeniye
+
+    try:
+        adim = adim_coz(step or "1h")
+        bitis = bitis or datetime.now()
+        baslangic = baslangic or bitis - timedelta(seconds=adim * 24)
+        seri = trend_serisi(baslangic, bitis, adim, vehicle_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "from": baslangic.isoformat(),
+        "to": bitis.isoformat(),
+        "step": adim,
+        "vehicle_id": vehicle_id,
+        **seri,
+    }
 
 # Araç endpoints
 @app.get("/araclar", response_model=List[AracResponse])
-async def araclari_listele(favori: Optional[bool] = None, db: Session = Depends(get_db)):
-    """Tüm araçları listele"""
-    query = db.query(Arac)
-    if favori is not None:
-        query = query.filter(Arac.favori == favori)
-    araclar = query.all()
+async def araclari_listele(
+    request: Request,
+    kosullar: list = Depends(arac_filtresi),
+    limit: int = Query(VARSAYILAN_LIMIT, ge=1, le=MAKSIMUM_LIMIT),
+    cursor: Optional[str] = None,
+    sort: Literal["id", "isim", "yil", "fiyat", "kategori"] = "id",
+    order: Literal["asc", "desc"] = "asc",
+    with_total: bool = False,
+    alanlar: tuple = Depends(alan_secimi),
+    db: AsyncSession = Depends(get_db)
+):
+    """Araçları filtreleyip keyset (cursor) sayfalama ile listele"""
+    anahtar = yanit_onbellegi.anahtar(request)
+    kayit = yanit_onbellegi.getir(anahtar)
+    if kayit is not None:
+        toplu_kaydet("view", kayit.idler)
+        return kayit.yanit(request)
+
+    surum = katalog_surumu()
+    basliklar = {}
+    # ORM nesnesi yerine sadece istenen kolonlar çekilir; cursor için
+    # gereken sıralama kolonu istenmemişse sona eklenir (yanıta girmez)
+    kolonlar = alan_kolonlari(alanlar)
+    if sort not in alanlar:
+        kolonlar.append(SIRALAMA_KOLONLARI[sort])
+    query = select(*kolonlar).filter(*kosullar)
+
+    # Toplam sayı sadece istendiğinde hesaplanır
+    if with_total:
+        toplam = await db.scalar(select(func.count()).select_from(query.subquery()))
+        basliklar["X-Total-Count"] = str(toplam)
+
+    sonuc = await db.execute(keyset_query(query, sort, order, cursor).limit(limit + 1))
+    satirlar = sonuc.all()
+    sonraki = next_cursor(satirlar, limit, sort, order)
+    araclar = satirlar[:limit]
+    if sonraki:
+        basliklar["X-Next-Cursor"] = sonraki
+        sonraki_url = request.url.include_query_params(cursor=sonraki)
+        basliklar["Link"] = f'<{sonraki_url}>; rel="next"'
+
+    govde = satirlari_kodla(araclar, alanlar)
+    kayit = yanit_onbellegi.kaydet(anahtar, OnbellekKaydi(
+        govde, basliklar, [arac.id for arac in araclar], surum, None
+    ), okuma_gecikme_payi(db))
     
-    # Analytics tracking
-    for arac in araclar:
-        await track_vehicle_view(arac.id)
+    # Analytics tracking (istek başına tek toplu kayıt)
+    toplu_kaydet("view", kayit.idler)
     
+    return kayit.yanit(request)
+
+@app.get("/araclar/facets", response_model=AracFacets)
+async def arac_facetleri(
+    request: Request,
+    kosullar: list = Depends(arac_filtresi),
+    db: AsyncSession = Depends(get_db)
+):
+    """Mevcut filtreye göre kategori, yıl kovası ve fiyat bandı sayıları"""
+    anahtar = yanit_onbellegi.anahtar(request)
+    kayit = yanit_onbellegi.getir(anahtar)
+    if kayit is None:
+        surum = katalog_surumu()
+        govde = json_bytes(await facet_sayilari(db, kosullar))
+        kayit = yanit_onbellegi.kaydet(
+            anahtar, OnbellekKaydi(govde, {}, [], surum, None), okuma_gecikme_payi(db)
+        )
+    return kayit.yanit(request)
+
+@app.get("/araclar/search", response_model=List[AracResponse])
+async def araclarda_ara(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(VARSAYILAN_LIMIT, ge=1, le=MAKSIMUM_LIMIT),
+    offset: int = Query(0, ge=0, le=10000),
+    with_total: bool = False,
+    db: AsyncSession = Depends(get_db)
+):
+    """İsim, model, kategori ve açıklamada sıralı (prefix) arama"""
+    araclar, toplam = await arac_ara(db, q, limit, offset, with_total)
+    if with_total and toplam is not None:
+        response.headers["X-Total-Count"] = str(toplam)
+    if len(araclar) == limit:
+        sonraki_url = request.url.include_query_params(offset=offset + limit)
+        response.headers["Link"] = f'<{sonraki_url}>; rel="next"'
     return araclar
 
+@app.get("/araclar/events")
+async def arac_olaylari(request: Request):
+    """Araç değişikliklerini Server-Sent Events olarak yayınla"""
+    abone = olay_yayini.abone_ol()
+    return StreamingResponse(
+        sse_akisi(abone, request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/araclar/export")
+async def araclari_disa_aktar(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    gzip: bool = False,
+):
+    """Tüm araç tablosunu sunucu tarafı cursor ile akış halinde dışa aktar"""
+    basliklar = {
+        "Content-Disposition": f'attachment; filename="araclar.{format}"',
+        "Cache-Control": "no-store",
+    }
+    if gzip:
+        basliklar["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        arac_aktarimi(format, sikistir=gzip),
+        media_type=AKTARIM_TURLERI[format],
+        headers=basliklar,
+    )
+
+@app.post("/araclar/import", response_model=AracImportResponse, dependencies=YONETICI)
+async def araclari_ice_aktar(
+    request: Request,
+    response: Response,
+    format: Optional[Literal["ndjson", "csv"]] = None,
+):
+    """CSV/NDJSON dosyasını (multipart ya da ham gövde) akış halinde içe aktar"""
+    # Yazma oturum yerine doğrudan birincil engine'den yapılır; yapışkanlık elle
+    yazma_cerezi_ekle(response)
+    icerik_tipi = request.headers.get("content-type", "")
+    if icerik_tipi.startswith("multipart/form-data"):
+        # Starlette dosyayı diske taşan geçici dosyaya yazar; bellekte tutulmaz
+        form = await request.form()
+        dosya = form.get("file")
+        if dosya is None or isinstance(dosya, str):
+            raise HTTPException(status_code=400, detail="'file' alanında dosya bekleniyor")
+        if format is None and (dosya.filename or "").lower().endswith(".csv"):
+            format = "csv"
+
+        async def parcalar():
+            while parca := await dosya.read(64 * 1024):
+                yield parca
+        kaynak = parcalar()
+    else:
+        if format is None and "csv" in icerik_tipi:
+            format = "csv"
+        kaynak = request.stream()
+
+    # Parçalar ayrı commit edildiğinden aktarım yarıda kesilse de yazılanlar görünür olmalı
+    yazilanlar: List[int] = []
+    try:
+        return await arac_ice_aktar(
+            format or "ndjson", kaynak, VARSAYILAN_RESIM, yazildi=yazilanlar.append
+        )
+    finally:
+        if yazilanlar:
+            arama_indeksi.sifirla()
+            katalog_degisti()
+            admin_islemi_kaydet("add_vehicle", sum(yazilanlar))
+            await olay_yayini.yayinla("invalidated")
+
+@app.get("/araclar/stats", response_model=AracStats)
+async def arac_istatistikleri(db: AsyncSession = Depends(get_db)):
+    """Filo istatistiklerini tek bir aggregate sorgu ile getir"""
+    return await filo_istatistikleri(db)
+
+@app.post("/araclar/bulk", response_model=AracBulkResponse, dependencies=YONETICI)
+async def toplu_arac_ekle(batch: AracBulkCreate, db: AsyncSession = Depends(get_db)):
+    """Birden fazla aracı tek transaction'da ekle"""
+    gecerli, hatalar = batch_dogrula(batch.items, AracCreate)
+    eklenenler = []
+    if gecerli:
+        satirlar = [
+            {
+                "isim": arac.isim, "model": arac.model, "yil": arac.yil,
+                "kategori": arac.kategori, "fiyat": arac.fiyat,
+                "aciklama": arac.aciklama, "favori": False,
+                "resim_url": arac.resim_url or VARSAYILAN_RESIM,
+            }
+            for _, _, arac in gecerli
+        ]
+        sonuc = await db.execute(insert(Arac).returning(*ARAC_KOLONLARI), satirlar)
+        eklenenler = [satir_sozlugu(satir) for satir in sonuc.all()]
+    # Yanıt commit'ten önce doğrulanır; doğrulama hatası eklemeyi geri alır
+    yanit = AracBulkResponse(success=not hatalar, items=eklenenler, errors=hatalar)
+    if eklenenler:
+        await db.commit()
+
+        for arac in eklenenler:
+            arama_indeksi.guncelle(Arac(**arac))
+        katalog_degisti_toplu(arac["id"] for arac in eklenenler)
+        admin_islemi_kaydet("add_vehicle", len(eklenenler))
+        await olay_yayini.yayinla("invalidated")
+
+    return yanit
+
+@app.patch("/araclar/bulk", response_model=AracBulkResponse, dependencies=YONETICI)
+async def toplu_arac_guncelle(batch: AracBulkUpdate, db: AsyncSession = Depends(get_db)):
+    """Birden fazla aracı tek transaction'da güncelle (favori dahil)"""
+    gecerli, hatalar = batch_dogrula(batch.items, AracUpdate, id_gerekli=True)
+    guncellenenler = []
+    if gecerli:
+        idler = {arac_id for _, arac_id, _ in gecerli}
+        mevcut = set(await db.scalars(select(Arac.id).filter(Arac.id.in_(idler))))
+        parametreler = []
+        for index, arac_id, arac_update in gecerli:
+            if arac_id not in mevcut:
+                hatalar.append({"index": index, "id": arac_id, "errors": [
+                    {"loc": ["id"], "msg": "Araç bulunamadı", "type": "not_found"}
+                ]})
+                continue
+            parametreler.append({"id": arac_id, **arac_update.dict(exclude_unset=True)})
+
+        if parametreler:
+            await db.execute(update(Arac), parametreler)
+            # Toplu (PK'ye göre) güncelleme ifade kabul etmez; sürüm ayrıca artırılır
+            await db.execute(
+                update(Arac)
+                .where(Arac.id.in_([p["id"] for p in parametreler]))
+                .values(surum=Arac.surum + 1)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            guncel_idler = [p["id"] for p in parametreler]
+            sonuc = await db.execute(
+                select(*ARAC_KOLONLARI).filter(Arac.id.in_(guncel_idler)).order_by(Arac.id)
+            )
+            guncellenenler = [satir_sozlugu(satir) for satir in sonuc.all()]
+
+            for arac in guncellenenler:
+                arama_indeksi.guncelle(Arac(**arac))
+            katalog_degisti_toplu(guncel_idler)
+            admin_islemi_kaydet("update_vehicle", len(guncellenenler))
+            await olay_yayini.yayinla("invalidated")
+
+    hatalar.sort(key=lambda h: h["index"])
+    return {"success": not hatalar, "items": guncellenenler, "errors": hatalar}
+
+@app.delete("/araclar/bulk", response_model=AracBulkResponse, dependencies=YONETICI)
+async def toplu_arac_sil(batch: AracBulkDelete, db: AsyncSession = Depends(get_db)):
+    """Birden fazla aracı tek DELETE ... RETURNING ile sil"""
+    sonuc = await db.execute(
+        delete(Arac).where(Arac.id.in_(batch.ids)).returning(Arac.id)
+    )
+    silinenler = set(sonuc.scalars().all())
+    await db.commit()
+
+    for arac_id in silinenler:
+        arama_indeksi.sil(arac_id)
+    if silinenler:
+        katalog_degisti_toplu(silinenler)
+        admin_islemi_kaydet("delete_vehicle", len(silinenler))
+        await olay_yayini.yayinla("invalidated")
+
+    hatalar = [
+        {"index": index, "id": arac_id, "errors": [
+            {"loc": ["ids", index], "msg": "Araç bulunamadı", "type": "not_found"}
+        ]}
+        for index, arac_id in enumerate(batch.ids) if arac_id not in silinenler
+    ]
+    return {"success": not hatalar, "ids": sorted(silinenler), "errors": hatalar}
+
 @app.get("/araclar/{arac_id}", response_model=AracResponse)
-async def arac_detay(arac_id: int, db: Session = Depends(get_db)):
+async def arac_detay(arac_id: int, request: Request,
+                     alanlar: tuple = Depends(alan_secimi),
+                     db: AsyncSession = Depends(get_db)):
     """Belirli bir aracın detaylarını getir"""
-    arac = db.query(Arac).filter(Arac.id == arac_id).first()
-    if not arac:
-        raise HTTPException(status_code=404, detail="Araç bulunamadı")
+    anahtar = yanit_onbellegi.anahtar(request)
+    kayit = yanit_onbellegi.getir(anahtar)
+    if kayit is None:
+        surum = katalog_surumu()
+        sonuc = await db.execute(
+            select(*alan_kolonlari(alanlar), Arac.surum).filter(Arac.id == arac_id)
+        )
+        arac = sonuc.first()
+        if not arac:
+            raise HTTPException(status_code=404, detail="Araç bulunamadı")
+        govde = json_bytes(satir_sozlugu(arac, alanlar))
+        # ETag satır sürümüdür; değişikliklerde If-Match ile geri gönderilir
+        kayit = yanit_onbellegi.kaydet(
+            anahtar,
+            OnbellekKaydi(govde, {}, [arac_id], surum, arac_id, surum_etagi(arac.surum)),
+            okuma_gecikme_payi(db),
+        )
     
     # Analytics tracking
     await track_detail_view(arac_id)
     
-    return arac
+    return kayit.yanit(request)
 
-@app.post("/araclar", response_model=AracResponse)
-async def arac_ekle(arac: AracCreate, db: Session = Depends(get_db)):
+@app.post("/araclar", response_model=AracResponse, dependencies=YONETICI)
+async def arac_ekle(arac: AracCreate, db: AsyncSession = Depends(get_db)):
     """Yeni araç ekle"""
-    # Varsayılan resim URL'si
-    default_image = "https://images.unsplash.com/photo-1555215695-3004980ad54e?w=400&h=300&fit=crop"
-    
     db_arac = Arac(
         isim=arac.isim,
         model=arac.model,
         yil=arac.yil,
         kategori=arac.kategori,
+        fiyat=arac.fiyat,
         aciklama=arac.aciklama,
         favori=False,
-        resim_url=arac.resim_url or default_image
+        resim_url=arac.resim_url or VARSAYILAN_RESIM
     )
     db.add(db_arac)
-    db.commit()
-    db.refresh(db_arac)
+    await db.commit()
+    await db.refresh(db_arac)
+    arama_indeksi.guncelle(db_arac)
+    katalog_degisti(db_arac.id)
+    await olay_yayini.yayinla(
+        "created", db_arac.id, data=AracResponse.model_validate(db_arac).model_dump()
+    )
     
     # Analytics tracking
     await track_admin_action("add_vehicle", db_arac.id)
     
     return db_arac
 
-@app.delete("/araclar/{arac_id}")
-async def arac_sil(arac_id: int, db: Session = Depends(get_db)):
-    """Aracı sil"""
-    arac = db.query(Arac).filter(Arac.id == arac_id).first()
-    if not arac:
-        raise HTTPException(status_code=404, detail="Araç bulunamadı")
-    
-    db.delete(arac)
-    db.commit()
+@app.delete("/araclar/{arac_id}", dependencies=YONETICI)
+async def arac_sil(arac_id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    """Aracı tek bir DELETE ... RETURNING ile sil"""
+    silinen = await db.scalar(
+        delete(Arac)
+        .where(Arac.id == arac_id, *_if_match_kosullari(request))
+        .returning(Arac.id)
+        .execution_options(synchronize_session=False)
+    )
+    if silinen is None:
+        await _degisiklik_reddedildi(db, arac_id)
+    await db.commit()
+    arama_indeksi.sil(arac_id)
+    katalog_degisti(arac_id)
+    await olay_yayini.yayinla("deleted", arac_id)
     
     # Analytics tracking
     await track_admin_action("delete_vehicle", arac_id)
     
     return {"success": True, "message": "Araç başarıyla silindi"}
 
-@app.patch("/araclar/{arac_id}/favori", response_model=AracResponse)
-async def favori_degistir(arac_id: int, db: Session = Depends(get_db)):
-    """Aracın favori durumunu değiştir"""
-    arac = db.query(Arac).filter(Arac.id == arac_id).first()
-    if not arac:
-        raise HTTPException(status_code=404, detail="Araç bulunamadı")
-    
-    arac.favori = not arac.favori
-    db.commit()
-    db.refresh(arac)
+@app.patch("/araclar/{arac_id}/favori", response_model=AracResponse, dependencies=YONETICI)
+async def favori_degistir(arac_id: int, request: Request, response: Response,
+                          db: AsyncSession = Depends(get_db)):
+    """Aracın favori durumunu tek bir UPDATE ... RETURNING ile değiştir"""
+    # NOT favori veritabanında hesaplanır; eşzamanlı değişiklikler kaybolmaz
+    arac = (await db.execute(
+        update(Arac)
+        .where(Arac.id == arac_id, *_if_match_kosullari(request))
+        .values(favori=not_(Arac.favori), surum=Arac.surum + 1)
+        .returning(*ARAC_KOLONLARI, Arac.surum)
+        .execution_options(synchronize_session=False)
+    )).first()
+    if arac is None:
+        await _degisiklik_reddedildi(db, arac_id)
+    await db.commit()
+    katalog_degisti(arac_id)
+    await olay_yayini.yayinla("favori_toggled", arac_id, favori=arac.favori)
     
     # Analytics tracking
     await track_favorite_click(arac_id)
     
-    return arac
+    return _arac_yaniti(satir_sozlugu(arac), arac.surum, response)
 
-@app.put("/araclar/{arac_id}", response_model=AracResponse)
-async def arac_guncelle(arac_id: int, arac_update: AracUpdate, db: Session = Depends(get_db)):
-    """Aracı güncelle"""
-    arac = db.query(Arac).filter(Arac.id == arac_id).first()
-    if not arac:
-        raise HTTPException(status_code=404, detail="Araç bulunamadı")
-    
-    for field, value in arac_update.dict(exclude_unset=True).items():
-        setattr(arac, field, value)
-    
-    db.commit()
-    db.refresh(arac)
+@app.put("/araclar/{arac_id}", response_model=AracResponse, dependencies=YONETICI)
+async def arac_guncelle(arac_id: int, arac_update: AracUpdate, request: Request,
+                        response: Response, db: AsyncSession = Depends(get_db)):
+    """Aracı tek bir UPDATE ... RETURNING ile güncelle"""
+    arac = (await db.execute(
+        update(Arac)
+        .where(Arac.id == arac_id, *_if_match_kosullari(request))
+        .values(**arac_update.dict(exclude_unset=True), surum=Arac.surum + 1)
+        .returning(*ARAC_KOLONLARI, Arac.surum)
+        .execution_options(synchronize_session=False)
+    )).first()
+    if arac is None:
+        await _degisiklik_reddedildi(db, arac_id)
+    await db.commit()
+    veri = satir_sozlugu(arac)
+    arama_indeksi.guncelle(arac)
+    katalog_degisti(arac_id)
+    await olay_yayini.yayinla("updated", arac_id, data=veri)
     
     # Analytics tracking
     await track_admin_action("update_vehicle", arac_id)
     
-    return arac
+    return _arac_yaniti(veri, arac.surum, response)
 
 # Kullanıcı endpoints
 @app.post("/login", response_model=LoginResponse)
-async def login(kullanici: KullaniciLogin, db: Session = Depends(get_db)):
+async def login(kullanici: KullaniciLogin, response: Response,
+                db: AsyncSession = Depends(get_db)):
     """Kullanıcı girişi"""
-    db_kullanici = db.query(Kullanici).filter(
-        Kullanici.kullanici_adi == kullanici.kullanici_adi,
-        Kullanici.parola == kullanici.parola
-    ).first()
+    db_kullanici = await db.scalar(select(Kullanici).filter(
+        Kullanici.kullanici_adi == kullanici.kullanici_adi
+    ))
     
-    if not db_kullanici:
+    # Kullanıcı yoksa da hash doğrulaması yapılır; yanıt süresi kullanıcı adını ele vermez
+    kayitli = db_kullanici.parola if db_kullanici else _SAHTE_HASH
+    if not await adogrula(kullanici.parola, kayitli) or not db_kullanici:
         raise HTTPException(status_code=401, detail="Geçersiz kullanıcı adı veya şifre")
     
-    return {
-        "success": True,
-        "message": "Giriş başarılı",
-        "kullanici": {
-            "id": db_kullanici.id,
-            "kullanici_adi": db_kullanici.kullanici_adi,
-            "admin": db_kullanici.admin
-        }
-    }
+    # Düz metin / eski parametreli parolaları girişte yükselt
+    if yeniden_hashlenmeli(db_kullanici.parola):
+        db_kullanici.parola = await ahashle(kullanici.parola)
+        await db.commit()
+    
+    return _oturum_yaniti(response, db_kullanici, "Giriş başarılı")
 
 @app.post("/register", response_model=LoginResponse)
-async def register(kullanici: KullaniciCreate, db: Session = Depends(get_db)):
+async def register(kullanici: KullaniciCreate, response: Response,
+                   db: AsyncSession = Depends(get_db)):
     """Yeni kullanıcı kaydı"""
     # Kullanıcı adı kontrolü
-    existing_user = db.query(Kullanici).filter(
+    existing_user = await db.scalar(select(Kullanici.id).filter(
         Kullanici.kullanici_adi == kullanici.kullanici_adi
-    ).first()
+    ))
     
     if existing_user:
         raise HTTPException(status_code=400, detail="Bu kullanıcı adı zaten kullanılıyor")
@@ -368,24 +744,25 @@ async def register(kullanici: KullaniciCreate, db: Session = Depends(get_db)):
     # Yeni kullanıcı oluştur (varsayılan olarak admin değil)
     new_user = Kullanici(
         kullanici_adi=kullanici.kullanici_adi,
-        parola=kullanici.parola,
+        parola=await ahashle(kullanici.parola),
         admin=False
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
     
-    return {
-        "message": "Kayıt başarılı",
-        "kullanici": {
-            "id": new_user.id,
-            "kullanici_adi": new_user.kullanici_adi,
-            "admin": new_user.admin
-        }
-    }
+    return _oturum_yaniti(response, new_user, "Kayıt başarılı")
+
+@app.get("/me", response_model=KullaniciResponse)
+async def me(kullanici: Optional[dict] = Depends(get_current_user)):
+    """Oturum sahibinin bilgileri"""
+    if kullanici is None:
+        raise HTTPException(status_code=401, detail="Oturum açmanız gerekiyor")
+    return kullanici
 
 @app.post("/logout")
-async def logout():
-    """Kullanıcı çıkışı"""
+async def logout(request: Request, response: Response, db: AsyncSession = Depends(get_db)):
+    """Kullanıcı çıkışı; token süresi dolmadan geçersiz kılınır"""
+    await oturumu_kapat(db, _istek_tokeni(request))
+    response.delete_cookie(OTURUM_CEREZI)
     return {"success": True, "message": "Çıkış başarılı"}
@@ -0,0 +1,210 @@
+"""Prometheus metin biçiminde çalışma zamanı metrikleri.
+
+Bağımlılık gerektirmeyen küçük bir kayıt defteri: sayaç, gösterge ve
+histogram. Metrikler süreç başınadır; birden fazla worker çalışırken her
+worker kendi değerlerini raporlar (``pid`` etiketi ile ayırt edilir).
+"""
+import bisect
+import contextvars
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Saniye cinsinden gecikme kovaları
+SURE_KOVALARI = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# İstek başına sorgu sayısı kovaları (N+1 kalıpları üst kovalarda görünür)
+SORGU_KOVALARI = (0, 1, 2, 3, 5, 10, 20, 50, 100, 500)
+
+PROMETHEUS_TURU = "text/plain; version=0.0.4; charset=utf-8"
+
+_metrikler: List["_Metrik"] = []
+_toplayicilar: List[Callable[[], List[str]]] = []
+
+
+def _kacis(deger: str) -> str:
+    return deger.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _etiket_metni(adlar: Sequence[str], degerler: Sequence[str]) -> str:
+    ciftler = [f'{ad}="{_kacis(str(deger))}"' for ad, deger in zip(adlar, degerler)]
+    return "{" + ",".join(ciftler) + "}" if ciftler else ""
+
+
+def _sayi(deger: float) -> str:
+    return repr(float(deger)) if isinstance(deger, float) else str(deger)
+
+
+class _Metrik:
+    tur = ""
+
+    def __init__(self, ad: str, aciklama: str, etiketler: Sequence[str] = ()):
+        self.ad = ad
+        self.aciklama = aciklama
+        self.etiketler = tuple(etiketler) + ("pid",)
+        self._lock = threading.Lock()
+        _metrikler.append(self)
+
+    def baslik(self) -> List[str]:
+        return [f"# HELP {self.ad} {self.aciklama}", f"# TYPE {self.ad} {self.tur}"]
+
+
+class Sayac(_Metrik):
+    tur = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._degerler: Dict[Tuple[str, ...], float] = {}
+
+    def artir(self, *etiketler: str, miktar: float = 1):
+        with self._lock:
+            self._degerler[etiketler] = self._degerler.get(etiketler, 0) + miktar
+
+    def metin(self) -> List[str]:
+        pid = str(os.getpid())
+        with self._lock:
+            return self.baslik() + [
+                f"{self.ad}{_etiket_metni(self.etiketler, e + (pid,))} {_sayi(d)}"
+                for e, d in self._degerler.items()
+            ]
+
+
+class Gosterge(Sayac):
+    tur = "gauge"
+
+    def ayarla(self, *etiketler: str, deger: float):
+        with self._lock:
+            self._degerler[etiketler] = deger
+
+
+class Histogram(_Metrik):
+    tur = "histogram"
+
+    def __init__(self, ad: str, aciklama: str, etiketler: Sequence[str] = (),
+                 kovalar: Sequence[float] = SURE_KOVALARI):
+        super().__init__(ad, aciklama, etiketler)
+        self.kovalar = tuple(kovalar)
+        # etiketler -> [kova sayıları..., toplam, adet]
+        self._seriler: Dict[Tuple[str, ...], List[float]] = {}
+
+    def gozlemle(self, deger: float, *etiketler: str):
+        i = bisect.bisect_left(self.kovalar, deger)
+        with self._lock:
+            seri = self._seriler.get(etiketler)
+            if seri is None:
+                seri = self._seriler[etiketler] = [0] * (len(self.kovalar) + 2)
+            if i < len(self.kovalar):
+                seri[i] += 1
+            seri[-2] += deger
+            seri[-1] += 1
+
+    def metin(self) -> List[str]:
+        satirlar = self.baslik()
+        with self._lock:
+            seriler = [(e, list(s)) for e, s in self._seriler.items()]
+        kova_adlari = self.etiketler + ("le",)
+        pid = str(os.getpid())
+        for etiketler, seri in seriler:
+            kumulatif = 0
+            for sinir, adet in zip(self.kovalar, seri):
+                kumulatif += adet
+                etiket = _etiket_metni(kova_adlari, etiketler + (pid, _sayi(sinir)))
+                satirlar.append(f"{self.ad}_bucket{etiket} {_sayi(kumulatif)}")
+            etiket = _etiket_metni(kova_adlari, etiketler + (pid, "+Inf"))
+            satirlar.append(f"{self.ad}_bucket{etiket} {_sayi(seri[-1])}")
+            etiket = _etiket_metni(self.etiketler, etiketler + (pid,))
+            satirlar.append(f"{self.ad}_sum{etiket} {_sayi(seri[-2])}")
+            satirlar.append(f"{self.ad}_count{etiket} {_sayi(seri[-1])}")
+        return satirlar
+
+
+def toplayici_ekle(fonk: Callable[[], List[str]]):
+    """Kazıma anında hesaplanan ek metrik satırları üreten fonksiyon kaydet"""
+    _toplayicilar.append(fonk)
+
+
+def metinle() -> bytes:
+    """Tüm metrikleri Prometheus metin biçiminde döndür"""
+    satirlar: List[str] = []
+    for metrik in _metrikler:
+        satirlar.extend(metrik.metin())
+    for fonk in _toplayicilar:
+        satirlar.extend(fonk())
+    return ("\n".join(satirlar) + "\n").encode()
+
+
+# --- HTTP ve veritabanı metrikleri ---
+
+istek_suresi = Histogram(
+    "http_request_duration_seconds", "HTTP istek süresi", ("method", "route", "status")
+)
+aktif_istekler = Gosterge("http_requests_in_flight", "İşlenmekte olan HTTP istekleri")
+istek_sorgulari = Histogram(
+    "http_request_db_queries", "İstek başına veritabanı sorgusu sayısı",
+    ("method", "route"), kovalar=SORGU_KOVALARI,
+)
+istek_db_suresi = Histogram(
+    "http_request_db_duration_seconds", "İstek başına toplam veritabanı süresi",
+    ("method", "route"),
+)
+sorgu_suresi = Histogram(
+    "db_query_duration_seconds", "Tek bir veritabanı sorgusunun süresi", ("engine",)
+)
+havuz_bekleme = Histogram(
+    "db_pool_wait_seconds", "Havuzdan bağlantı alma için bekleme süresi", ("engine",)
+)
+
+# İstek boyunca [sorgu sayısı, toplam süre]; istek dışı işlerde None
+istek_db = contextvars.ContextVar("istek_db", default=None)
+
+
+def sorgu_kaydet(engine_adi: str, sure: float):
+    """Engine olaylarından çağrılır"""
+    sorgu_suresi.gozlemle(sure, engine_adi)
+    sayac = istek_db.get()
+    if sayac is not None:
+        sayac[0] += 1
+        sayac[1] += sure
+
+
+class MetrikMiddleware:
+    """Rota bazında gecikme, aktif istek ve istek başına DB metrikleri (saf ASGI)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        durum = 500
+
+        async def gonder(mesaj):
+            nonlocal durum
+            if mesaj["type"] == "http.response.start":
+                durum = mesaj["status"]
+            await send(mesaj)
+
+        sayac = [0, 0.0]
+        belirtec = istek_db.set(sayac)
+        aktif_istekler.artir(miktar=1)
+        bas = time.perf_counter()
+        try:
+            await self.app(scope, receive, gonder)
+        finally:
+            sure = time.perf_counter() - bas
+            aktif_istekler.artir(miktar=-1)
+            istek_db.reset(belirtec)
+            rota = _rota(scope)
+            yontem = scope["method"]
+            istek_suresi.gozlemle(sure, yontem, rota, str(durum))
+            istek_sorgulari.gozlemle(sayac[0], yontem, rota)
+            istek_db_suresi.gozlemle(sayac[1], yontem, rota)
+
+
+def _rota(scope) -> str:
+    # Yol şablonu kullanılır (/araclar/{arac_id}); etiket sayısı sınırlı kalır
+    rota = scope.get("route")
+    yol: Optional[str] = getattr(rota, "path", None)
+    return yol if yol is not None else "<unmatched>"
@@ -1,4 +1,7 @@
-from sqlalchemy import Column, Integer, String, Boolean, Text
+from sqlalchemy import (
+    Column, Integer, BigInteger, String, Boolean, Text, Date, DateTime,
+    Index, DDL, event, func, literal_column
+)
 from database import Base
 
 
@@ -9,20 +12,99 @@ class Kullanici(Base):
     kullanici_adi = Column(String, unique=True, index=True)
     parola = Column(String)
     admin = Column(Boolean, default=False)
+    # Çıkışta artar; eski sürümlü token'lar geçersiz olur
+    oturum_surumu = Column(Integer, nullable=False, default=0, server_default="0")
 
 
 class Arac(Base):
     __tablename__ = "araclar"
 
     id = Column(Integer, primary_key=True, index=True)
-    isim = Column(String, index=True)
-    model = Column(String)
-    yil = Column(Integer)
-    kategori = Column(String)
-    fiyat = Column(Integer, default=0)
+    # Sıralanabilir kolonlar NULL olamaz; keyset cursor'ı NULL karşılaştırmaz
+    isim = Column(String, index=True, nullable=False)
+    model = Column(String, nullable=False)
+    yil = Column(Integer, nullable=False)
+    kategori = Column(String, nullable=False)
+    fiyat = Column(Integer, nullable=False, default=0, server_default="0")
     aciklama = Column(Text, nullable=True)
     favori = Column(Boolean, default=False)
     resim_url = Column(String, nullable=True)
+    # Her değişiklikte artar; ETag / If-Match ile iyimser eşzamanlılık
+    surum = Column(Integer, nullable=False, default=1, server_default="1")
+
+    # Keyset sayfalama için (sıralama kolonu, id) indeksleri
+    __table_args__ = (
+        Index("ix_araclar_isim_id", "isim", "id"),
+        Index("ix_araclar_yil_id", "yil", "id"),
+        Index("ix_araclar_fiyat_id", "fiyat", "id"),
+        Index("ix_araclar_kategori_id", "kategori", "id"),
+        Index("ix_araclar_favori_id", "favori", "id"),
+        # Kategori filtresi + yıl/fiyat aralığı ile sıralı sayfalar
+        Index("ix_araclar_kategori_yil_id", "kategori", "yil", "id"),
+        Index("ix_araclar_kategori_fiyat_id", "kategori", "fiyat", "id"),
+        # Facet sayımları tablo yerine bu indeksten (index-only) okunur
+        Index("ix_araclar_facet", "kategori", "yil", "fiyat", "favori"),
+    )
+
+
+class AnalitikSaatlik(Base):
+    """Araç başına saatlik analytics sayaçları (olay: view/favorite/detail/admin:*)"""
+    __tablename__ = "analytics_saatlik"
+
+    olay = Column(String(64), primary_key=True)
+    arac_id = Column(Integer, primary_key=True)
+    saat = Column(DateTime, primary_key=True)
+    adet = Column(BigInteger, nullable=False, default=0)
+
+
+class AnalitikGunluk(Base):
+    """Araç başına günlük analytics sayaçları"""
+    __tablename__ = "analytics_gunluk"
+
+    olay = Column(String(64), primary_key=True)
+    arac_id = Column(Integer, primary_key=True)
+    gun = Column(Date, primary_key=True)
+    adet = Column(BigInteger, nullable=False, default=0)
+
+
+class UygulamaDurumu(Base):
+    """Dağıtım düzeyinde anahtar/değer durumu (ör. kurulu şema sürümü)"""
+    __tablename__ = "uygulama_durumu"
+
+    anahtar = Column(String(64), primary_key=True)
+    deger = Column(String(128), nullable=False)
+
+
+def _agirlikli_vektor(kolon, agirlik):
+    # Sabitler bind parametresi değil literal olarak yazılır; böylece
+    # sorgudaki ifade indeks ifadesi ile birebir aynı olur.
+    metin = func.coalesce(kolon, literal_column("''"))
+    vektor = func.to_tsvector(literal_column("'simple'::regconfig"), metin)
+    return func.setweight(vektor, literal_column(f"'{agirlik}'"))
+
+
+# Tam metin arama vektörü (PostgreSQL, GIN indeksli)
+ARAC_ARAMA_VEKTORU = (
+    _agirlikli_vektor(Arac.isim, "A")
+    .op("||")(_agirlikli_vektor(Arac.model, "B"))
+    .op("||")(_agirlikli_vektor(Arac.kategori, "C"))
+    .op("||")(_agirlikli_vektor(Arac.aciklama, "D"))
+)
+
+Index(
+    "ix_araclar_arama_gin", ARAC_ARAMA_VEKTORU, postgresql_using="gin"
+).ddl_if(dialect="postgresql")
+
+Index(
+    "ix_araclar_isim_trgm", Arac.isim,
+    postgresql_using="gin", postgresql_ops={"isim": "gin_trgm_ops"}
+).ddl_if(dialect="postgresql")
+
+event.listen(
+    Arac.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
 
 
 def seed_data():
@@ -47,6 +129,7 @@ def seed_data():
                 "model": "C-Class",
                 "yil": 2022,
                 "kategori": "Sedan",
+                "fiyat": 650000,
                 "favori": False,
                 "resim_url": "https://images.unsplash.com/photo-1618843479313-40f8afb4b4d8?w=400&h=300&fit=crop"
             },
@@ -55,6 +138,7 @@ def seed_data():
                 "model": "A3",
                 "yil": 2023,
                 "kategori": "Hatchback",
+                "fiyat": 450000,
                 "favori": True,
                 "resim_url": "https://images.unsplash.com/photo-1606664515524-ed2f786a0bd6?w=400&h=300&fit=crop"
             },
@@ -63,6 +147,7 @@ def seed_data():
                 "model": "Golf",
                 "yil": 2021,
                 "kategori": "Hatchback",
+                "fiyat": 350000,
                 "favori": False,
                 "resim_url": "https://images.unsplash.com/photo-1549317661-bd32c8ce0db2?w=400&h=300&fit=crop"
             },
@@ -0,0 +1,84 @@
+import base64
+import json
+from typing import Any, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+
+from models import Arac
+from schemas import INT4_MAKSIMUM
+
+# Sayfa boyutu sınırları
+VARSAYILAN_LIMIT = 50
+MAKSIMUM_LIMIT = 500
+
+# Sıralanabilir kolonlar (hepsi id ile birlikte indeksli)
+SIRALAMA_KOLONLARI = {
+    "id": Arac.id,
+    "isim": Arac.isim,
+    "yil": Arac.yil,
+    "fiyat": Arac.fiyat,
+    "kategori": Arac.kategori,
+}
+
+
+def encode_cursor(sort: str, order: str, deger: Any, arac_id: int) -> str:
+    """Son satırın sıralama anahtarını opak bir cursor'a çevir"""
+    ham = json.dumps([sort, order, deger, arac_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(ham.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, order: str) -> Tuple[Any, int]:
+    """Cursor'ı çöz ve mevcut sıralama ile uyumlu olduğunu doğrula"""
+    try:
+        dolgu = "=" * (-len(cursor) % 4)
+        c_sort, c_order, deger, arac_id = json.loads(
+            base64.urlsafe_b64decode(cursor + dolgu)
+        )
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Geçersiz cursor")
+    if c_sort != sort or c_order != order:
+        raise HTTPException(status_code=400, detail="Cursor sıralama ile uyuşmuyor")
+    # Değer kolonun tipinde bir skaler olmalı (bool int sayılmaz); NULL da
+    # üretilmez çünkü sıralama kolonları NOT NULL
+    if not (_skaler_mi(deger, SIRALAMA_KOLONLARI[sort].type.python_type)
+            and _skaler_mi(arac_id, int)):
+        raise HTTPException(status_code=400, detail="Geçersiz cursor")
+    return deger, arac_id
+
+
+def _skaler_mi(deger: Any, tip: type) -> bool:
+    if type(deger) is not tip:
+        return False
+    # Integer kolonlar int4; taşan değer veritabanında hata verir
+    return tip is not int or -INT4_MAKSIMUM - 1 <= deger <= INT4_MAKSIMUM
+
+
+def keyset_query(query, sort: str, order: str, cursor: Optional[str] = None):
+    """Sorguya (sort, id) anahtarına göre keyset filtresi ve sıralama uygula"""
+    kolon = SIRALAMA_KOLONLARI[sort]
+    if cursor:
+        deger, son_id = decode_cursor(cursor, sort, order)
+        if sort == "id":
+            kosul = Arac.id < son_id if order == "desc" else Arac.id > son_id
+        elif order == "desc":
+            kosul = or_(kolon < deger, and_(kolon == deger, Arac.id < son_id))
+        else:
+            kosul = or_(kolon > deger, and_(kolon == deger, Arac.id > son_id))
+        query = query.filter(kosul)
+
+    if order == "desc":
+        siralama = [kolon.desc(), Arac.id.desc()]
+    else:
+        siralama = [kolon.asc(), Arac.id.asc()]
+    if sort == "id":
+        siralama = siralama[1:]
+    return query.order_by(*siralama)
+
+
+def next_cursor(satirlar, limit: int, sort: str, order: str) -> Optional[str]:
+    """limit + 1 satır çekildiyse bir sonraki sayfanın cursor'ını üret"""
+    if len(satirlar) <= limit:
+        return None
+    son = satirlar[limit - 1]
+    return encode_cursor(sort, order, getattr(son, sort), son.id)
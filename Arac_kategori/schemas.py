@@ -1,6 +1,15 @@
 from pydantic import BaseModel, validator, Field
-from typing import Optional
-from datetime import datetime
+from typing import Any, Dict, List, Literal, Optional
+from datetime import datetime, timedelta
+
+# Kabul edilen olay zamanı aralığı: en kısa günlük halka (paylaşımlı
+# sayaçlar, 400 gün) içinde kalır; ileri tarih sadece saat kayması kadar
+OLAY_GECMISI = timedelta(days=365)
+OLAY_SAAT_KAYMASI = timedelta(minutes=5)
+
+# Integer kolonlara (PostgreSQL int4) sığan en büyük değer
+INT4_MAKSIMUM = 2 ** 31 - 1
+ARAC_ID_MAKSIMUM = INT4_MAKSIMUM
 
 
 class KullaniciBase(BaseModel):
@@ -43,6 +52,7 @@ class LoginResponse(BaseModel):
     success: bool
     message: str
     kullanici: Optional[KullaniciResponse] = None
+    token: Optional[str] = None
 
 
 class AracBase(BaseModel):
@@ -53,7 +63,7 @@ class AracBase(BaseModel):
     model: str = Field(..., min_length=1, max_length=50,
                       description="Araç modeli")
     yil: int = Field(..., ge=1950, le=2024, description="Araç yılı")
-    fiyat: int = Field(..., ge=0, description="Araç fiyatı")
+    fiyat: int = Field(..., ge=0, le=INT4_MAKSIMUM, description="Araç fiyatı")
     aciklama: Optional[str] = None
     resim_url: Optional[str] = None
 
@@ -101,6 +111,110 @@ class AracResponse(AracBase):
         from_attributes = True
 
 
+class AracBulkCreate(BaseModel):
+    items: List[Dict[str, Any]] = Field(..., min_length=1, max_length=1000)
+
+
+class AracBulkUpdate(BaseModel):
+    items: List[Dict[str, Any]] = Field(..., min_length=1, max_length=1000)
+
+
+class AracBulkDelete(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=1000)
+
+
+class AracBulkError(BaseModel):
+    index: int
+    id: Optional[int] = None
+    errors: List[Any]
+
+
+class AracBulkResponse(BaseModel):
+    success: bool
+    items: List[AracResponse] = []
+    ids: List[int] = []
+    errors: List[AracBulkError] = []
+
+
+class AracImportResponse(BaseModel):
+    success: bool
+    accepted: int
+    rejected: int
+    errors: List[AracBulkError] = []
+    errors_truncated: bool = False
+
+
+class FiyatStats(BaseModel):
+    min: Optional[int] = None
+    ortalama: Optional[float] = None
+    max: Optional[int] = None
+
+
+class KategoriStats(BaseModel):
+    kategori: Optional[str] = None
+    adet: int
+    favori: int
+    fiyat: FiyatStats
+
+
+class YilStats(BaseModel):
+    yil: Optional[int] = None
+    adet: int
+    favori: int
+
+
+class AracStats(BaseModel):
+    toplam: int
+    favori: int
+    aktif: int
+    ortalama_yas: Optional[float] = None
+    fiyat: FiyatStats
+    kategoriler: List[KategoriStats]
+    yillar: List[YilStats]
+
+
+class KategoriFacet(BaseModel):
+    kategori: Optional[str] = None
+    adet: int
+
+
+class AralikFacet(BaseModel):
+    min: Optional[int] = None
+    max: Optional[int] = None
+    adet: int
+
+
+class AracFacets(BaseModel):
+    toplam: int
+    kategoriler: List[KategoriFacet]
+    yillar: List[AralikFacet]
+    fiyatlar: List[AralikFacet]
+
+
+class AnalyticsEvent(BaseModel):
+    type: Literal["view", "favorite", "detail"]
+    vehicle_id: int = Field(..., ge=1, le=ARAC_ID_MAKSIMUM)
+    ts: Optional[datetime] = None
+
+    @validator('ts')
+    def ts_gecerli(cls, v):
+        if v is None:
+            return v
+        if v.tzinfo:
+            # Rollup'lar ve trend serileri yerel saatle tutulur; tek yerde çevrilir
+            v = v.astimezone().replace(tzinfo=None)
+        simdi = datetime.now()
+        if v > simdi + OLAY_SAAT_KAYMASI:
+            raise ValueError('Olay zamanı ileri bir tarih olamaz')
+        if v < simdi - OLAY_GECMISI:
+            raise ValueError('Olay zamanı saklama süresinden eski')
+        return v
+
+
+class AnalyticsEventBatch(BaseModel):
+    events: List[AnalyticsEvent] = Field(..., max_length=1000)
+
+
 class MessageResponse(BaseModel):
     message: str
     success: bool
@@ -111,5 +225,8 @@ __all__ = [
     "KullaniciBase", "KullaniciCreate", "KullaniciLogin", 
     "KullaniciResponse", "LoginResponse",
     "AracBase", "AracCreate", "AracUpdate",
-    "AracResponse", "MessageResponse"
+    "AracResponse", "AracBulkCreate", "AracBulkUpdate", "AracBulkDelete",
+    "AracBulkError", "AracBulkResponse", "AracImportResponse",
+    "FiyatStats", "KategoriStats", "YilStats",
+    "AracStats", "KategoriFacet", "AralikFacet", "AracFacets", "AnalyticsEvent", "AnalyticsEventBatch", "MessageResponse"
 ]
@@ -0,0 +1,179 @@
+import bisect
+import re
+import threading
+from typing import Dict, List, Tuple
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from models import Arac, ARAC_ARAMA_VEKTORU
+
+# Alan ağırlıkları (PostgreSQL setweight sırası ile aynı)
+ALAN_AGIRLIKLARI = {"isim": 4, "model": 3, "kategori": 2, "aciklama": 1}
+
+_KELIME = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(metin: str) -> List[str]:
+    """Metni küçük harfli kelimelere ayır"""
+    if not metin:
+        return []
+    return _KELIME.findall(metin.casefold())
+
+
+class AramaIndeksi:
+    """SQLite test çalışmaları için bellek içi ters indeks (prefix destekli)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hazir = False
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._kelimeler: List[str] = []
+        self._belgeler: Dict[int, Dict[str, int]] = {}
+
+    @property
+    def hazir(self) -> bool:
+        return self._hazir
+
+    def olustur(self, db: Session):
+        """İndeksi veritabanındaki araçlardan sıfırdan kur"""
+        satirlar = db.query(
+            Arac.id, Arac.isim, Arac.model, Arac.kategori, Arac.aciklama
+        ).yield_per(1000)
+        with self._lock:
+            self._postings.clear()
+            self._belgeler.clear()
+            for satir in satirlar:
+                self._ekle(satir)
+            self._kelimeler = sorted(self._postings)
+            self._hazir = True
+
+    def sifirla(self):
+        """İndeksi boşalt; bir sonraki aramada yeniden kurulur (toplu yüklemeler için)"""
+        with self._lock:
+            self._hazir = False
+            self._postings.clear()
+            self._belgeler.clear()
+            self._kelimeler = []
+
+    def guncelle(self, arac):
+        """Aracı indekse ekle veya mevcut kaydını yenile"""
+        if not self._hazir:
+            return
+        with self._lock:
+            self._cikar(arac.id)
+            for kelime in self._ekle(arac):
+                i = bisect.bisect_left(self._kelimeler, kelime)
+                if i == len(self._kelimeler) or self._kelimeler[i] != kelime:
+                    self._kelimeler.insert(i, kelime)
+
+    def sil(self, arac_id: int):
+        """Aracı indeksten çıkar"""
+        if not self._hazir:
+            return
+        with self._lock:
+            for kelime in self._cikar(arac_id):
+                i = bisect.bisect_left(self._kelimeler, kelime)
+                if i < len(self._kelimeler) and self._kelimeler[i] == kelime:
+                    del self._kelimeler[i]
+
+    def ara(self, q: str, limit: int, offset: int = 0) -> Tuple[List[int], int]:
+        """Tüm terimlerle (prefix) eşleşen araç id'lerini skora göre döndür"""
+        terimler = tokenize(q)
+        if not terimler:
+            return [], 0
+        with self._lock:
+            skorlar = None
+            for terim in terimler:
+                terim_skoru: Dict[int, int] = {}
+                i = bisect.bisect_left(self._kelimeler, terim)
+                while i < len(self._kelimeler) and self._kelimeler[i].startswith(terim):
+                    kelime = self._kelimeler[i]
+                    # Tam eşleşme prefix eşleşmesinden önde gelir
+                    bonus = 1 if kelime == terim else 0
+                    for arac_id, agirlik in self._postings[kelime].items():
+                        skor = agirlik * 2 + bonus
+                        if skor > terim_skoru.get(arac_id, 0):
+                            terim_skoru[arac_id] = skor
+                    i += 1
+                if skorlar is None:
+                    skorlar = terim_skoru
+                else:
+                    skorlar = {
+                        arac_id: skor + terim_skoru[arac_id]
+                        for arac_id, skor in skorlar.items()
+                        if arac_id in terim_skoru
+                    }
+                if not skorlar:
+                    return [], 0
+        sirali = sorted(skorlar.items(), key=lambda x: (-x[1], x[0]))
+        return [arac_id for arac_id, _ in sirali[offset:offset + limit]], len(sirali)
+
+    def _ekle(self, arac) -> List[str]:
+        kelime_agirlik: Dict[str, int] = {}
+        for alan, agirlik in ALAN_AGIRLIKLARI.items():
+            for kelime in tokenize(getattr(arac, alan)):
+                if agirlik > kelime_agirlik.get(kelime, 0):
+                    kelime_agirlik[kelime] = agirlik
+        yeni = []
+        for kelime, agirlik in kelime_agirlik.items():
+            if kelime not in self._postings:
+                self._postings[kelime] = {}
+                yeni.append(kelime)
+            self._postings[kelime][arac.id] = agirlik
+        self._belgeler[arac.id] = kelime_agirlik
+        return yeni
+
+    def _cikar(self, arac_id: int) -> List[str]:
+        bos = []
+        for kelime in self._belgeler.pop(arac_id, {}):
+            posting = self._postings.get(kelime)
+            if posting is None:
+                continue
+            posting.pop(arac_id, None)
+            if not posting:
+                del self._postings[kelime]
+                bos.append(kelime)
+        return bos
+
+
+arama_indeksi = AramaIndeksi()
+
+
+async def _postgres_ara(db: AsyncSession, q: str, limit: int, offset: int, with_total: bool):
+    """tsvector (GIN) + pg_trgm ile sıralı arama"""
+    terimler = tokenize(q)
+    if not terimler:
+        return [], 0
+    sorgu_metni = " & ".join(f"{terim}:*" for terim in terimler)
+    tsquery = func.to_tsquery("simple", sorgu_metni)
+    kosul = or_(ARAC_ARAMA_VEKTORU.op("@@")(tsquery), Arac.isim.op("%")(q))
+    skor = func.ts_rank(ARAC_ARAMA_VEKTORU, tsquery) + func.similarity(Arac.isim, q)
+
+    query = select(Arac).filter(kosul)
+    toplam = None
+    if with_total:
+        toplam = await db.scalar(select(func.count()).select_from(query.subquery()))
+    araclar = await db.scalars(
+        query.order_by(skor.desc(), Arac.id.asc())
+        .offset(offset)
+        .limit(limit)
+    )
+    return araclar.all(), toplam
+
+
+async def arac_ara(db: AsyncSession, q: str, limit: int, offset: int = 0,
+                   with_total: bool = False):
+    """Dialect'e göre indeksli aramayı çalıştır: (araçlar, toplam)"""
+    if db.bind.dialect.name == "postgresql":
+        return await _postgres_ara(db, q, limit, offset, with_total)
+
+    if not arama_indeksi.hazir:
+        await db.run_sync(arama_indeksi.olustur)
+    ids, toplam = arama_indeksi.ara(q, limit, offset)
+    if not ids:
+        return [], toplam
+    sonuc = await db.scalars(select(Arac).filter(Arac.id.in_(ids)))
+    satirlar = {arac.id: arac for arac in sonuc}
+    return [satirlar[i] for i in ids if i in satirlar], toplam
@@ -0,0 +1,67 @@
+import json
+from typing import Any, Iterable, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Query
+
+try:
+    import orjson
+except ImportError:  # orjson opsiyonel; yoksa standart json kullanılır
+    orjson = None
+
+from models import Arac
+from schemas import AracResponse
+
+# AracResponse alan sırasıyla sadece gereken kolonlar
+ARAC_KOLONLARI = [getattr(Arac, alan) for alan in AracResponse.model_fields]
+ARAC_ALANLARI = [kolon.key for kolon in ARAC_KOLONLARI]
+
+# fields= ile istenebilen önceden tanımlı görünümler (aciklama/resim_url hariç)
+ALAN_GORUNUMLERI = {
+    "summary": ("id", "isim", "kategori", "model", "yil", "fiyat", "favori"),
+}
+
+
+def json_bytes(veri: Any) -> bytes:
+    """Veriyi en hızlı mevcut kodlayıcı ile JSON byte'larına çevir"""
+    if orjson is not None:
+        return orjson.dumps(veri)
+    return json.dumps(veri, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def alan_secimi(
+    fields: Optional[str] = Query(
+        None, description="Virgülle ayrılmış alanlar veya görünüm adı (summary)"
+    ),
+) -> Tuple[str, ...]:
+    """fields parametresini AracResponse sırasıyla alan adlarına çevir (id her zaman dahil)"""
+    if fields is None:
+        return tuple(ARAC_ALANLARI)
+    istenen = {"id"}
+    for parca in fields.split(","):
+        parca = parca.strip()
+        if parca in ALAN_GORUNUMLERI:
+            istenen.update(ALAN_GORUNUMLERI[parca])
+        elif parca in ARAC_ALANLARI:
+            istenen.add(parca)
+        elif parca:
+            raise HTTPException(status_code=400, detail=f"Bilinmeyen alan: {parca}")
+    return tuple(alan for alan in ARAC_ALANLARI if alan in istenen)
+
+
+def alan_kolonlari(alanlar: Sequence[str]) -> list:
+    """Sadece istenen alanların kolonları (seçilmeyen aciklama hiç okunmaz)"""
+    return [getattr(Arac, alan) for alan in alanlar]
+
+
+def satir_sozlugu(satir, alanlar: Sequence[str] = ARAC_ALANLARI) -> dict:
+    """Kolon projeksiyonu ile çekilmiş satırı yanıt sözlüğüne çevir.
+
+    Satır alanlardan fazla kolon içerebilir (sürüm, sıralama kolonu);
+    sondaki fazla kolonlar yanıta girmez.
+    """
+    return dict(zip(alanlar, satir))
+
+
+def satirlari_kodla(satirlar: Iterable, alanlar: Sequence[str] = ARAC_ALANLARI) -> bytes:
+    """Veritabanından gelen (doğrulanmış) satırları yeniden doğrulamadan kodla"""
+    return json_bytes([dict(zip(alanlar, satir)) for satir in satirlar])
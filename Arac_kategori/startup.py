@@ -0,0 +1,219 @@
+"""Başlangıç işlemleri: şema kurulumu, örnek veriler ve hazırlık durumu.
+
+Şema ve örnek veriler dağıtım başına bir kez kurulur. Kurulum sonunda
+metadata'nın özeti uygulama_durumu tablosuna yazılır; özet eşleşiyorsa
+worker'lar tek bir SELECT ile bu adımı atlar. Kurulumu dağıtım sırasında
+ayrı bir adım olarak çalıştırmak için:
+
+    python startup.py
+
+ve worker'larda SCHEMA_INIT=skip kullanılabilir.
+"""
+import asyncio
+import contextlib
+import hashlib
+import logging
+import os
+import tempfile
+import time
+
+from sqlalchemy import insert, inspect, select, text
+from sqlalchemy.exc import SQLAlchemyError
+
+from auth import parola_hashle
+from counters import fcntl
+from database import Base, async_engine
+from models import Arac, Kullanici, UygulamaDurumu, seed_data
+
+logger = logging.getLogger(__name__)
+
+# PostgreSQL advisory lock anahtarı (şema kurulumu için)
+SEMA_KILIDI = 72610011
+
+# auto: gerekiyorsa kur, skip: sadece kurulu olduğunu doğrula
+SCHEMA_INIT = os.getenv("SCHEMA_INIT", "auto")
+
+# /readyz tarafından raporlanan başlangıç durumu
+hazirlik = {"hazir": False, "adimlar_ms": {}, "toplam_ms": None, "hata": None}
+
+
+def sema_ozeti() -> str:
+    """Tablo, kolon ve indeks adlarından şema özeti üret"""
+    parcalar = []
+    for tablo in Base.metadata.sorted_tables:
+        kolonlar = ",".join(
+            kolon.name + ("" if kolon.nullable else "!") for kolon in tablo.columns
+        )
+        indeksler = ",".join(sorted(indeks.name for indeks in tablo.indexes))
+        parcalar.append(f"{tablo.name}({kolonlar})[{indeksler}]")
+    return hashlib.sha1(";".join(parcalar).encode()).hexdigest()
+
+
+async def _kurulu_ozet(conn):
+    tablo = UygulamaDurumu.__tablename__
+    if not await conn.run_sync(lambda c: inspect(c).has_table(tablo)):
+        return None
+    return await conn.scalar(
+        select(UygulamaDurumu.deger).filter(UygulamaDurumu.anahtar == "sema")
+    )
+
+
+@contextlib.asynccontextmanager
+async def _yerel_kilit():
+    """PostgreSQL dışı veritabanları için makine düzeyinde dosya kilidi"""
+    if fcntl is None:
+        yield
+        return
+    yol = os.path.join(tempfile.gettempdir(), "arac_sema.lock")
+    fd = os.open(yol, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        await asyncio.to_thread(fcntl.flock, fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+async def _ornek_verileri_ekle(conn):
+    """seed_data() içeriğini toplu ve tekrar çalıştırılabilir şekilde ekle"""
+    veriler = seed_data()
+    kullanicilar = [
+        {**k, "parola": await asyncio.to_thread(parola_hashle, k["parola"])}
+        for k in veriler["kullanicilar"]
+    ]
+    if conn.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    await conn.execute(
+        dialect_insert(Kullanici).on_conflict_do_nothing(index_elements=["kullanici_adi"]),
+        kullanicilar,
+    )
+    # araclar için doğal bir benzersiz anahtar yok; tablo boşsa tek seferde ekle
+    if await conn.scalar(select(Arac.id).limit(1)) is None:
+        # executemany için tüm satırlar aynı kolonlara sahip olmalı; eksik
+        # kolonlar None yerine kolonun varsayılanıyla doldurulur (fiyat=0)
+        kolonlar = {k for arac in veriler["araclar"] for k in arac}
+        varsayilanlar = {k: _kolon_varsayilani(Arac.__table__.c[k]) for k in kolonlar}
+        await conn.execute(
+            insert(Arac),
+            [{**varsayilanlar, **arac} for arac in veriler["araclar"]],
+        )
+
+
+def _kolon_varsayilani(kolon):
+    varsayilan = kolon.default
+    if varsayilan is None or not varsayilan.is_scalar:
+        return None
+    return varsayilan.arg
+
+
+def _eksik_kolonlari_ekle(conn):
+    # create_all mevcut tablolara yeni kolon eklemez; varsayılanı olan
+    # (veya boş bırakılabilen) kolonlar ALTER TABLE ile eklenir
+    denetci = inspect(conn)
+    hazirlayici = conn.dialect.identifier_preparer
+    for tablo in Base.metadata.sorted_tables:
+        if not denetci.has_table(tablo.name):
+            continue
+        mevcut = {kolon["name"] for kolon in denetci.get_columns(tablo.name)}
+        for kolon in tablo.columns:
+            if kolon.name in mevcut:
+                continue
+            ddl = (f"ALTER TABLE {hazirlayici.format_table(tablo)} "
+                   f"ADD COLUMN {hazirlayici.format_column(kolon)} "
+                   f"{kolon.type.compile(conn.dialect)}")
+            if kolon.server_default is not None:
+                ddl += f" DEFAULT {kolon.server_default.arg}"
+            if not kolon.nullable:
+                ddl += " NOT NULL"
+            conn.execute(text(ddl))
+
+
+def _bos_degerleri_doldur(conn):
+    # Sonradan NOT NULL yapılan kolonlarda eski satırlardaki NULL'lar
+    # varsayılanla doldurulur (mevcut tablolarda kısıt eklenemiyor)
+    for tablo in Base.metadata.sorted_tables:
+        for kolon in tablo.columns:
+            varsayilan = _kolon_varsayilani(kolon)
+            if kolon.nullable or kolon.primary_key or varsayilan is None:
+                continue
+            conn.execute(tablo.update().where(kolon.is_(None)).values({kolon.name: varsayilan}))
+
+
+def _eksik_indeksleri_olustur(conn):
+    # create_all mevcut tablolara sonradan eklenen indeksleri kurmaz
+    for tablo in Base.metadata.sorted_tables:
+        for indeks in tablo.indexes:
+            indeks.create(conn, checkfirst=True)
+
+
+async def sema_ve_veri_kur() -> bool:
+    """Gerekiyorsa şemayı ve örnek verileri kur; kurulum yapıldıysa True"""
+    ozet = sema_ozeti()
+    async with async_engine.connect() as conn:
+        if await _kurulu_ozet(conn) == ozet:
+            return False
+
+    postgres = async_engine.dialect.name == "postgresql"
+    kilit = contextlib.nullcontext() if postgres else _yerel_kilit()
+    async with kilit:
+        async with async_engine.begin() as conn:
+            if postgres:
+                await conn.execute(text("SELECT pg_advisory_xact_lock(:k)"), {"k": SEMA_KILIDI})
+            if await _kurulu_ozet(conn) == ozet:
+                # Başka bir worker kilidi bırakmadan önce kurulumu bitirdi
+                return False
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(_eksik_kolonlari_ekle)
+            await conn.run_sync(_bos_degerleri_doldur)
+            await conn.run_sync(_eksik_indeksleri_olustur)
+            await _ornek_verileri_ekle(conn)
+            await conn.execute(
+                UygulamaDurumu.__table__.delete().where(UygulamaDurumu.anahtar == "sema")
+            )
+            await conn.execute(insert(UygulamaDurumu).values(anahtar="sema", deger=ozet))
+    return True
+
+
+async def sema_dogrula():
+    """SCHEMA_INIT=skip iken kurulumun yapılmış olduğunu kontrol et"""
+    async with async_engine.connect() as conn:
+        if await _kurulu_ozet(conn) != sema_ozeti():
+            raise RuntimeError("Veritabanı şeması kurulu değil veya güncel değil")
+
+
+class AdimZamanlayici:
+    """Başlangıç adımlarının sürelerini hazirlik durumuna yazar"""
+
+    def __init__(self):
+        self._baslangic = time.perf_counter()
+
+    @contextlib.contextmanager
+    def adim(self, ad: str):
+        bas = time.perf_counter()
+        try:
+            yield
+        finally:
+            hazirlik["adimlar_ms"][ad] = round((time.perf_counter() - bas) * 1000, 2)
+
+    def bitir(self):
+        hazirlik["toplam_ms"] = round((time.perf_counter() - self._baslangic) * 1000, 2)
+        hazirlik["hazir"] = True
+        logger.info("Başlangıç tamamlandı: %s ms %s", hazirlik["toplam_ms"], hazirlik["adimlar_ms"])
+
+
+async def veritabani_erisilebilir() -> bool:
+    """Havuzdan bir bağlantı alıp basit bir sorgu çalıştır"""
+    try:
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        return True
+    except (SQLAlchemyError, OSError):
+        return False
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    kuruldu = asyncio.run(sema_ve_veri_kur())
+    print("Şema kuruldu" if kuruldu else "Şema zaten güncel")
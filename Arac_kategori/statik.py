@@ -0,0 +1,127 @@
+"""Statik varlıkların ve HTML sayfalarının bellekten, önceden sıkıştırılmış sunumu.
+
+Başlangıçta her varlık okunur, gzip (ve kuruluysa brotli) ile bir kez
+sıkıştırılır. Varlıklar içerik özetli adlarıyla (style.<özet>.css) süresiz
+önbelleğe alınabilir; HTML sayfaları bu adlara yönlendirilir ve her istekte
+ETag ile doğrulanır. Sadece aşağıda listelenen dosyalar sunulur.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+from typing import Dict, Optional, Tuple
+
+from fastapi import Request, Response
+
+try:
+    import brotli
+except ImportError:  # brotli opsiyonel; yoksa sadece gzip sunulur
+    brotli = None
+
+# /static altında sunulan varlıklar ve HTML kabukları
+VARLIKLAR = ("app.js", "style.css")
+SAYFALAR = ("index.html", "login.html")
+
+SURESIZ_ONBELLEK = "public, max-age=31536000, immutable"
+DOGRULAMALI_ONBELLEK = "no-cache"
+
+
+class Varlik:
+    """Bir dosyanın ham ve sıkıştırılmış halleri"""
+
+    __slots__ = ("ad", "tur", "ozet", "etag", "govdeler")
+
+    def __init__(self, ad: str, icerik: bytes):
+        self.ad = ad
+        self.tur = mimetypes.guess_type(ad)[0] or "application/octet-stream"
+        if self.tur.startswith("text/") or self.tur == "application/javascript":
+            self.tur += "; charset=utf-8"
+        self.ozet = hashlib.sha256(icerik).hexdigest()[:16]
+        # Zayıf ETag: aynı içeriğin farklı kodlamaları için ortak doğrulayıcı
+        self.etag = f'W/"{self.ozet}"'
+        # Kodlama -> gövde; sıkıştırma kazandırmıyorsa o kodlama atlanır
+        self.govdeler: Dict[str, bytes] = {"identity": icerik}
+        sikistirilmis = gzip.compress(icerik, 9, mtime=0)
+        if len(sikistirilmis) < len(icerik):
+            self.govdeler["gzip"] = sikistirilmis
+        if brotli is not None:
+            sikistirilmis = brotli.compress(icerik, quality=11)
+            if len(sikistirilmis) < len(icerik):
+                self.govdeler["br"] = sikistirilmis
+
+    @property
+    def hashli_ad(self) -> str:
+        kok, uzanti = os.path.splitext(self.ad)
+        return f"{kok}.{self.ozet[:10]}{uzanti}"
+
+
+def _kodlama_sec(accept_encoding: str, mevcut: Dict[str, bytes]) -> str:
+    """İstemcinin kabul ettiği en iyi mevcut kodlamayı seç (br > gzip)"""
+    kabul = set()
+    for parca in accept_encoding.lower().split(","):
+        ad, _, parametre = parca.partition(";")
+        parametre = parametre.replace(" ", "")
+        if parametre.startswith("q="):
+            try:
+                if float(parametre[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        kabul.add(ad.strip())
+    for kodlama in ("br", "gzip"):
+        if kodlama in mevcut and (kodlama in kabul or "*" in kabul):
+            return kodlama
+    return "identity"
+
+
+class StatikVarliklar:
+    """Varlıkları ve URL'leri içerik özetine göre yeniden yazılmış sayfaları tutar"""
+
+    def __init__(self, dizin: str = "."):
+        # Ad -> (varlık, süresiz önbelleğe alınabilir mi)
+        self._adlar: Dict[str, Tuple[Varlik, bool]] = {}
+        self.sayfalar: Dict[str, Varlik] = {}
+
+        for ad in VARLIKLAR:
+            with open(os.path.join(dizin, ad), "rb") as f:
+                varlik = Varlik(ad, f.read())
+            self._adlar[ad] = (varlik, False)
+            self._adlar[varlik.hashli_ad] = (varlik, True)
+
+        for ad in SAYFALAR:
+            with open(os.path.join(dizin, ad), encoding="utf-8") as f:
+                html = f.read()
+            for varlik_adi in VARLIKLAR:
+                varlik = self._adlar[varlik_adi][0]
+                html = html.replace(f"/static/{varlik_adi}", f"/static/{varlik.hashli_ad}")
+            self.sayfalar[ad] = Varlik(ad, html.encode())
+            self._adlar[ad] = (self.sayfalar[ad], False)
+
+    def bul(self, ad: str) -> Optional[Tuple[Varlik, bool]]:
+        return self._adlar.get(ad)
+
+
+def varlik_yaniti(request: Request, varlik: Varlik, suresiz: bool = False) -> Response:
+    """Kodlamayı pazarlık ederek varlığı döndür; ETag eşleşirse 304"""
+    basliklar = {
+        "ETag": varlik.etag,
+        "Cache-Control": SURESIZ_ONBELLEK if suresiz else DOGRULAMALI_ONBELLEK,
+        "Vary": "Accept-Encoding",
+    }
+    if varlik.etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=basliklar)
+    kodlama = _kodlama_sec(request.headers.get("accept-encoding", ""), varlik.govdeler)
+    if kodlama != "identity":
+        basliklar["Content-Encoding"] = kodlama
+    return Response(varlik.govdeler[kodlama], media_type=varlik.tur, headers=basliklar)
+
+
+_varliklar: Optional[StatikVarliklar] = None
+
+
+def statik_varliklar() -> StatikVarliklar:
+    """Varlıkları (gerekirse yükleyip sıkıştırarak) döndür"""
+    global _varliklar
+    if _varliklar is None:
+        _varliklar = StatikVarliklar()
+    return _varliklar
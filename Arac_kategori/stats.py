@@ -0,0 +1,91 @@
+from datetime import datetime
+
+from sqlalchemy import case, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from cache import SurumluDeger
+from database import okuma_gecikme_payi
+from models import Arac
+
+# Bu yıldan itibaren üretilen araçlar "aktif" sayılır
+AKTIF_YIL = 2020
+
+_stats_cache = SurumluDeger(ttl=60.0)
+
+
+def _fiyat_ozeti(t: dict) -> dict:
+    return {
+        "min": t["min"],
+        "ortalama": round(t["fiyat_toplam"] / t["fiyat_adet"], 2) if t["fiyat_adet"] else None,
+        "max": t["max"],
+    }
+
+
+def _hesapla(db: Session) -> dict:
+    """Tek bir GROUP BY (kategori, yil) sorgusundan tüm özetleri türet"""
+    gruplar = (
+        db.query(
+            Arac.kategori,
+            Arac.yil,
+            func.count(Arac.id),
+            func.sum(case((Arac.favori.is_(True), 1), else_=0)),
+            func.count(Arac.fiyat),
+            func.coalesce(func.sum(Arac.fiyat), 0),
+            func.min(Arac.fiyat),
+            func.max(Arac.fiyat),
+        )
+        .group_by(Arac.kategori, Arac.yil)
+        .all()
+    )
+
+    def yeni_toplam():
+        return {"adet": 0, "favori": 0, "fiyat_adet": 0, "fiyat_toplam": 0,
+                "min": None, "max": None}
+
+    def biriktir(hedef, adet, favori, fiyat_adet, fiyat_toplam, fmin, fmax):
+        hedef["adet"] += adet
+        hedef["favori"] += favori or 0
+        hedef["fiyat_adet"] += fiyat_adet
+        hedef["fiyat_toplam"] += fiyat_toplam
+        if fmin is not None and (hedef["min"] is None or fmin < hedef["min"]):
+            hedef["min"] = fmin
+        if fmax is not None and (hedef["max"] is None or fmax > hedef["max"]):
+            hedef["max"] = fmax
+
+    genel = yeni_toplam()
+    kategoriler, yillar = {}, {}
+    aktif = 0
+    yil_toplam = yil_adet = 0
+    for kategori, yil, adet, favori, fiyat_adet, fiyat_toplam, fmin, fmax in gruplar:
+        degerler = (adet, favori, fiyat_adet, fiyat_toplam, fmin, fmax)
+        biriktir(genel, *degerler)
+        biriktir(kategoriler.setdefault(kategori, yeni_toplam()), *degerler)
+        biriktir(yillar.setdefault(yil, yeni_toplam()), *degerler)
+        if yil is not None:
+            yil_toplam += yil * adet
+            yil_adet += adet
+            if yil >= AKTIF_YIL:
+                aktif += adet
+
+    bu_yil = datetime.now().year
+    return {
+        "toplam": genel["adet"],
+        "favori": genel["favori"],
+        "aktif": aktif,
+        "ortalama_yas": round(bu_yil - yil_toplam / yil_adet, 2) if yil_adet else None,
+        "fiyat": _fiyat_ozeti(genel),
+        "kategoriler": [
+            {"kategori": k, "adet": t["adet"], "favori": t["favori"], "fiyat": _fiyat_ozeti(t)}
+            for k, t in sorted(kategoriler.items(), key=lambda x: -x[1]["adet"])
+        ],
+        "yillar": [
+            {"yil": y, "adet": t["adet"], "favori": t["favori"]}
+            for y, t in sorted(yillar.items(), key=lambda x: (x[0] is None, x[0]))
+        ],
+    }
+
+
+async def filo_istatistikleri(db: AsyncSession) -> dict:
+    """Önbellekten (yoksa veritabanından) filo istatistiklerini getir"""
+    return await _stats_cache.agetir(lambda: db.run_sync(_hesapla), okuma_gecikme_payi(db))
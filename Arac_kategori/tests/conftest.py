@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Uygulama modülleri düz import edilir (from models import Arac)
+UYGULAMA_DIZINI = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, UYGULAMA_DIZINI)
+
+# database modülü import sırasında engine kurar; PostgreSQL sürücüsü gerekmesin
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
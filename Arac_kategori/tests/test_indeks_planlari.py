@@ -0,0 +1,62 @@
+"""Filtre ve facet sorgu şekillerinin bileşik indeksleri kullandığını doğrular.
+
+Sorgular uygulamanın ürettiği haliyle (arac_filtresi + keyset_query,
+facet_sorgusu) derlenir ve SQLite'ta EXPLAIN QUERY PLAN ile incelenir.
+"""
+import pytest
+from sqlalchemy import create_engine, select, text
+
+from database import Base
+from facets import arac_filtresi, facet_sorgusu
+from models import Arac
+from pagination import keyset_query
+
+
+@pytest.fixture(scope="module")
+def engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+def _filtre(**parametreler) -> list:
+    varsayilan = dict(kategori=None, yil_min=None, yil_max=None,
+                      fiyat_min=None, fiyat_max=None, favori=None)
+    return arac_filtresi(**{**varsayilan, **parametreler})
+
+
+def _plan(engine, sorgu) -> str:
+    sql = sorgu.compile(engine, compile_kwargs={"literal_binds": True})
+    with engine.connect() as conn:
+        satirlar = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    return "\n".join(satir[-1] for satir in satirlar)
+
+
+@pytest.mark.parametrize("parametreler, sort, indeks", [
+    (dict(kategori=["SUV"]), "yil", "ix_araclar_kategori_yil_id"),
+    (dict(kategori=["SUV"], yil_min=2010, yil_max=2020), "yil", "ix_araclar_kategori_yil_id"),
+    (dict(kategori=["SUV"]), "fiyat", "ix_araclar_kategori_fiyat_id"),
+    (dict(kategori=["SUV"], fiyat_min=100000, fiyat_max=500000), "fiyat",
+     "ix_araclar_kategori_fiyat_id"),
+])
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_kategori_filtreli_liste_bilesik_indeksi_kullanir(engine, parametreler, sort, indeks, order):
+    sorgu = keyset_query(
+        select(Arac.id, Arac.isim).filter(*_filtre(**parametreler)), sort, order
+    ).limit(51)
+    plan = _plan(engine, sorgu)
+    assert indeks in plan
+    # Sıralama indeksten gelir; ayrı bir sıralama adımı olmamalı
+    assert "TEMP B-TREE FOR ORDER BY" not in plan
+
+
+@pytest.mark.parametrize("parametreler", [
+    dict(),
+    dict(kategori=["SUV"]),
+    dict(kategori=["SUV", "Sedan"]),
+    dict(fiyat_min=100000),
+])
+def test_facet_sorgusu_kapsayan_indeksi_kullanir(engine, parametreler):
+    plan = _plan(engine, facet_sorgusu(_filtre(**parametreler)))
+    assert "COVERING INDEX ix_araclar_facet" in plan
@@ -0,0 +1,194 @@
+"""Dakika, saat ve gün çözünürlüğünde sabit boyutlu zaman serileri.
+
+Her seri (genel ve araç başına) üç halka tampondan oluşur; bir olay
+yazılırken üç çözünürlüğe birden eklenir, böylece kaba çözünürlükler ayrı
+bir aşağı örnekleme adımı gerektirmez. Halkalar taşınca en eski kova
+üzerine yazılır; araç serilerinin sayısı LRU ile sınırlıdır, bellek
+kullanımı sabittir.
+
+Zamanlar yerel saat (naive datetime) olarak ele alınır; günlük kovalar
+``date`` ile aynı sınırlara düşer. Seriler süreç içidir: birden fazla
+worker çalışırken her worker kendi olaylarını görür, geçmiş kovalar
+başlangıçta rollup tablolarından yüklenir.
+"""
+import os
+import re
+from array import array
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from counters import TIPLER
+
+_EPOK = datetime(1970, 1, 1)
+
+# Çözünürlük adı -> kova genişliği (saniye); inceden kabaya
+COZUNURLUKLER = (("minute", 60), ("hour", 3600), ("day", 86400))
+_GENISLIKLER = dict(COZUNURLUKLER)
+_SIRALAR = {ad: i for i, (ad, _) in enumerate(COZUNURLUKLER)}
+
+# Halka boyutları (kova sayısı): genel seriler 1 gün / 90 gün / 2 yıl,
+# araç serileri 1 saat / 7 gün / 90 gün geriye gider
+GENEL_BOYUTLAR = (1440, 24 * 90, 730)
+ARAC_BOYUTLARI = (60, 24 * 7, 90)
+
+# Bellekte serisi tutulan en fazla araç (en uzun süredir olay almayan atılır)
+ARAC_SINIRI = int(os.getenv("ANALYTICS_TS_VEHICLES", "2000"))
+
+# Tek sorguda döndürülen en fazla nokta
+MAKSIMUM_NOKTA = 2000
+
+# Şu andan bu kadar (saniye) ileri tarihli olaylar yazılmaz; ileri bir kova
+# halkada bugünün hücresini ele geçirip gerçek olayları düşürürdü
+GELECEK_PAYI = 300
+
+_ADIM_BIRIMLERI = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+_ADIM_DESENI = re.compile(r"^(\d+)([smhdw]?)$")
+
+
+def saniye(zaman: datetime) -> int:
+    """Yerel saate göre epoch saniyesi (saat dilimi varsa yerele çevrilir)"""
+    if zaman.tzinfo is not None:
+        zaman = zaman.astimezone().replace(tzinfo=None)
+    return int((zaman - _EPOK).total_seconds())
+
+
+def zamana(sn: int) -> datetime:
+    return _EPOK + timedelta(seconds=sn)
+
+
+def adim_coz(metin: str) -> int:
+    """"15m", "1h", "1d" veya saniye olarak verilen adımı saniyeye çevir"""
+    metin = metin.strip().lower()
+    if metin in _GENISLIKLER:
+        return _GENISLIKLER[metin]
+    eslesme = _ADIM_DESENI.match(metin)
+    if not eslesme:
+        raise ValueError(f"Geçersiz adım: {metin!r}")
+    sn = int(eslesme.group(1)) * _ADIM_BIRIMLERI[eslesme.group(2) or "s"]
+    if sn <= 0 or sn % 60:
+        raise ValueError("Adım bir dakikanın katı olmalı")
+    return sn
+
+
+class HalkaTampon:
+    """Sabit sayıda kova; her hücre kova numarası ve tip başına sayaç tutar"""
+
+    __slots__ = ("genislik", "boyut", "_kova", "_deger")
+
+    def __init__(self, genislik: int, boyut: int):
+        self.genislik = genislik
+        self.boyut = boyut
+        self._kova = array("q", [-1]) * boyut
+        self._deger = array("q", [0]) * (boyut * len(TIPLER))
+
+    def ekle(self, kova: int, tip: int, adet: int):
+        i = kova % self.boyut
+        eski = self._kova[i]
+        if eski != kova:
+            if eski > kova:
+                return  # halkanın gerisinde kalan eski olay
+            self._kova[i] = kova
+            t = len(TIPLER)
+            self._deger[i * t:(i + 1) * t] = array("q", [0]) * t
+        self._deger[i * len(TIPLER) + tip] += adet
+
+    def topla(self, ilk: int, adet: int, hedef: List[int]):
+        """[ilk, ilk + adet) kovalarının sayaçlarını hedefe ekle"""
+        t = len(TIPLER)
+        for kova in range(ilk, ilk + adet):
+            i = kova % self.boyut
+            if self._kova[i] == kova:
+                for tip in range(t):
+                    hedef[tip] += self._deger[i * t + tip]
+
+
+class Seri:
+    """Bir serinin üç çözünürlükteki halkaları"""
+
+    __slots__ = ("halkalar",)
+
+    def __init__(self, boyutlar: Sequence[int]):
+        self.halkalar = tuple(
+            HalkaTampon(genislik, boyut)
+            for (_, genislik), boyut in zip(COZUNURLUKLER, boyutlar)
+        )
+
+    def ekle(self, sn: int, tip: int, adet: int):
+        for halka in self.halkalar:
+            halka.ekle(sn // halka.genislik, tip, adet)
+
+
+class ZamanSerileri:
+    """Genel ve araç başına zaman serileri"""
+
+    def __init__(self, arac_siniri: int = ARAC_SINIRI):
+        self.arac_siniri = arac_siniri
+        self.genel = Seri(GENEL_BOYUTLAR)
+        self._araclar: "OrderedDict[int, Seri]" = OrderedDict()
+
+    def _arac_serisi(self, arac_id: int) -> Seri:
+        seri = self._araclar.get(arac_id)
+        if seri is None:
+            seri = self._araclar[arac_id] = Seri(ARAC_BOYUTLARI)
+            if len(self._araclar) > self.arac_siniri:
+                self._araclar.popitem(last=False)
+        else:
+            self._araclar.move_to_end(arac_id)
+        return seri
+
+    def ekle(self, tip: int, arac_idleri: Iterable[int], zaman: datetime):
+        """Olayları genel seriye ve her aracın serisine ekle"""
+        sn = saniye(zaman)
+        if sn > saniye(datetime.now()) + GELECEK_PAYI:
+            return
+        adetler: Dict[int, int] = {}
+        for arac_id in arac_idleri:
+            adetler[arac_id] = adetler.get(arac_id, 0) + 1
+        for arac_id, adet in adetler.items():
+            self._arac_serisi(arac_id).ekle(sn, tip, adet)
+        if adetler:
+            self.genel.ekle(sn, tip, sum(adetler.values()))
+
+    def yukle(self, cozunurluk: str, tip: int, arac_id: Optional[int],
+              zaman: datetime, adet: int):
+        """Rollup tablosundan gelen bir kovayı tek çözünürlüğe yaz"""
+        sira = _SIRALAR[cozunurluk]
+        seri = self.genel if arac_id is None else self._arac_serisi(arac_id)
+        halka = seri.halkalar[sira]
+        halka.ekle(saniye(zaman) // halka.genislik, tip, adet)
+
+    def sorgula(self, baslangic: datetime, bitis: datetime, adim: int,
+                arac_id: Optional[int] = None) -> Tuple[str, List[Tuple[datetime, List[int]]]]:
+        """[baslangic, bitis] aralığını adım genişliğinde noktalara böl.
+
+        Adımı tam bölen en kaba çözünürlük seçilir; nokta başına okunan kova
+        sayısı adim / genişlik ile sınırlıdır. (çözünürlük adı, noktalar)
+        döndürür.
+        """
+        sira = max(i for i, (_, g) in enumerate(COZUNURLUKLER) if adim % g == 0)
+        ad, genislik = COZUNURLUKLER[sira]
+        ilk = saniye(baslangic) // adim * adim
+        son = saniye(bitis) // adim * adim
+        if son < ilk:
+            return ad, []
+        if (son - ilk) // adim + 1 > MAKSIMUM_NOKTA:
+            raise ValueError(f"En fazla {MAKSIMUM_NOKTA} nokta istenebilir")
+
+        seri = self.genel if arac_id is None else self._araclar.get(arac_id)
+        noktalar = []
+        kova_adedi = adim // genislik
+        for sn in range(ilk, son + 1, adim):
+            degerler = [0] * len(TIPLER)
+            if seri is not None:
+                seri.halkalar[sira].topla(sn // genislik, kova_adedi, degerler)
+            noktalar.append((zamana(sn), degerler))
+        return ad, noktalar
+
+    def saklama_baslangici(self, cozunurluk: str, arac_id: Optional[int],
+                           simdi: datetime) -> datetime:
+        """Verilen çözünürlükte tutulan en eski kovanın başlangıcı"""
+        sira = _SIRALAR[cozunurluk]
+        genislik = _GENISLIKLER[cozunurluk]
+        boyut = (GENEL_BOYUTLAR if arac_id is None else ARAC_BOYUTLARI)[sira]
+        return zamana((saniye(simdi) // genislik - boyut + 1) * genislik)